@@ -0,0 +1,323 @@
+"""
+Analysis logic shared by both dashboards, the benchmarks and headless tools:
+signal scores, pattern scans, fundamental and technical verdicts, Heikin-Ashi.
+Importable without Streamlit.
+"""
+import numpy as np
+import pandas as pd
+
+from telemetry import timed
+
+# Bars of history that still move a Heikin-Ashi open (0.5**64 is below float precision)
+_HA_TAIL = 64
+
+
+# --- 1. TECHNICAL SCORES (pro_stock_analyst_v3) ---
+@timed("scoring")
+def calculate_signal_strength(df):
+    """Calculate composite technical signal (0-100)"""
+    latest = df.iloc[-1]
+    score = 50
+    
+    rsi = latest.get('RSI_14', 50)
+    if rsi < 30:
+        score += 15
+    elif rsi > 70:
+        score -= 15
+    
+    macd = latest.get('MACD_12_26_9', 0)
+    signal_line = latest.get('MACDs_12_26_9', 0)
+    if macd > signal_line:
+        score += 10
+    else:
+        score -= 10
+    
+    ema20 = latest.get('EMA_20', latest['Close'])
+    ema50 = latest.get('EMA_50', latest['Close'])
+    ema200 = latest.get('EMA_200', latest['Close'])
+    
+    if ema20 > ema50 > ema200:
+        score += 15
+    elif ema20 < ema50 < ema200:
+        score -= 15
+    
+    return min(100, max(0, score))
+
+
+@timed("scoring")
+def identify_patterns(df):
+    """Identify candlestick patterns"""
+    patterns = []
+    latest = df.iloc[-1]
+    
+    pattern_map = {
+        'CDL_DOJI_10_0.1': {'name': 'Doji', 'desc': 'Indecision signal - potential reversal'},
+        'CDL_ENGULFING_10_0.1': {'name': 'Engulfing', 'desc': 'Strong reversal - momentum shift'},
+        'CDL_HAMMER_10_0.1': {'name': 'Hammer', 'desc': 'Bullish - rejection of lower prices'},
+        'CDL_MORNINGSTAR_10_0.1': {'name': 'Morning Star', 'desc': 'Bullish - reversal from downtrend'},
+    }
+    
+    for col in df.columns:
+        if 'CDL_' in col:
+            value = latest.get(col, 0)
+            if value != 0:
+                info = pattern_map.get(col, {'name': col.replace('CDL_', ''), 'desc': 'Pattern'})
+                sentiment = "Bullish ⬆️" if value > 0 else "Bearish ⬇️"
+                patterns.append({
+                    'Pattern': info['name'],
+                    'Sentiment': sentiment,
+                    'Description': info['desc']
+                })
+    
+    return patterns
+
+
+@timed("indicators")
+def heikin_ashi(df):
+    """
+    Heikin-Ashi candles for `df`: a frame of HA_Open, HA_High, HA_Low and HA_Close
+    only, on df's index. HA_Open is recursive, the midpoint of the previous HA
+    candle's open and close, seeded with (Open + Close) / 2 of the first bar.
+    """
+    o, h, l, c = (df[col].to_numpy(dtype=float) for col in ('Open', 'High', 'Low', 'Close'))
+    ha_close = (o + h + l + c) / 4
+    ha_open = np.empty_like(ha_close)
+    if len(ha_close):
+        # ha_open[t] = 0.5**t * ha_open[0] + sum_k 0.5**k * ha_close[t-k]: weights past
+        # _HA_TAIL bars are below float precision, so one convolution solves the recursion
+        seed = (o[0] + c[0]) / 2
+        conv = np.convolve(ha_close, 0.5 ** np.arange(1, _HA_TAIL + 1))[:len(ha_close) - 1]
+        ha_open[0] = seed
+        ha_open[1:] = conv + seed * 0.5 ** np.arange(1, len(ha_close))
+    return pd.DataFrame({
+        'HA_Open': ha_open,
+        'HA_High': np.fmax(h, np.fmax(ha_open, ha_close)),
+        'HA_Low': np.fmin(l, np.fmin(ha_open, ha_close)),
+        'HA_Close': ha_close,
+    }, index=df.index)
+
+
+def heikin_ashi_next(prev_ha, bar):
+    """The Heikin-Ashi candle following `prev_ha` (an HA row, or None) for one OHLC bar"""
+    o, h, l, c = (float(bar[col]) for col in ('Open', 'High', 'Low', 'Close'))
+    ha_close = (o + h + l + c) / 4
+    ha_open = (o + c) / 2 if prev_ha is None else (float(prev_ha['HA_Open']) + float(prev_ha['HA_Close'])) / 2
+    return {'HA_Open': ha_open, 'HA_High': max(h, ha_open, ha_close),
+            'HA_Low': min(l, ha_open, ha_close), 'HA_Close': ha_close}
+
+
+# --- 2. RESEARCH REPORT (app) ---
+@timed("scoring")
+def generate_fundamental_analysis(info, fin):
+    """
+    Generates (+) and (-) points based on raw fundamental data.
+    """
+    positives = []
+    negatives = []
+    
+    # 1. Growth (CAGR check)
+    try:
+        # Annual financials (cached per ticker for a day)
+        if not fin.empty and len(fin.columns) >= 3:
+            rev_current = fin.iloc[0, 0] # Total Revenue
+            rev_past = fin.iloc[0, -1]
+            years = len(fin.columns)
+            cagr = ((rev_current / rev_past) ** (1/years)) - 1
+            
+            if cagr > 0.10: 
+                positives.append(f"Revenue CAGR (~{cagr*100:.1f}%) indicates structural growth (3-5yr view).")
+            elif cagr < 0.02:
+                negatives.append("Stagnant revenue growth over the last few years.")
+    except: pass
+
+    # 2. Margins & Efficiency
+    try:
+        roe = info.get('returnOnEquity', 0)
+        if roe > 0.15: positives.append(f"Strong ROE of {roe*100:.1f}% (Above typical WACC).")
+        elif roe < 0.08: negatives.append(f"Low ROE of {roe*100:.1f}% indicates inefficient capital use.")
+        
+        margins = info.get('profitMargins', 0)
+        if margins > 0.20: positives.append("High Profit Margins suggest pricing power or efficiency.")
+        elif margins < 0.05: negatives.append("Thin Profit Margins (Risk from input cost inflation).")
+    except: pass
+
+    # 3. Balance Sheet
+    try:
+        debt_eq = info.get('debtToEquity', 0)
+        if debt_eq < 50: positives.append("Strong Balance Sheet: Comfortable Debt-to-Equity ratio.")
+        elif debt_eq > 150: negatives.append(f"High Leverage: Debt-to-Equity is {debt_eq} (Risk sensitivity to rates).")
+    except: pass
+
+    # 4. Valuation
+    try:
+        pe = info.get('trailingPE', 0)
+        fpe = info.get('forwardPE', 0)
+        if pe > 0 and fpe > 0 and fpe < pe: positives.append("Forward earnings growth expected (Forward P/E < Trailing P/E).")
+        if pe > 50: negatives.append("Valuation Risk: High P/E implies high growth expectations.")
+    except: pass
+    
+    # 5. Cash Flow (Generic check via FreeCashflow if available or operating margins)
+    try:
+        if info.get('freeCashflow', 0) > 0: positives.append("Positive Free Cash Flow generation.")
+    except: pass
+
+    if not positives: positives.append("Stable large-cap business (Default).")
+    if not negatives: negatives.append("No major red flags in basic screening.")
+    
+    return positives, negatives
+
+
+@timed("scoring")
+def analyze_technicals(df, df_weekly):
+    """
+    Generates structured technical report (Short vs Long Term).
+    """
+    last = df.iloc[-1]
+    
+    # Use .get to safely access weekly data (in case index mismatch)
+    last_w = df_weekly.iloc[-1]
+    
+    # --- SHORT TERM (Trading) ---
+    st_signals = []
+    score = 0
+    
+    # 1. 20/50 DMA Crossover
+    if last['EMA_20'] > last['EMA_50']:
+        st_signals.append("✅ **Trend:** Price above key short-term averages (20>50 DMA).")
+        score += 1
+    else:
+        st_signals.append("🔻 **Trend:** Price below key short-term averages (Bearish).")
+        score -= 1
+        
+    # 2. RSI
+    rsi = last['RSI_14']
+    if rsi > 60: st_signals.append("✅ **Momentum:** RSI > 60 (Bullish Zone).")
+    elif rsi < 40: st_signals.append("🔻 **Momentum:** RSI < 40 (Bearish/Weak).")
+    else: st_signals.append("⚖️ **Momentum:** RSI in consolidation zone (40-60).")
+    
+    # 3. MACD
+    if last['MACD_12_26_9'] > last['MACDs_12_26_9']:
+        st_signals.append("✅ **MACD:** Positive crossover (Buy Signal).")
+    else:
+        st_signals.append("🔻 **MACD:** Negative crossover (Sell Signal).")
+
+    # 4. Volume
+    vol_avg = df['Volume'].rolling(20).mean().iloc[-1]
+    if last['Volume'] > 1.5 * vol_avg:
+        st_signals.append("🔥 **Volume:** High volume detected (Breakout potential).")
+
+    # 5. ADX
+    if last.get('ADX_14', 0) > 25:
+        st_signals.append("💪 **Strength:** ADX > 25 confirms strong trend.")
+    else:
+        st_signals.append("💤 **Strength:** ADX < 25 indicates sideways/weak trend.")
+
+    # --- LONG TERM (Investing) ---
+    lt_signals = []
+    
+    # 1. 200 DMA
+    ema200 = last.get('EMA_200', 0)
+    if ema200 > 0:
+        if last['Close'] > ema200:
+            lt_signals.append("✅ **Primary Trend:** Price > 200 DMA (Long-term Uptrend).")
+            score += 2
+        else:
+            lt_signals.append("🔻 **Primary Trend:** Price < 200 DMA (Long-term Downtrend).")
+            score -= 2
+            
+    # 2. Golden Cross
+    if last.get('EMA_50', 0) > ema200:
+        lt_signals.append("✅ **Structure:** Golden Cross active (50 > 200 EMA).")
+    else:
+        lt_signals.append("🔻 **Structure:** Death Cross active (50 < 200 EMA).")
+        
+    # 3. Weekly RSI
+    rsi_w = last_w.get('RSI_14', 50)
+    if rsi_w > 50:
+        lt_signals.append("✅ **Weekly Strength:** Weekly RSI > 50.")
+    else:
+        lt_signals.append("🔻 **Weekly Strength:** Weekly RSI < 50.")
+
+    # Verdict
+    if score >= 2: verdict = "BUY / ACCUMULATE"
+    elif score <= -2: verdict = "SELL / AVOID"
+    else: verdict = "HOLD / NEUTRAL"
+    
+    return st_signals, lt_signals, verdict
+
+
+# --- 3. SIGNAL SERIES (full history) ---
+# Verdict codes in signal frames
+VERDICT_CODES = {1: "BUY / ACCUMULATE", 0: "HOLD / NEUTRAL", -1: "SELL / AVOID"}
+
+
+def _column(df, name, default):
+    """Column as float64, or `default` (scalar or array) where the frame lacks it, as latest.get() does"""
+    if name in df.columns:
+        return df[name].to_numpy(dtype=float)
+    return np.broadcast_to(np.asarray(default, dtype=float), len(df))
+
+
+@timed("scoring")
+def signal_series(df, df_weekly=None):
+    """
+    calculate_signal_strength and analyze_technicals evaluated at every bar in one
+    array pass. Returns a compact frame on df's index:
+        score         composite signal (0-100), calculate_signal_strength
+        tech_score    analyze_technicals' trend score
+        verdict       1 BUY / 0 HOLD / -1 SELL (see VERDICT_CODES)
+        rsi_zone      1 RSI > 60, -1 RSI < 40, 0 in between
+        macd_cross    1 MACD above its signal line, -1 otherwise
+        ema_stack     1 EMA 20 > 50 > 200, -1 for the reverse, 0 otherwise
+        regime        1 above the 200 DMA, -1 below, 0 before it exists
+        volume_spike  volume > 1.5x its 20-bar average
+        adx_strong    ADX > 25
+        golden_cross  EMA 50 > EMA 200
+        weekly_rsi_bull  weekly RSI > 50 as of the last completed week (with df_weekly)
+    Row t of every column but weekly_rsi_bull equals the scalar functions run on
+    df.iloc[:t + 1]. weekly_rsi_bull differs on purpose: analyze_technicals reads
+    df_weekly.iloc[-1], the still-forming week, which a backtest could not have known.
+    """
+    close = df['Close'].to_numpy(dtype=float)
+    volume = df['Volume'].to_numpy(dtype=float)
+    rsi = _column(df, 'RSI_14', 50.0)
+    macd = _column(df, 'MACD_12_26_9', 0.0)
+    macd_signal = _column(df, 'MACDs_12_26_9', 0.0)
+    ema20 = _column(df, 'EMA_20', close)
+    ema50 = _column(df, 'EMA_50', close)
+    ema200 = _column(df, 'EMA_200', close)
+    ema200_lt = _column(df, 'EMA_200', 0.0)
+    adx = _column(df, 'ADX_14', 0.0)
+
+    rsi_extreme = np.where(rsi < 30, 15, np.where(rsi > 70, -15, 0))
+    macd_cross = np.where(macd > macd_signal, 1, -1)
+    ema_stack = np.where((ema20 > ema50) & (ema50 > ema200), 1,
+                         np.where((ema20 < ema50) & (ema50 < ema200), -1, 0))
+    score = np.clip(50 + rsi_extreme + 10 * macd_cross + 15 * ema_stack, 0, 100)
+
+    regime = np.where(ema200_lt > 0, np.where(close > ema200_lt, 1, -1), 0)
+    tech_score = np.where(df['EMA_20'].to_numpy(dtype=float) > df['EMA_50'].to_numpy(dtype=float), 1, -1) + 2 * regime
+    verdict = np.where(tech_score >= 2, 1, np.where(tech_score <= -2, -1, 0))
+
+    rsi_lt = df['RSI_14'].to_numpy(dtype=float)
+    vol_avg = df['Volume'].rolling(20).mean().to_numpy()
+    signals = pd.DataFrame({
+        'score': score.astype(np.int8),
+        'tech_score': tech_score.astype(np.int8),
+        'verdict': verdict.astype(np.int8),
+        'rsi_zone': np.where(rsi_lt > 60, 1, np.where(rsi_lt < 40, -1, 0)).astype(np.int8),
+        'macd_cross': macd_cross.astype(np.int8),
+        'ema_stack': ema_stack.astype(np.int8),
+        'regime': regime.astype(np.int8),
+        'volume_spike': volume > 1.5 * vol_avg,
+        'adx_strong': adx > 25,
+        'golden_cross': _column(df, 'EMA_50', 0.0) > ema200_lt,
+    }, index=df.index)
+
+    if df_weekly is not None:
+        # A weekly bar is known once its week is over, i.e. from the next week's label on
+        known_from = df_weekly.index[1:].append(df_weekly.index[-1:] + pd.Timedelta(days=7))
+        weekly_bull = df_weekly['RSI_14'].to_numpy(dtype=float) > 50
+        week = known_from.searchsorted(df.index, side='right') - 1
+        signals['weekly_rsi_bull'] = np.where(week >= 0, weekly_bull[week.clip(0)], False)
+    return signals
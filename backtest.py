@@ -0,0 +1,225 @@
+"""
+Vectorized backtests of the dashboards' verdicts. Per-bar signals come from
+analysis.signal_series (the same rules as the live scores); positions, costs,
+equity and trade statistics are whole-array operations, so a ticker costs about
+as much as computing its indicators once.
+
+    python backtest.py [--universe "NIFTY 500" | --tickers TCS.NS INFY.NS ...]
+                       [--rule verdict|strength] [--period 10y] [--cost-bps 10]
+                       [--slippage-bps 5] [--short] [--workers N] [--refresh]
+                       [--output backtest.csv]
+
+A signal is acted on at the close of the bar that produced it and the position
+earns the following bars' close-to-close returns. Every change of position pays
+cost + slippage (in basis points of the traded notional).
+"""
+import argparse
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analysis import signal_series
+from fetch_pipeline import PROCESS_CONTEXT
+from indicators import indicator_frame
+from ohlcv_store import HISTORY_STORE, OHLCVStore, slice_period
+
+TRADING_DAYS = 252
+# The verdict's 200-DMA regime needs this much history before it says anything
+MIN_BARS = 200
+CHUNK_SIZE = 25
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# rule -> (signal column, enter above, exit below); in between keeps the position
+RULES = {
+    'verdict': ('verdict', 0, 0),      # app: BUY / ACCUMULATE enters, SELL / AVOID exits
+    'strength': ('score', 60, 40),     # v3: BULLISH (> 60) enters, BEARISH (< 40) exits
+}
+
+# allow_short: the exit signal goes short instead of flat
+BacktestConfig = namedtuple('BacktestConfig', ['rule', 'cost_bps', 'slippage_bps', 'allow_short'],
+                            defaults=('verdict', 10.0, 5.0, False))
+
+RESULT_COLUMNS = ['Ticker', 'Start', 'End', 'Bars', 'CAGR %', 'Buy & Hold CAGR %', 'Max Drawdown %',
+                  'Hit Rate %', 'Trades', 'Turnover', 'Exposure %', 'Costs %']
+
+
+# --- 1. POSITIONS ---
+def target_positions(signals, rule='verdict', allow_short=False):
+    """Position held after each bar's close: 1 long, 0 flat, -1 short"""
+    column, enter, exit_ = RULES[rule]
+    values = signals[column].to_numpy()
+    state = np.full(len(values), np.nan)
+    state[values > enter] = 1.0
+    state[values < exit_] = -1.0 if allow_short else 0.0
+    # Neutral bars keep the last decided position (forward fill without a loop)
+    decided = np.where(np.isnan(state), 0, np.arange(len(state)))
+    np.maximum.accumulate(decided, out=decided)
+    held = state[decided]
+    return np.where(np.isnan(held), 0.0, held)
+
+
+# --- 2. SIMULATION ---
+def simulate(close, positions, cost_bps=10.0, slippage_bps=5.0):
+    """
+    Bar-by-bar strategy returns for `positions` decided at each close.
+    Returns (held, net_returns, traded): the position over each bar, its return
+    after costs and the notional traded at the bar's open (in position units).
+    """
+    close = np.asarray(close, dtype=float)
+    ret = np.zeros(len(close))
+    ret[1:] = close[1:] / close[:-1] - 1
+    held = np.zeros(len(close))
+    held[1:] = positions[:-1]
+    traded = np.abs(np.diff(held, prepend=0.0))
+    net = held * np.nan_to_num(ret) - traded * (cost_bps + slippage_bps) / 1e4
+    return held, net, traded
+
+
+def trade_returns(held, net, rate):
+    """Return of each round trip: its entry cost, and its exit cost if it was closed"""
+    in_trade = held != 0
+    if not in_trade.any():
+        return np.empty(0)
+    change = np.diff(held, prepend=0.0) != 0
+    # A bar's cost covers the old trade's exit and the new one's entry (both on a
+    # flip): each trade keeps only its entry here and pays its exit below
+    traded = np.abs(np.diff(held, prepend=0.0))
+    entry = np.where(change, np.abs(held), 0.0)
+    own = net + (traded - entry) * rate
+    ids = np.cumsum(change)[in_trade]
+    bounds = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    growth = np.exp(np.add.reduceat(np.log1p(own[in_trade]), bounds))
+    ends = np.flatnonzero(in_trade)[np.r_[bounds[1:], len(ids)] - 1]
+    closed = ends < len(held) - 1
+    growth[closed] *= 1 - np.abs(held[ends[closed]]) * rate
+    return growth - 1
+
+
+def _cagr(growth, years):
+    return (growth ** (1 / years) - 1) * 100 if years > 0 and growth > 0 else np.nan
+
+
+def metrics(index, close, held, net, traded, rate):
+    """CAGR, drawdown, hit rate, turnover and exposure of one simulated ticker"""
+    equity = np.cumprod(1 + net)
+    span_days = (index[-1] - index[0]).days
+    years = span_days / 365.25 if span_days > 0 else len(net) / TRADING_DAYS
+    valid = close[~np.isnan(close)]
+    trades = trade_returns(held, net, rate)
+    return {
+        'Start': index[0].strftime('%Y-%m-%d'),
+        'End': index[-1].strftime('%Y-%m-%d'),
+        'Bars': len(net),
+        'CAGR %': _cagr(equity[-1], years),
+        'Buy & Hold CAGR %': _cagr(valid[-1] / valid[0], years) if len(valid) > 1 else np.nan,
+        'Max Drawdown %': (equity / np.maximum.accumulate(equity) - 1).min() * 100,
+        'Hit Rate %': (trades > 0).mean() * 100 if len(trades) else np.nan,
+        'Trades': len(trades),
+        # Position units traded per year: one long round trip a year is 2
+        'Turnover': traded.sum() / years if years > 0 else np.nan,
+        'Exposure %': (held != 0).mean() * 100,
+        'Costs %': traded.sum() * rate * 100,
+    }
+
+
+def backtest(df, config=BacktestConfig(), ticker=None):
+    """Backtest of one daily OHLCV frame -> result row (see RESULT_COLUMNS)"""
+    df = df[OHLCV_COLUMNS]
+    signals = signal_series(df.join(indicator_frame(df)))
+    positions = target_positions(signals, config.rule, config.allow_short)
+    close = df['Close'].to_numpy(dtype=float)
+    held, net, traded = simulate(close, positions, config.cost_bps, config.slippage_bps)
+    row = {'Ticker': ticker}
+    row.update(metrics(df.index, close, held, net, traded, (config.cost_bps + config.slippage_bps) / 1e4))
+    return row
+
+
+# --- 3. PARALLEL RUN ---
+def _backtest_chunk(root, tickers, period, config):
+    """Worker: reads each ticker's partition from the store and backtests it -> (rows, skipped)"""
+    store = OHLCVStore(root)
+    rows, skipped = [], []
+    for ticker in tickers:
+        try:
+            df = slice_period(store.read(ticker, "1d", columns=OHLCV_COLUMNS), period)
+            if df is not None and len(df) >= MIN_BARS:
+                rows.append(backtest(df, config, ticker))
+                continue
+        except Exception:
+            pass
+        skipped.append(ticker)
+    return rows, skipped
+
+
+def backtest_universe(tickers, period="10y", config=BacktestConfig(), store=HISTORY_STORE, workers=None):
+    """
+    Backtests every ticker already in `store` on `workers` processes (1 = in-process)
+    -> (results, skipped: tickers without a partition, with fewer than MIN_BARS bars
+    or whose backtest raised).
+    """
+    tickers = list(dict.fromkeys(tickers))
+    chunks = [tickers[i:i + CHUNK_SIZE] for i in range(0, len(tickers), CHUNK_SIZE)]
+    workers = min(workers or os.cpu_count() or 1, max(1, len(chunks)))
+    if workers == 1:
+        parts = [_backtest_chunk(store.root, chunk, period, config) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=PROCESS_CONTEXT) as pool:
+            n = len(chunks)
+            parts = list(pool.map(_backtest_chunk, [store.root] * n, chunks, [period] * n, [config] * n))
+    rows = [row for part, _ in parts for row in part]
+    skipped = [ticker for _, part in parts for ticker in part]
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS), skipped
+
+
+def summarize(results):
+    """Median and mean of each metric across tickers"""
+    numeric = results.drop(columns=['Ticker', 'Start', 'End'])
+    return pd.DataFrame({'median': numeric.median(), 'mean': numeric.mean()})
+
+
+# --- 4. CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--universe", default="NIFTY 50", help="NSE index universe (see market_snapshot)")
+    parser.add_argument("--tickers", nargs="+", help="explicit tickers instead of a universe")
+    parser.add_argument("--rule", choices=list(RULES), default="verdict")
+    parser.add_argument("--period", default="10y")
+    parser.add_argument("--cost-bps", type=float, default=10.0, help="commission + taxes per trade")
+    parser.add_argument("--slippage-bps", type=float, default=5.0)
+    parser.add_argument("--short", action="store_true", help="go short on the exit signal")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--refresh", action="store_true", help="bring the stored histories up to date first")
+    parser.add_argument("--output", default=None, help="write per-ticker results to this CSV")
+    args = parser.parse_args(argv)
+
+    if args.tickers:
+        tickers = [t.upper() for t in args.tickers]
+    else:
+        from market_snapshot import load_universe
+        tickers = list(load_universe(args.universe))
+    if args.refresh:
+        from screener import refresh_store
+        missing = refresh_store(tickers, period=args.period)
+        if missing:
+            print(f"No data for {len(missing)} tickers: {', '.join(missing)}")
+
+    config = BacktestConfig(args.rule, args.cost_bps, args.slippage_bps, args.short)
+    results, skipped = backtest_universe(tickers, args.period, config, workers=args.workers)
+    if results.empty:
+        raise SystemExit("No stored histories to backtest (run with --refresh)")
+    if skipped:
+        print(f"Skipped {len(skipped)} tickers: {', '.join(skipped)}")
+
+    pd.set_option('display.width', 200)
+    print(results.round(2).to_string(index=False))
+    print(f"\n{len(results)} tickers, rule={config.rule}, costs {config.cost_bps:g} + {config.slippage_bps:g} bps")
+    print(summarize(results).round(2).to_string())
+    if args.output:
+        results.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Headless batch research reports: the Equity Research app's report for every ticker
+in a watchlist, built in worker processes without importing Streamlit.
+
+    python batch_report.py watchlist.txt [--format json,html,csv] [--out reports]
+                           [--workers N] [--period 2y] [--provider replay:<dir>]
+
+The watchlist holds one ticker per line (commas work too, '#' starts a comment);
+bare symbols get --suffix (.NS). Writes <out>/<TICKER>.json and .html per ticker
+and <out>/summary.csv, printing each ticker's per-stage timing as it finishes and
+a run summary at the end. Exits non-zero if any report failed.
+"""
+import argparse
+import csv
+import html
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from data_sources import get_financials, get_info
+from fetch_pipeline import FETCH_POOL, PROCESS_CONTEXT
+from research import build_report, stock_data
+
+FORMATS = ("json", "html", "csv")
+STAGES = ("data", "fundamentals", "report", "write")
+
+SUMMARY_FIELDS = ['ticker', 'name', 'as_of', 'price', 'change_pct', 'verdict', 'atr',
+                  'bull', 'base', 'bear', 'high_52w', 'patterns', 'positives', 'negatives',
+                  'status', 'error', 'seconds']
+
+
+# --- 1. WATCHLIST ---
+def read_watchlist(path, suffix=".NS"):
+    """Tickers from a watchlist file, in order, without duplicates"""
+    tickers = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            for item in line.split("#", 1)[0].replace(",", " ").split():
+                ticker = item.strip().upper()
+                if "." not in ticker and not ticker.startswith("^"):
+                    ticker += suffix
+                tickers.append(ticker)
+    return list(dict.fromkeys(tickers))
+
+
+# --- 2. RENDERING ---
+def _markdown_html(text):
+    """The signals' **bold** markdown as HTML"""
+    return re.sub(r"\*\*(.+?)\*\*", r"<b>\1</b>", html.escape(text))
+
+
+def render_html(report):
+    """Standalone HTML page for one report"""
+    fc = report['forecast']
+    levels = report['key_levels']
+
+    def items(lines):
+        return "".join(f"<li>{_markdown_html(line)}</li>" for line in lines) or "<li>None</li>"
+
+    patterns = [f"{p['date']}: **{p['sentiment']} {p['pattern']}**" for p in report['patterns']]
+    high_52w = levels['high_52w'] if levels['high_52w'] is not None else "N/A"
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(report['ticker'])} research report</title>
+<style>
+body {{ font-family: sans-serif; max-width: 960px; margin: 2em auto; color: #111; }}
+h2 {{ border-bottom: 2px solid #444; padding-bottom: 4px; }}
+.bull {{ color: #008f5a; }} .bear {{ color: #c62828; }}
+</style></head><body>
+<h1>{html.escape(report['name'])} ({html.escape(report['ticker'])})</h1>
+<p>As of {report['as_of']} &middot; CMP {report['price']:,.2f} ({report['change_pct']:+.2f}%)
+&middot; ATR {report['atr']:.2f} &middot; generated {report['generated']}</p>
+<h2>Verdict: {html.escape(report['verdict'])}</h2>
+<p>1-month scenarios: <span class="bull">Bull {fc['bull']:,.2f}</span> &middot;
+Base {fc['base']:,.2f} &middot; <span class="bear">Bear {fc['bear']:,.2f}</span></p>
+<h2>Short-Term Decision (Trading)</h2><ul>{items(report['short_term'])}</ul>
+<p>VWAP (approx) {levels['vwap']:.2f} &middot; 20 DMA {levels['ema_20']:.2f}</p>
+<h2>Long-Term Decision (Investing)</h2><ul>{items(report['long_term'])}</ul>
+<p>200 DMA {levels['ema_200']:.2f} &middot; 52W High {high_52w}</p>
+<h2>Candlestick Patterns (Last 5 Days)</h2><ul>{items(patterns)}</ul>
+<h2>Positive Factors</h2><ul>{items(report['positives'])}</ul>
+<h2>Negative Factors</h2><ul>{items(report['negatives'])}</ul>
+<p><small>Not financial advice. Data from Yahoo Finance. For research only.</small></p>
+</body></html>
+"""
+
+
+def summary_row(report):
+    fc = report['forecast']
+    return {
+        'ticker': report['ticker'], 'name': report['name'], 'as_of': report['as_of'],
+        'price': round(report['price'], 2), 'change_pct': round(report['change_pct'], 2),
+        'verdict': report['verdict'], 'atr': round(report['atr'], 2),
+        'bull': round(fc['bull'], 2), 'base': round(fc['base'], 2), 'bear': round(fc['bear'], 2),
+        'high_52w': report['key_levels']['high_52w'],
+        'patterns': "; ".join(f"{p['date']} {p['sentiment']} {p['pattern']}" for p in report['patterns']),
+        'positives': " | ".join(report['positives']),
+        'negatives': " | ".join(report['negatives']),
+    }
+
+
+# --- 3. WORKER ---
+def _init_worker(provider_spec):
+    if provider_spec:
+        from providers import provider_from_spec, set_provider
+        set_provider(provider_from_spec(provider_spec))
+
+
+def report_ticker(ticker, period, out_dir, formats):
+    """Builds and writes one report -> {'ticker', 'ok', 'error', 'timings', 'row'}"""
+    timings = {}
+    result = {'ticker': ticker, 'ok': False, 'error': None, 'timings': timings, 'row': None}
+    try:
+        # info and financials load while the price history does, as in the app
+        start = time.perf_counter()
+        pending_info = FETCH_POOL.submit('info', get_info, ticker, default={})
+        pending_fin = FETCH_POOL.submit('financials', get_financials, ticker, default=pd.DataFrame())
+        df, df_weekly = stock_data(ticker, period)
+        timings['data'] = time.perf_counter() - start
+        if df is None or len(df) < 2:
+            raise ValueError("no price history")
+
+        start = time.perf_counter()
+        info, fin = pending_info.result(), pending_fin.result()
+        timings['fundamentals'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        report = build_report(ticker, df, df_weekly, info or {}, fin)
+        timings['report'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        safe = ticker.replace("/", "_")
+        if "json" in formats:
+            with open(os.path.join(out_dir, f"{safe}.json"), "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, default=str)
+        if "html" in formats:
+            with open(os.path.join(out_dir, f"{safe}.html"), "w", encoding="utf-8") as f:
+                f.write(render_html(report))
+        timings['write'] = time.perf_counter() - start
+
+        result['ok'] = True
+        result['row'] = summary_row(report)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+
+# --- 4. RUNNER ---
+def run(tickers, out_dir="reports", formats=FORMATS, workers=None, period="2y", provider=None, log=print):
+    """Reports for every ticker on `workers` processes (1 = in-process); returns the results in order"""
+    os.makedirs(out_dir, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, max(1, len(tickers)))
+    results = {}
+
+    def progress(result, started):
+        done = len(results)
+        elapsed = time.perf_counter() - started
+        total = sum(result['timings'].values())
+        stages = " ".join(f"{s} {result['timings'][s]:.2f}" for s in STAGES if s in result['timings'])
+        status = "ok  " if result['ok'] else "FAIL"
+        detail = f"({stages})" if result['ok'] else result['error']
+        log(f"[{done:{len(str(len(tickers)))}d}/{len(tickers)}] {result['ticker']:16s} {status} "
+            f"{total:6.2f}s  {detail}  | elapsed {elapsed:.1f}s")
+
+    started = time.perf_counter()
+    if workers == 1:
+        _init_worker(provider)
+        for ticker in tickers:
+            results[ticker] = report_ticker(ticker, period, out_dir, formats)
+            progress(results[ticker], started)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=PROCESS_CONTEXT, initializer=_init_worker,
+                                 initargs=(provider,)) as pool:
+            futures = {pool.submit(report_ticker, t, period, out_dir, formats): t for t in tickers}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    results[ticker] = future.result()
+                except Exception as e:  # worker process died
+                    results[ticker] = {'ticker': ticker, 'ok': False, 'error': f"{type(e).__name__}: {e}",
+                                       'timings': {}, 'row': None}
+                progress(results[ticker], started)
+    wall = time.perf_counter() - started
+
+    ordered = [results[t] for t in tickers]
+    if "csv" in formats:
+        write_summary_csv(ordered, os.path.join(out_dir, "summary.csv"))
+    log_summary(ordered, wall, workers, log)
+    return ordered
+
+
+def write_summary_csv(results, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        for result in results:
+            row = dict(result['row'] or {'ticker': result['ticker']})
+            row.update(status="ok" if result['ok'] else "failed", error=result['error'] or "",
+                       seconds=round(sum(result['timings'].values()), 3))
+            writer.writerow(row)
+
+
+def log_summary(results, wall, workers, log=print):
+    ok = [r for r in results if r['ok']]
+    failed = [r for r in results if not r['ok']]
+    log(f"\n{len(ok)} ok, {len(failed)} failed in {wall:.1f}s on {workers} worker(s)"
+        f" ({len(results) / wall if wall else 0.0:.1f} reports/s)")
+    if ok:
+        totals = sorted(sum(r['timings'].values()) for r in ok)
+        p95 = totals[min(len(totals) - 1, int(0.95 * len(totals)))]
+        log(f"per ticker: mean {statistics.mean(totals):.2f}s  median {statistics.median(totals):.2f}s  "
+            f"p95 {p95:.2f}s  max {totals[-1]:.2f}s")
+        for stage in STAGES:
+            log(f"  {stage:13s} mean {statistics.mean(r['timings'].get(stage, 0.0) for r in ok):.3f}s")
+    for r in failed:
+        log(f"FAILED {r['ticker']}: {r['error']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("watchlist", help="file with one ticker per line")
+    parser.add_argument("--format", default=",".join(FORMATS),
+                        help="comma-separated outputs: json, html, csv (summary)")
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--period", default="2y", help="daily history analysed per ticker")
+    parser.add_argument("--suffix", default=".NS", help="exchange suffix for bare symbols")
+    parser.add_argument("--provider", default=None,
+                        help="data provider spec (yfinance, record:<dir>, replay:<dir>[@latency])")
+    args = parser.parse_args(argv)
+
+    formats = tuple(f.strip().lower() for f in args.format.split(",") if f.strip())
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(sorted(unknown))}")
+    tickers = read_watchlist(args.watchlist, args.suffix)
+    if not tickers:
+        parser.error(f"no tickers in {args.watchlist}")
+
+    results = run(tickers, args.out, formats, args.workers, args.period, args.provider)
+    return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
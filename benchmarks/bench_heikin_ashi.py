@@ -0,0 +1,74 @@
+"""
+Benchmark: Heikin-Ashi routine vs the copy-based version get_stock_data used.
+
+    python -m benchmarks.bench_heikin_ashi [--repeat 5]
+
+Runs both on the indicator frame v3 caches (OHLCV plus the indicator columns) over
+1y, 5y and 20y histories and reports time, peak traced memory and the retained
+size of the result, plus how far the old non-recursive HA_Open drifts from the
+recursive definition.
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.synthetic import HISTORY_BARS, synthetic_ohlcv
+
+HISTORIES = ("1y", "5y", "20y")
+
+
+def copy_heikin_ashi(df):
+    """The previous routine: full copy of `df`, HA_Open from the raw prior candle"""
+    df_ha = df.copy()
+    df_ha['HA_Close'] = (df['Open'] + df['High'] + df['Low'] + df['Close']) / 4
+    df_ha['HA_Open'] = (df['Open'].shift(1) + df['Close'].shift(1)) / 2
+    df_ha.iloc[0, df_ha.columns.get_loc('HA_Open')] = (df.iloc[0]['Open'] + df.iloc[0]['Close']) / 2
+    df_ha['HA_High'] = df_ha[['High', 'HA_Open', 'HA_Close']].max(axis=1)
+    df_ha['HA_Low'] = df_ha[['Low', 'HA_Open', 'HA_Close']].min(axis=1)
+    return df_ha
+
+
+def _measure(func, repeat):
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), statistics.median(timings), peak, int(result.memory_usage(deep=True).sum())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    from analysis import heikin_ashi
+    from indicators import indicator_frame
+
+    print(f"{'history':8s} {'bars':>6s} {'version':8s} {'best ms':>9s} {'peak KiB':>10s} "
+          f"{'result KiB':>11s} {'cols':>5s}")
+    for label in HISTORIES:
+        df = synthetic_ohlcv(HISTORY_BARS[label])
+        frame = df.join(indicator_frame(df))
+        for version, func in (("copy", copy_heikin_ashi), ("lean", heikin_ashi)):
+            best, _, peak, retained = _measure(lambda: func(frame), args.repeat)
+            cols = len(func(frame.iloc[:2]).columns)
+            print(f"{label:8s} {len(frame):6d} {version:8s} {best * 1e3:9.3f} {peak / 1024:10.1f} "
+                  f"{retained / 1024:11.1f} {cols:5d}")
+        drift = np.abs(copy_heikin_ashi(frame)['HA_Open'] - heikin_ashi(frame)['HA_Open']) / frame['Close']
+        print(f"{'':8s} {'':6s} HA_Open drift of the copy version: max {drift.max():.2%}, "
+              f"mean {drift.mean():.2%} of Close")
+
+
+if __name__ == "__main__":
+    main()
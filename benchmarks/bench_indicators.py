@@ -0,0 +1,83 @@
+"""
+Benchmark: NumPy indicator kernel vs the apps' df.ta chain.
+
+    python -m benchmarks.bench_indicators [--repeat 5]
+
+Times import cost and full-set computation on 5y, 20y and intraday-length series.
+The pandas_ta side is skipped when pandas_ta is not installed.
+"""
+import argparse
+import importlib
+import statistics
+import sys
+import time
+
+from benchmarks.synthetic import HISTORY_BARS, synthetic_ohlcv
+
+
+def _time_import(module):
+    sys.modules.pop(module, None)
+    start = time.perf_counter()
+    importlib.import_module(module)
+    return time.perf_counter() - start
+
+
+def _best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings)
+
+
+def pandas_ta_chain(df):
+    """The df.ta chain get_stock_data used (append=True on a copy)"""
+    import pandas as pd
+    import pandas_ta as ta
+
+    df = df.copy()
+    df.ta.ema(length=20, append=True)
+    df.ta.ema(length=50, append=True)
+    df.ta.ema(length=200, append=True)
+    df.ta.rsi(length=14, append=True)
+    df.ta.macd(append=True)
+    df.ta.adx(length=14, append=True)
+    df.ta.cmf(append=True)
+    df.ta.bbands(length=20, std=2, append=True)
+    df.ta.psar(append=True)
+    df.ta.atr(length=14, append=True)
+    ichimoku = ta.ichimoku(df['High'], df['Low'], df['Close'], lookahead=False)
+    df = pd.concat([df, ichimoku[0]], axis=1)
+    df.ta.cdl_pattern(name=["doji"], append=True)
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"import indicators: {_time_import('indicators') * 1e3:8.1f} ms")
+    try:
+        print(f"import pandas_ta:  {_time_import('pandas_ta') * 1e3:8.1f} ms")
+        has_pandas_ta = True
+    except ImportError:
+        print("import pandas_ta:  not installed (df.ta column skipped)")
+        has_pandas_ta = False
+
+    from indicators import indicator_frame
+
+    print(f"\n{'series':10s} {'bars':>7s} {'kernel ms':>11s} {'df.ta ms':>11s} {'speedup':>8s}")
+    for label in ("5y", "20y", "intraday"):
+        df = synthetic_ohlcv(HISTORY_BARS[label], freq="min" if label == "intraday" else "B")
+        kernel, _ = _best_of(lambda: df.join(indicator_frame(df)), args.repeat)
+        if has_pandas_ta:
+            chain, _ = _best_of(lambda: pandas_ta_chain(df), args.repeat)
+            print(f"{label:10s} {len(df):7d} {kernel * 1e3:11.2f} {chain * 1e3:11.2f} {chain / kernel:7.1f}x")
+        else:
+            print(f"{label:10s} {len(df):7d} {kernel * 1e3:11.2f} {'-':>11s} {'-':>8s}")
+
+
+if __name__ == "__main__":
+    main()
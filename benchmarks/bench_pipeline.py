@@ -0,0 +1,231 @@
+"""
+Benchmark: data, analysis and render hot paths of both dashboards.
+
+    python -m benchmarks.bench_pipeline [--repeat 5] [--output bench_pipeline.json]
+                                        [--replay DIR] [--universe-history 1y]
+
+Times (best and median of --repeat runs) and peak traced memory for the indicator
+computation in get_stock_data (cold stream, rerun refresh, NumPy kernel), a live-mode
+forming-bar update, calculate_signal_strength, analyze_technicals,
+generate_fundamental_analysis, identify_patterns, the full-history signal series,
+Heikin-Ashi and the Chart tab figure (build, JSON serialization, decimated build +
+serialization, cached style/overlay toggles) over 1y, 5y and 20y histories, plus a
+per-ticker screen, the screener's scoring, the leaderboard ranking and the verdict
+backtest over 15, 200 and 500-ticker universes.
+
+Runs offline on synthetic series, or on a record/replay capture (see providers.py)
+with --replay. Results are written as JSON for release-to-release comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import HISTORY_BARS, UNIVERSE_SIZES, synthetic_ohlcv, synthetic_universe
+
+HISTORIES = ("1y", "5y", "20y")
+
+SAMPLE_INFO = {
+    'returnOnEquity': 0.18, 'profitMargins': 0.12, 'debtToEquity': 40,
+    'trailingPE': 22.0, 'forwardPE': 20.0, 'freeCashflow': 1e9,
+}
+SAMPLE_FINANCIALS = pd.DataFrame(
+    [[1.2e11, 1.1e11, 1.0e11, 0.9e11]], index=['Total Revenue'],
+    columns=pd.to_datetime(['2025-03-31', '2024-03-31', '2023-03-31', '2022-03-31'])
+)
+
+
+# --- 1. MEASUREMENT ---
+def measure(func, repeat):
+    """Best/median wall time over `repeat` runs (after one warm-up) and peak traced memory"""
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'best_s': min(timings), 'median_s': statistics.median(timings), 'peak_bytes': peak}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# --- 2. INPUT DATA ---
+def load_histories(replay_dir=None, ticker=None):
+    """{history label: OHLCV frame}; from a replay capture the longest recorded series is sliced"""
+    if replay_dir is None:
+        return {label: synthetic_ohlcv(HISTORY_BARS[label]) for label in HISTORIES}, "synthetic"
+
+    from providers import ReplayProvider
+    provider = ReplayProvider(replay_dir)
+    df = provider.history(ticker, "1d", period="max")
+    if df.empty:
+        raise SystemExit(f"No recorded daily history for {ticker} in {replay_dir}")
+    return {label: df.iloc[-HISTORY_BARS[label]:] for label in HISTORIES}, f"replay:{replay_dir}:{ticker}"
+
+
+def load_universe(size, bars, replay_dir=None):
+    if replay_dir is None:
+        return synthetic_universe(size, bars)
+
+    from providers import ReplayProvider
+    provider = ReplayProvider(replay_dir)
+    history_dir = os.path.join(replay_dir, "history", "1d")
+    tickers = sorted(name[:-len(".pkl")] for name in os.listdir(history_dir) if name.endswith(".pkl"))
+    frames = {t: provider.history(t, "1d", period="max").iloc[-bars:] for t in tickers[:size]}
+    return {t: df for t, df in frames.items() if len(df) > 1}
+
+
+# --- 3. CASES ---
+def history_cases(df):
+    """(name, callable) pairs for one ticker's history"""
+    from analysis import (analyze_technicals, calculate_signal_strength, generate_fundamental_analysis,
+                          heikin_ashi, identify_patterns, signal_series)
+    from charts import ChartBuilder, build_price_chart
+    from decimation import DEFAULT_CHART_WIDTH
+    from indicators import indicator_frame
+    from live_feed import LiveBar, apply_bar, with_forming_bar
+    from streaming_indicators import StreamingIndicators
+    from timeframes import resample_ohlcv
+
+    frame = df.join(indicator_frame(df))
+    weekly = resample_ohlcv(df, "1wk")
+    weekly = weekly.join(indicator_frame(weekly)[['RSI_14', 'EMA_50']])
+    frame_ha = heikin_ashi(frame)
+
+    warm = StreamingIndicators()
+    warm.append("bench", df)
+
+    last = df.iloc[-1]
+    bar = LiveBar(1, df.index[-1], last['Open'], last['High'] * 1.001, last['Low'], last['Close'] * 1.001,
+                  last['Volume'] + 1000)
+
+    def live_tick():
+        daily = apply_bar(df, bar)
+        return with_forming_bar(frame, frame_ha, bar, warm.forming("bench", daily))
+
+    def chart():
+        return build_price_chart(frame, frame_ha, "Candle", True, True)
+
+    figure = chart()
+    builder = ChartBuilder()
+    return [
+        ("indicators_cold", lambda: StreamingIndicators().append("bench", df)),
+        ("indicators_refresh", lambda: warm.append("bench", df)),
+        ("live_tick", live_tick),
+        ("indicator_kernel", lambda: indicator_frame(df)),
+        ("calculate_signal_strength", lambda: calculate_signal_strength(frame)),
+        ("analyze_technicals", lambda: analyze_technicals(frame, weekly)),
+        ("identify_patterns", lambda: identify_patterns(frame)),
+        ("signal_series", lambda: signal_series(frame, weekly)),
+        ("generate_fundamental_analysis", lambda: generate_fundamental_analysis(SAMPLE_INFO, SAMPLE_FINANCIALS)),
+        ("heikin_ashi", lambda: heikin_ashi(frame)),
+        ("chart_build", chart),
+        ("chart_build_heikin_ashi", lambda: build_price_chart(frame, frame_ha, "Heikin-Ashi", True, True)),
+        ("chart_serialize", lambda: figure.to_json()),
+        ("chart_decimated", lambda: build_price_chart(frame, frame_ha, "Candle", True, True,
+                                                      width=DEFAULT_CHART_WIDTH).to_json()),
+        ("chart_cached_toggle", lambda: [
+            builder.figure("bench", "all", frame, frame_ha, style, bb, True, DEFAULT_CHART_WIDTH)
+            for style in ("Candle", "Heikin-Ashi") for bb in (False, True)
+        ]),
+    ]
+
+
+def universe_cases(frames):
+    from analysis import calculate_signal_strength
+    from backtest import backtest
+    from indicators import indicator_frame
+    from market_snapshot import rank_leaderboards
+    from screener import score_ticker
+
+    close = pd.DataFrame({t: df['Close'] for t, df in frames.items()}).iloc[-5:]
+    volume = pd.DataFrame({t: df['Volume'] for t, df in frames.items()}).iloc[-5:]
+
+    def screen():
+        return {t: calculate_signal_strength(df.join(indicator_frame(df))) for t, df in frames.items()}
+
+    return [
+        ("universe_screen", screen),
+        ("screener_rows", lambda: [score_ticker(t, df) for t, df in frames.items()]),
+        ("leaderboard_rank", lambda: rank_leaderboards(close, volume, 10)),
+        ("backtest_verdict", lambda: [backtest(df, ticker=t) for t, df in frames.items()]),
+    ]
+
+
+# --- 4. RUNNER ---
+def run(repeat=5, replay_dir=None, ticker="RELIANCE.NS", universe_history="1y", universe_repeat=1):
+    results = []
+    histories, source = load_histories(replay_dir, ticker)
+
+    for label, df in histories.items():
+        for name, func in history_cases(df):
+            row = {'case': name, 'history': label, 'bars': len(df), 'tickers': 1, 'repeat': repeat}
+            row.update(measure(func, repeat))
+            results.append(row)
+            print(f"{name:30s} {label:>4s} {len(df):6d} bars  {row['best_s'] * 1e3:10.3f} ms  "
+                  f"{row['peak_bytes'] / 2 ** 20:8.2f} MiB", flush=True)
+
+    bars = HISTORY_BARS[universe_history]
+    for size in UNIVERSE_SIZES.values():
+        frames = load_universe(size, bars, replay_dir)
+        for name, func in universe_cases(frames):
+            row = {'case': name, 'history': universe_history, 'bars': bars, 'tickers': len(frames),
+                   'repeat': universe_repeat}
+            row.update(measure(func, universe_repeat))
+            results.append(row)
+            print(f"{name:30s} {len(frames):4d} tickers  {row['best_s'] * 1e3:10.1f} ms  "
+                  f"{row['peak_bytes'] / 2 ** 20:8.2f} MiB", flush=True)
+
+    meta = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'git_revision': _git_revision(),
+        'data': source,
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+    }
+    return {'meta': meta, 'results': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per single-ticker case")
+    parser.add_argument("--universe-repeat", type=int, default=1, help="timed runs per universe case")
+    parser.add_argument("--universe-history", default="1y", choices=HISTORIES)
+    parser.add_argument("--replay", metavar="DIR", help="record/replay capture to use instead of synthetic data")
+    parser.add_argument("--ticker", default="RELIANCE.NS", help="recorded ticker for the history cases")
+    parser.add_argument("--output", default="bench_pipeline.json")
+    args = parser.parse_args(argv)
+
+    report = run(args.repeat, args.replay, args.ticker, args.universe_history, args.universe_repeat)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {len(report['results'])} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Deterministic synthetic OHLCV series for offline benchmarks and equivalence checks.
+"""
+import numpy as np
+import pandas as pd
+
+# Bars per history length (trading days, or 1-minute bars for 'intraday')
+HISTORY_BARS = {"1y": 252, "5y": 1260, "20y": 5040, "intraday": 60 * 375}
+
+
+def synthetic_ohlcv(n, seed=0, freq="B", start="2000-01-03"):
+    """Geometric random walk with consistent OHLC and lognormal-ish volume"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+    open_ = close * np.exp(rng.normal(0, 0.005, n))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.006, n)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.006, n)))
+    volume = rng.integers(100_000, 5_000_000, n).astype(float)
+    index = pd.date_range(start, periods=n, freq=freq)
+    return pd.DataFrame(
+        {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+        index=index
+    )
+
+# Universe sizes: a NIFTY-50-style watchlist sample, NIFTY 200 and NIFTY 500
+UNIVERSE_SIZES = {"15": 15, "200": 200, "500": 500}
+
+
+def synthetic_universe(tickers, n, freq="B"):
+    """{ticker: synthetic_ohlcv} with one seed per ticker, all on the same dates"""
+    return {f"SYN{i:03d}.NS": synthetic_ohlcv(n, seed=1000 + i, freq=freq) for i in range(tickers)}
@@ -0,0 +1,83 @@
+"""
+Equivalence check: backtest's vectorized simulation vs a naive per-bar loop.
+
+    python -m benchmarks.verify_backtest [--bars 2520] [--seeds 20] [--rtol 1e-9]
+
+Random position series (long-only and long/short) and fixed cases, including a
+long -> short flip whose exit and entry costs fall on the same bar. Compares final
+equity and every trade return and exits non-zero on any mismatch.
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from backtest import simulate, trade_returns
+
+COST_BPS, SLIPPAGE_BPS = 10.0, 5.0
+
+# (name, close, positions decided at each close)
+FIXED_CASES = [
+    ("long then flat", [100, 101, 102, 103, 102, 101, 100, 101], [1, 1, 1, 0, 0, 0, 0, 0]),
+    ("long -> short flip", [100, 101, 102, 103, 102, 101, 100, 101], [1, 1, -1, -1, -1, 0, 0, 0]),
+    ("short -> long flip, open at the end", [100, 99, 98, 99, 100, 101, 102, 103], [-1, -1, 1, 1, 1, 1, 1, 1]),
+]
+
+
+def naive(close, positions, rate):
+    """Bar-by-bar ledger -> (final equity, [trade returns])"""
+    equity, trades = 1.0, []
+    held, growth = 0.0, None
+    for t in range(len(close)):
+        new = positions[t - 1] if t > 0 else 0.0
+        ret = close[t] / close[t - 1] - 1 if t > 0 else 0.0
+        entry_cost = 0.0
+        if new != held:
+            if held != 0:
+                trades.append(growth * (1 - abs(held) * rate) - 1)
+            growth = 1.0 if new != 0 else None
+            entry_cost = abs(new) * rate
+        equity *= 1 + new * ret - abs(new - held) * rate
+        if new != 0:
+            growth *= 1 + new * ret - entry_cost
+        held = new
+    if held != 0:
+        trades.append(growth - 1)
+    return equity, trades
+
+
+def check(name, close, positions, rtol):
+    close = np.asarray(close, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    rate = (COST_BPS + SLIPPAGE_BPS) / 1e4
+    held, net, _ = simulate(close, positions, COST_BPS, SLIPPAGE_BPS)
+    equity, trades = np.prod(1 + net), trade_returns(held, net, rate)
+    ref_equity, ref_trades = naive(close, positions, rate)
+    ok = (np.isclose(equity, ref_equity, rtol=rtol) and len(trades) == len(ref_trades)
+          and np.allclose(trades, ref_trades, rtol=rtol, atol=1e-15))
+    err = np.max(np.abs(trades - ref_trades)) if len(trades) == len(ref_trades) and len(trades) else np.nan
+    print(f"  {'OK  ' if ok else 'FAIL'} {name:<40} trades={len(trades):<4} max-abs-err={err:.2e}")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bars", type=int, default=2520)
+    parser.add_argument("--seeds", type=int, default=20)
+    parser.add_argument("--rtol", type=float, default=1e-9)
+    args = parser.parse_args(argv)
+
+    ok = all([check(name, close, positions, args.rtol) for name, close, positions in FIXED_CASES])
+    for seed in range(args.seeds):
+        rng = np.random.default_rng(seed)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, args.bars)))
+        # Runs of random length, so trades last more than a bar
+        states = [0.0, 1.0] if seed % 2 == 0 else [-1.0, 0.0, 1.0]
+        positions = np.repeat(rng.choice(states, args.bars), rng.integers(1, 15, args.bars))[:args.bars]
+        kind = "long-only" if seed % 2 == 0 else "long/short"
+        ok &= check(f"random {kind} seed={seed}", close, positions, args.rtol)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
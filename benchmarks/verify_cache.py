@@ -0,0 +1,135 @@
+"""
+Concurrency check: a page lookup that misses while a prefetch refresh of the same
+key is in flight must load as usual, whatever the refresh ends with.
+
+    python -m benchmarks.verify_cache
+
+Cases (the refresh is held in flight while the page looks the key up):
+    leased  another process holds the refresh lease (refresh returns None)
+    empty   the refresh's load comes back empty (refresh raises, entry kept)
+    failed  the refresh's load raises, and so does the page's: the page gets the
+            stale value (stale-while-revalidate) instead of the error
+Exits non-zero if any page lookup gets anything but the expected value.
+"""
+import sys
+import threading
+import time
+
+from data_cache import cached, clear_cache, set_shared_backend
+
+WAIT = 5.0
+
+
+class HeldElsewhere:
+    """Shared tier whose refresh leases another process holds; claim() blocks until released"""
+
+    def __init__(self):
+        self.claiming = threading.Event()
+        self.release = threading.Event()
+
+    def get(self, source, key):
+        return False, None, 0.0
+
+    def set(self, source, key, value, ttl):
+        pass
+
+    def clear(self, source=None):
+        pass
+
+    def claim(self, source, key, seconds):
+        self.claiming.set()
+        self.release.wait(WAIT)
+        return False
+
+
+class Loader:
+    """Plays `script` (one outcome per call: a value, 'empty', or an exception); 'hold' marks the call to block"""
+
+    def __init__(self, script, hold=None):
+        self.script = list(script)
+        self.hold = hold
+        self.calls = 0
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker):
+        with self._lock:
+            call = self.calls
+            self.calls += 1
+        if call == self.hold:
+            self.entered.set()
+            self.release.wait(WAIT)
+        outcome = self.script[min(call, len(self.script) - 1)]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return (None, None) if outcome == 'empty' else outcome
+
+
+LOADER = None
+
+
+@cached('history')
+def load_history(ticker):
+    return LOADER(ticker)
+
+
+def _run(target, out):
+    def go():
+        try:
+            out['value'] = target()
+        except Exception as e:
+            out['error'] = e
+    thread = threading.Thread(target=go, daemon=True)
+    thread.start()
+    return thread
+
+
+def case(name, loader, in_flight, release, expected, prepare=None, backend=None):
+    global LOADER
+    LOADER = loader
+    set_shared_backend(backend)
+    clear_cache('history')
+    if prepare:
+        prepare()
+
+    refreshed, page = {}, {}
+    refresher = _run(lambda: load_history.refresh("X.NS", lease=60), refreshed)
+    in_flight.wait(WAIT)
+    looker = _run(lambda: load_history("X.NS"), page)
+    # A page waiting on the refresh flight would still be blocked here
+    looker.join(1.0)
+    blocked = looker.is_alive()
+    release.set()
+    refresher.join(WAIT)
+    looker.join(WAIT)
+
+    ok = not blocked and page.get('value') == expected
+    got = page.get('error', page.get('value'))
+    refresh = refreshed.get('error', refreshed.get('value'))
+    print(f"  {'OK  ' if ok else 'FAIL'} {name:<8} page={got!r:<22} refresh={refresh!r}"
+          f"{'  (page waited on the refresh)' if blocked else ''}")
+    return ok
+
+
+def main():
+    ok = True
+
+    backend = HeldElsewhere()
+    ok &= case("leased", Loader(["fresh"]), backend.claiming, backend.release, "fresh", backend=backend)
+
+    loader = Loader(['empty', "fresh"], hold=0)
+    ok &= case("empty", loader, loader.entered, loader.release, "fresh")
+
+    loader = Loader(["old", RuntimeError("upstream down")], hold=1)
+
+    def expired_entry():
+        load_history.refresh("X.NS", ttl=0.05)
+        time.sleep(0.1)
+    ok &= case("failed", loader, loader.entered, loader.release, "old", prepare=expired_entry)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
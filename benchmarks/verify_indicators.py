@@ -0,0 +1,86 @@
+"""
+Equivalence check: NumPy kernel and streaming engine vs the apps' pandas_ta chain.
+
+    python -m benchmarks.verify_indicators [--bars 1260] [--rtol 1e-9]
+
+Runs the kernel, the engine in one pass and the engine bar-by-bar (appended in
+chunks), compares every column with pandas_ta and exits non-zero on any mismatch.
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_ohlcv
+from indicators import indicator_frame
+from streaming_indicators import INDICATOR_COLUMNS, IndicatorEngine, StreamingIndicators
+
+
+def pandas_ta_reference(df):
+    """The df.ta chain from get_stock_data, with column names normalized"""
+    import pandas_ta as ta
+
+    df = df.copy()
+    df.ta.ema(length=20, append=True)
+    df.ta.ema(length=50, append=True)
+    df.ta.ema(length=200, append=True)
+    df.ta.rsi(length=14, append=True)
+    df.ta.macd(append=True)
+    df.ta.adx(length=14, append=True)
+    df.ta.cmf(append=True)
+    df.ta.bbands(length=20, std=2, append=True)
+    df.ta.psar(append=True)
+    df.ta.atr(length=14, append=True)
+    ichimoku = ta.ichimoku(df['High'], df['Low'], df['Close'], lookahead=False)
+    df = pd.concat([df, ichimoku[0]], axis=1)
+    df.ta.cdl_pattern(name=["doji"], append=True)
+    # pandas_ta >= 0.4 suffixes Bollinger columns with both std multipliers
+    return df.rename(columns=lambda c: c.replace('_2.0_2.0', '_2.0'))
+
+
+def compare(result, reference, rtol):
+    """Returns {column: (nan_mismatches, max_relative_error)}"""
+    report = {}
+    for col in INDICATOR_COLUMNS:
+        if col not in reference.columns:
+            continue
+        ref = reference[col].to_numpy(dtype=float)
+        got = result[col].to_numpy(dtype=float)
+        both = ~np.isnan(ref) & ~np.isnan(got)
+        err = np.abs(ref[both] - got[both]) / np.maximum(1.0, np.abs(ref[both]))
+        report[col] = (int((np.isnan(ref) != np.isnan(got)).sum()), float(err.max()) if both.any() else 0.0)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bars", type=int, default=1260)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk", type=int, default=1, help="bars appended per streaming step")
+    parser.add_argument("--rtol", type=float, default=1e-9)
+    args = parser.parse_args(argv)
+
+    df = synthetic_ohlcv(args.bars, seed=args.seed)
+    reference = pandas_ta_reference(df)
+
+    kernel = indicator_frame(df)
+    one_pass = IndicatorEngine().update_frame(df)
+    stream = StreamingIndicators()
+    warmup = min(len(df), 250)
+    streamed = stream.append("SYNTH", df.iloc[:warmup])
+    for end in range(warmup + args.chunk, len(df) + args.chunk, args.chunk):
+        streamed = stream.append("SYNTH", df.iloc[:end])
+
+    failed = False
+    for label, result in (("kernel", kernel), ("one-pass", one_pass), ("streamed", streamed)):
+        print(f"\n{label}")
+        for col, (nan_mismatch, err) in compare(result, reference, args.rtol).items():
+            ok = nan_mismatch == 0 and err <= args.rtol
+            failed |= not ok
+            print(f"  {'OK  ' if ok else 'FAIL'} {col:18s} nan-mismatch={nan_mismatch:<4d} max-rel-err={err:.2e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Plotly figure builders for the dashboards (no Streamlit calls, so they can be
+benchmarked and reused headless).
+
+A figure is assembled from cached parts: trace data per component (candles,
+Heikin-Ashi, EMAs, Bollinger Bands, volume) and the subplot layout. Each part is
+validated once when it is built; assembly skips Plotly's validation, so toggling
+an overlay or the chart style only reuses what is already there.
+"""
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from decimation import decimate_line, ohlc_buckets, point_budget
+from telemetry import span
+
+INCREASING = '#10b981'
+DECREASING = '#ef4444'
+
+
+# --- 1. TRACE DATA ---
+def volume_colors(df):
+    """Red for down bars (close < open), green otherwise"""
+    return np.where(df['Close'].to_numpy() < df['Open'].to_numpy(), DECREASING, INCREASING)
+
+
+class PriceTraces:
+    """
+    Lazily built trace dicts for one display frame. `width` (px) enables decimation:
+    ranges longer than the point budget are bucketed (candles, volume), lines are
+    thinned with LTTB and drawn with WebGL.
+    """
+
+    def __init__(self, df_display, df_ha_display, width=None):
+        self.df_display = df_display
+        self.df_ha_display = df_ha_display
+        self.width = width
+        self.max_candles = self.max_points = None
+        if width is not None:
+            self.max_candles, self.max_points = point_budget(width)
+        self._parts = {}
+
+    def get(self, part):
+        """'Candle', 'Heikin-Ashi', 'ema', 'bb' or 'volume' -> list of trace dicts"""
+        if part not in self._parts:
+            build = {'Candle': self._candle, 'Heikin-Ashi': self._heikin_ashi,
+                     'ema': self._ema, 'bb': self._bb, 'volume': self._volume}[part]
+            self._parts[part] = [trace.to_plotly_json() for trace in build()]
+        return self._parts[part]
+
+    def _bars(self, df):
+        if self.max_candles is not None and len(df) > self.max_candles:
+            return ohlc_buckets(df, self.max_candles)
+        return df
+
+    def _line(self, col):
+        y = self.df_display[col]
+        return y if self.max_points is None else decimate_line(y, self.max_points)
+
+    @property
+    def _line_trace(self):
+        return go.Scatter if self.width is None else go.Scattergl
+
+    def _candle(self):
+        df = self._bars(self.df_display)
+        return [go.Candlestick(
+            x=df.index, open=df['Open'], high=df['High'], low=df['Low'], close=df['Close'],
+            name="Price", increasing_line_color=INCREASING, decreasing_line_color=DECREASING,
+            xaxis='x', yaxis='y'
+        )]
+
+    def _heikin_ashi(self):
+        df = self._bars(self.df_ha_display)
+        return [go.Candlestick(
+            x=df.index, open=df['HA_Open'], high=df['HA_High'], low=df['HA_Low'], close=df['HA_Close'],
+            name="Heikin Ashi", increasing_line_color=INCREASING, decreasing_line_color=DECREASING,
+            xaxis='x', yaxis='y'
+        )]
+
+    def _ema(self):
+        traces = []
+        for col, color, width, name in (('EMA_20', '#f59e0b', 1.5, "EMA20"),
+                                        ('EMA_50', '#facc15', 1.5, "EMA50"),
+                                        ('EMA_200', '#00d4ff', 2, "EMA200")):
+            y = self._line(col)
+            traces.append(self._line_trace(x=y.index, y=y, line=dict(color=color, width=width), name=name,
+                                           xaxis='x', yaxis='y'))
+        return traces
+
+    def _bb(self):
+        traces = []
+        for col, name in (('BBU_20_2.0', "BB-U"), ('BBL_20_2.0', "BB-L")):
+            y = self._line(col)
+            traces.append(self._line_trace(x=y.index, y=y, line=dict(color='#6b7280', width=1, dash='dot'), name=name,
+                                           xaxis='x', yaxis='y'))
+        return traces
+
+    def _volume(self):
+        df = self._bars(self.df_display)
+        return [go.Bar(x=df.index, y=df['Volume'], marker_color=volume_colors(df), name="Volume",
+                       showlegend=False, xaxis='x2', yaxis='y2')]
+
+
+# --- 2. FIGURE ASSEMBLY ---
+@lru_cache(maxsize=2)
+def _layout(show_volume):
+    fig = make_subplots(
+        rows=2 if show_volume else 1, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.03,
+        row_heights=[0.75, 0.25] if show_volume else [1]
+    )
+    fig.update_layout(
+        height=650,
+        template="plotly_dark",
+        xaxis_rangeslider_visible=False,
+        hovermode='x unified',
+        plot_bgcolor='rgba(15, 15, 40, 0.5)'
+    )
+    return fig.layout.to_plotly_json()
+
+
+def assemble_figure(traces, chart_style, show_bb, show_volume):
+    """Chart tab figure from a PriceTraces: price, EMAs, optional BB and volume"""
+    parts = ["Heikin-Ashi" if chart_style == "Heikin-Ashi" else "Candle", "ema"]
+    if show_bb:
+        parts.append("bb")
+    if show_volume:
+        parts.append("volume")
+    data = [trace for part in parts for trace in traces.get(part)]
+    # Parts were validated when built: skip re-validating the whole figure
+    return go.Figure({'data': data, 'layout': _layout(show_volume)}, skip_invalid=True, _validate=False)
+
+
+def build_price_chart(df_display, df_ha_display, chart_style, show_bb, show_volume, width=None):
+    """Chart tab figure: price (candles or Heikin-Ashi), EMAs, optional BB and volume"""
+    return assemble_figure(PriceTraces(df_display, df_ha_display, width), chart_style, show_bb, show_volume)
+
+
+# --- 3. CACHED BUILDER ---
+class ChartBuilder:
+    """
+    Caches trace data per (ticker, last bar, range, width) and assembled figures per
+    (..., style, overlays). A new or revised last bar changes the key.
+    Cached figures are shared between sessions: treat them as read-only.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._traces = OrderedDict()
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lru_get(self, cache, key):
+        with self._lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+
+    def _lru_set(self, cache, key, value):
+        with self._lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.max_entries:
+                cache.popitem(last=False)
+
+    @staticmethod
+    def base_key(ticker, chart_range, df_display, width=None):
+        last = df_display.iloc[-1]
+        return (ticker, df_display.index[-1], float(last['Close']), float(last['Volume']), chart_range, width)
+
+    def figure(self, ticker, chart_range, df_display, df_ha_display, chart_style, show_bb, show_volume, width=None):
+        base = self.base_key(ticker, chart_range, df_display, width)
+        key = base + (chart_style, bool(show_bb), bool(show_volume))
+        with span("figure", chart="price") as timing:
+            fig = self._lru_get(self._figures, key)
+            if fig is not None:
+                timing.labels['cache'] = "hit"
+                return fig
+
+            traces = self._lru_get(self._traces, base)
+            timing.labels['cache'] = "miss" if traces is None else "traces"
+            if traces is None:
+                traces = PriceTraces(df_display, df_ha_display, width)
+                self._lru_set(self._traces, base, traces)
+            fig = assemble_figure(traces, chart_style, show_bb, show_volume)
+            self._lru_set(self._figures, key, fig)
+            return fig
+
+
+# Process-wide builder used by the v3 Chart tab
+CHART_BUILDER = ChartBuilder()
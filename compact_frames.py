@@ -0,0 +1,63 @@
+"""
+Compact in-memory form for cached indicator frames: only the columns a dashboard
+reads, downcast to float32 and held as one Fortran-ordered block, so the frame is
+a single allocation with contiguous columns. Indicator values are computed in
+float64 before the cast.
+
+float32 keeps 24 significant bits: prices below FLOAT32_PRICE_LIMIT (2**17, about
+₹1.31 lakh) stay exact to the paise, so frames whose prices reach it (e.g. MRF)
+keep float64. Volume is always float64 in a block of its own, since float32 counts
+are only exact up to 2**24 (about 16.8 million shares).
+
+Set STOCK_APP_COMPACT=0 to cache the full float64 frames instead.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+COMPACT_FRAMES = os.environ.get("STOCK_APP_COMPACT", "1").lower() not in ("0", "off", "false", "no")
+
+# Above this price float32's spacing (1/64) is coarser than a paisa
+FLOAT32_PRICE_LIMIT = 2 ** 17
+# Columns never downcast
+FLOAT64_COLUMNS = ['Volume']
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+# Columns pro_stock_analyst_v3 reads: header, scoring, Chart, Technicals, signal history.
+# Candlestick pattern flags (CDL_*) are always kept for the Patterns tab.
+V3_COLUMNS = [
+    'Open', 'High', 'Low', 'Close', 'Volume',
+    'EMA_20', 'EMA_50', 'EMA_200',
+    'RSI_14', 'MACD_12_26_9', 'MACDs_12_26_9',
+    'CMF_20', 'BBU_20_2.0', 'BBL_20_2.0',
+]
+
+
+def compact_frame(df, columns=None, dtype=np.float32):
+    """
+    `df` reduced to `columns` (default: all) plus its CDL_ columns, as one `dtype`
+    block sharing df's index, and FLOAT64_COLUMNS as a float64 block after it.
+    Prices at or above FLOAT32_PRICE_LIMIT keep the whole frame in float64.
+    Columns the frame lacks are skipped.
+    """
+    if columns is None:
+        keep = list(df.columns)
+    else:
+        wanted = set(columns)
+        keep = [c for c in df.columns if c in wanted or str(c).startswith('CDL_')]
+    prices = [c for c in PRICE_COLUMNS if c in df.columns]
+    if prices and np.nanmax(np.abs(df[prices].to_numpy(dtype=float)), initial=0.0) >= FLOAT32_PRICE_LIMIT:
+        dtype = np.float64
+    wide = [] if np.dtype(dtype) == np.float64 else [c for c in keep if c in FLOAT64_COLUMNS]
+    narrow = [c for c in keep if c not in FLOAT64_COLUMNS]
+    frames = []
+    for names, block_dtype in ((narrow, dtype), (wide, np.float64)):
+        if names:
+            block = np.empty((len(df), len(names)), dtype=block_dtype, order='F')
+            for i, col in enumerate(names):
+                block[:, i] = df[col].to_numpy(dtype=float)
+            frames.append(pd.DataFrame(block, index=df.index, columns=names, copy=False))
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, axis=1, copy=False) if frames else df[[]]
@@ -0,0 +1,384 @@
+"""
+Tiered cache with a separate TTL policy per data source.
+Lookups go to an in-process LRU first and, for shared sources, to the cross-process
+backend (see shared_cache) next, so workers on a node reuse each other's frames.
+Concurrent misses for the same key are coalesced (see single_flight): one caller
+loads, the others wait for its value, so sessions opening the same ticker at once
+cost one download and one indicator run.
+Every source keeps hit/miss counters and the time spent loading on misses,
+so the stats show which source dominates page latency.
+
+Stale-while-revalidate: when a refresh raises (e.g. an UpstreamError while Yahoo
+throttles), the last good value is served again for up to the policy's `stale_ttl`
+and retried after RETRY_STALE seconds; `func.staleness(...)` tells pages its age.
+
+`func.refresh(...)` reloads an entry before it expires (see prefetch), so pages keep
+hitting warm entries. It never stores an empty result (a loader that turned its
+error into None or empty frames) over the entry, and for shared sources a lease
+lets one process per node refresh a key while the others read the shared entry.
+
+Cached values are shared between sessions: treat them as read-only.
+"""
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+from shared_cache import open_backend
+from single_flight import SingleFlight
+from telemetry import span
+
+# shared: also stored in the cross-process backend
+# stale_ttl: seconds past expiry the last good value is served while refreshes fail
+CachePolicy = namedtuple('CachePolicy', ['ttl', 'max_entries', 'shared', 'stale_ttl'], defaults=(False, 0))
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+CACHE_POLICIES = {
+    'history': CachePolicy(ttl=5 * MINUTE, max_entries=512, shared=True, stale_ttl=1 * DAY),  # OHLCV + indicators (compact)
+    'snapshot': CachePolicy(ttl=5 * MINUTE, max_entries=8, shared=True, stale_ttl=1 * DAY),   # leaderboard universe
+    'screen': CachePolicy(ttl=5 * MINUTE, max_entries=8, shared=True, stale_ttl=1 * DAY),     # universe screener scans
+    'quote': CachePolicy(ttl=1 * MINUTE, max_entries=64, stale_ttl=1 * HOUR),     # index quotes
+    'info': CachePolicy(ttl=10 * MINUTE, max_entries=512, stale_ttl=1 * DAY),     # yf info (price-linked ratios)
+    'profile': CachePolicy(ttl=7 * DAY, max_entries=2048),       # name, sector, industry
+    'financials': CachePolicy(ttl=1 * DAY, max_entries=512, stale_ttl=7 * DAY),   # annual statements
+    'news': CachePolicy(ttl=5 * MINUTE, max_entries=256, stale_ttl=1 * DAY),
+    'live': CachePolicy(ttl=1 * MINUTE, max_entries=64),         # frames with the live forming bar
+}
+
+# Seconds a stale value is served before the next refresh attempt
+RETRY_STALE = 30
+
+# stored: time.monotonic() the value was loaded; stale: it is served past a failed refresh
+_Entry = namedtuple('_Entry', ['expires', 'value', 'nbytes', 'stored', 'stale'])
+
+
+class SourceStats:
+    def __init__(self):
+        self.hits = 0
+        self.shared_hits = 0
+        self.coalesced = 0
+        self.stale = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.load_seconds = 0.0
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'shared_hits': self.shared_hits,
+            'coalesced': self.coalesced,
+            'stale': self.stale,
+            'misses': self.misses,
+            'prefetched': self.prefetched,
+            'hit_rate': self.hits / total if total else 0.0,
+            'load_seconds': self.load_seconds,
+            'avg_load_ms': 1e3 * self.load_seconds / self.misses if self.misses else 0.0,
+        }
+
+
+def value_nbytes(value):
+    """Approximate memory held by a cached value (frames, arrays and containers of them)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True, index=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(value_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(value_nbytes(k) + value_nbytes(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+def is_empty(value):
+    """True for None, empty frames and containers holding nothing else (e.g. (None, None))"""
+    if value is None:
+        return True
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return value.size == 0
+    if isinstance(value, dict):
+        return all(is_empty(v) for v in value.values())
+    if isinstance(value, (tuple, list)):
+        return all(is_empty(v) for v in value)
+    return False
+
+
+class TTLCache:
+    """LRU dict whose entries expire `ttl` seconds after they were stored"""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = SourceStats()
+        self.flight = SingleFlight()
+
+    def get(self, key):
+        """Returns (found, value)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires < time.monotonic():
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry.value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.policy.ttl if ttl is None else ttl
+        nbytes = value_nbytes(value)
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = _Entry(now + ttl, value, nbytes, now, False)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.policy.max_entries:
+                self._entries.popitem(last=False)
+
+    def revive(self, key):
+        """
+        The last value of an expired `key` while it is within stale_ttl, served again
+        for RETRY_STALE seconds -> (found, value). Keeps the value's original load time.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            # Aged from when it was loaded, so retries do not extend the stale window
+            if entry is None or entry.stored + self.policy.ttl + self.policy.stale_ttl < now:
+                return False, None
+            self._entries[key] = entry._replace(expires=now + RETRY_STALE, stale=True)
+            self._entries.move_to_end(key)
+            return True, entry.value
+
+    def staleness(self, key):
+        """Seconds since the value served for `key` was loaded if it is stale, else None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.stale:
+                return None
+            return time.monotonic() - entry.stored
+
+    def record(self, hit, load_seconds=0.0, shared=False, coalesced=False, stale=False, prefetch=False):
+        """
+        `shared`: the hit was served by the cross-process backend;
+        `coalesced`: it waited for a concurrent caller's load;
+        `stale`: a failed refresh was answered with the last good value;
+        `prefetch`: a background refresh, not a page's lookup
+        """
+        with self._lock:
+            if prefetch:
+                self.stats.prefetched += 1
+            elif hit:
+                self.stats.hits += 1
+                self.stats.shared_hits += shared
+                self.stats.coalesced += coalesced
+                self.stats.stale += stale
+            else:
+                self.stats.misses += 1
+                self.stats.load_seconds += load_seconds
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def entries(self):
+        """[(key, bytes, seconds left)] for live entries, most recently used last"""
+        now = time.monotonic()
+        with self._lock:
+            return [(key, entry.nbytes, entry.expires - now)
+                    for key, entry in self._entries.items() if entry.expires >= now]
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(entry.nbytes for entry in self._entries.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+
+CACHES = {source: TTLCache(policy) for source, policy in CACHE_POLICIES.items()}
+
+# Cross-process tier for sources with policy.shared (None: in-process only)
+SHARED_BACKEND = open_backend()
+
+
+def set_shared_backend(backend):
+    """Swaps the cross-process backend (None disables it)"""
+    global SHARED_BACKEND
+    SHARED_BACKEND = backend
+
+
+def _make_key(func, signature, args, kwargs):
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    # Both apps run as __main__: the file name keeps their functions apart in the shared tier
+    origin = os.path.basename(func.__code__.co_filename)
+    return (origin, func.__module__, func.__qualname__) + tuple(bound.arguments.items())
+
+
+def _shared_get(source, key):
+    try:
+        return SHARED_BACKEND.get(source, key)
+    except Exception:
+        # The shared tier is best-effort: a locked or corrupt file is a miss
+        return False, None, 0.0
+
+
+def _shared_set(source, key, value, ttl):
+    try:
+        SHARED_BACKEND.set(source, key, value, ttl)
+    except Exception:
+        pass
+
+
+def _shared_claim(source, key, seconds):
+    try:
+        return SHARED_BACKEND.claim(source, key, seconds)
+    except Exception:
+        # Without the shared tier every process refreshes its own entries
+        return True
+
+
+def cached(source):
+    """
+    Caches a function's results under `source`'s policy. Keys are built from the
+    bound arguments, so f(x) and f(x, period=<default>) share an entry, and a
+    function re-defined on every Streamlit rerun keeps hitting the same entries.
+    """
+    cache = CACHES[source]
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def load(key, args, kwargs, refresh=False, ttl=None, lease=None):
+            """
+            -> (value, outcome); runs once per key however many sessions miss together.
+            `refresh` reloads even if an entry is still live and keeps it if that fails
+            or comes back empty; with a `lease` it skips keys another process holds.
+            """
+            shared = cache.policy.shared and SHARED_BACKEND is not None
+            if refresh and lease and shared and not _shared_claim(source, key, lease):
+                # Another process refreshes this key and writes the shared entry
+                return None, "leased"
+            if not refresh:
+                # A flight that just finished may have stored it between our miss and now
+                found, value = cache.get(key)
+                if found:
+                    return value, "hit"
+
+                if shared:
+                    found, value, ttl_left = _shared_get(source, key)
+                    if found:
+                        # Expires with the shared entry, not a fresh TTL from now
+                        cache.set(key, value, ttl=ttl_left)
+                        return value, "shared"
+
+            start = time.perf_counter()
+            try:
+                value = func(*args, **kwargs)
+            except Exception:
+                if refresh:
+                    raise
+                # Stale-while-revalidate: the last good value beats an error page
+                found, value = cache.revive(key)
+                if not found:
+                    raise
+                return value, "stale"
+            if refresh and is_empty(value):
+                raise ValueError(f"{func.__qualname__}{args} returned no data; kept the current entry")
+            cache.record(hit=False, load_seconds=time.perf_counter() - start, prefetch=refresh)
+            ttl = cache.policy.ttl if ttl is None else ttl
+            cache.set(key, value, ttl=ttl)
+            if shared:
+                _shared_set(source, key, value, ttl)
+            return value, "refresh" if refresh else "miss"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span("fetch", source=source) as timing:
+                key = _make_key(func, signature, args, kwargs)
+                found, value = cache.get(key)
+                if found:
+                    cache.record(hit=True)
+                    timing.labels['cache'] = "hit"
+                    return value
+
+                (value, outcome), leader = cache.flight.do(key, load, key, args, kwargs)
+                if not leader:
+                    outcome = "coalesced"
+                if outcome != "miss":
+                    cache.record(hit=True, shared=outcome == "shared", coalesced=not leader,
+                                 stale=outcome == "stale")
+                timing.labels['cache'] = outcome
+                return value
+
+        def staleness(*args, **kwargs):
+            """Age in seconds of the stale value served for these arguments, None if fresh"""
+            return cache.staleness(_make_key(func, signature, args, kwargs))
+
+        def refresh(*args, ttl=None, lease=None, **kwargs):
+            """
+            Reloads the entry for these arguments now, live or not, and keeps it for
+            `ttl` seconds (default: the policy's). Raises if the load fails or returns
+            nothing, leaving the current entry in place. `lease`: for shared sources,
+            seconds this process keeps the key's refresh to itself; returns None
+            without loading while another process holds it.
+            """
+            with span("fetch", source=source, cache="refresh"):
+                key = _make_key(func, signature, args, kwargs)
+                # A flight of its own: a page missing meanwhile must not wait for (and
+                # get) a refresh's outcome, which may be None, an empty-result error or
+                # a failure without the stale fallback. It loads as usual instead.
+                (value, _), _ = cache.flight.do(('refresh', key), load, key, args, kwargs, True, ttl, lease)
+                return value
+
+        wrapper.cache_source = source
+        wrapper.staleness = staleness
+        wrapper.refresh = refresh
+        return wrapper
+
+    return decorator
+
+
+def cache_stats():
+    """Per-source counters: [{'source', 'ttl', 'entries', 'hits', 'misses', ...}]"""
+    return [
+        {'source': source, 'ttl': cache.policy.ttl, 'shared': cache.policy.shared and SHARED_BACKEND is not None,
+         'entries': len(cache), 'bytes': cache.nbytes, **cache.stats.as_dict()}
+        for source, cache in CACHES.items()
+    ]
+
+
+def cache_entries(source):
+    """
+    Memory per live entry of `source`, largest first:
+    [{'function', 'args', 'bytes', 'expires_in'}]; args are the call's bound arguments
+    (e.g. one row per ticker for 'history').
+    """
+    rows = []
+    for key, nbytes, seconds_left in CACHES[source].entries():
+        rows.append({
+            'function': key[2],
+            'args': ", ".join(f"{name}={value}" for name, value in key[3:]),
+            'bytes': nbytes,
+            'expires_in': round(seconds_left),
+        })
+    return sorted(rows, key=lambda row: row['bytes'], reverse=True)
+
+
+def clear_cache(source=None):
+    """Clears the in-process entries and, for shared sources, the shared ones"""
+    for name, cache in CACHES.items():
+        if source is None or name == source:
+            cache.clear()
+            if cache.policy.shared and SHARED_BACKEND is not None:
+                SHARED_BACKEND.clear(name)
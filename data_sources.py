@@ -0,0 +1,50 @@
+"""
+Cached accessors for the per-ticker data sources, served by the active provider.
+Each source is cached under its own policy (see data_cache.CACHE_POLICIES).
+"""
+from data_cache import cached
+from providers import get_provider
+from telemetry import span
+
+# Company profile fields: change rarely, so they are cached for a week
+PROFILE_FIELDS = ('longName', 'shortName', 'sector', 'industry', 'website', 'country', 'longBusinessSummary')
+
+
+@cached('info')
+def get_info(ticker):
+    """yf.Ticker.info: quote-linked ratios and company fields"""
+    with span("upstream", call="info"):
+        return get_provider().info(ticker)
+
+
+@cached('profile')
+def get_profile(ticker):
+    """Static company profile subset of info"""
+    info = get_info(ticker)
+    return {field: info.get(field) for field in PROFILE_FIELDS if field in info}
+
+
+@cached('financials')
+def get_financials(ticker):
+    """Annual financial statements (rows = line items, columns = fiscal years)"""
+    with span("upstream", call="financials"):
+        return get_provider().financials(ticker)
+
+
+@cached('news')
+def get_news(ticker):
+    """Latest news items"""
+    with span("upstream", call="news"):
+        return get_provider().news(ticker)
+
+
+@cached('quote')
+def get_quote(symbol):
+    """Last close and % change vs the previous close, or None if unavailable"""
+    with span("upstream", call="quote"):
+        d = get_provider().history(symbol, "1d", period="2d")
+    if len(d) < 2:
+        return None
+    cp = d['Close'].iloc[-1]
+    pch = ((cp - d['Close'].iloc[-2]) / d['Close'].iloc[-2]) * 100
+    return {'price': cp, 'change_pct': pch}
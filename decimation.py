@@ -0,0 +1,119 @@
+"""
+Server-side decimation for long chart ranges. Candles are merged into OHLC buckets
+(bucket high/low keep every extreme), lines are thinned with Largest-Triangle-
+Three-Buckets, so the number of points sent to the browser is bounded by the chart
+width rather than the selected range.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHART_WIDTH = 1200   # px
+CANDLE_PX = 3                # narrowest readable candle (body + gap)
+LINE_PX = 1                  # one line vertex per pixel column
+# LTTB buckets up to this many points are scanned without NumPy (faster when small)
+SCALAR_BUCKET = 48
+
+# How each column folds into a bucket; columns not listed are dropped
+BUCKET_AGGREGATION = {
+    'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum',
+    'HA_Open': 'first', 'HA_High': 'max', 'HA_Low': 'min', 'HA_Close': 'last',
+}
+
+
+def point_budget(width=DEFAULT_CHART_WIDTH):
+    """(max candles, max line points) that fit a chart `width` pixels wide"""
+    return max(2, width // CANDLE_PX), max(3, width // LINE_PX)
+
+
+def bucket_edges(n, buckets):
+    """Start offsets of `buckets` near-equal runs covering n bars"""
+    return np.unique(np.linspace(0, n, buckets + 1).astype(np.int64)[:-1])
+
+
+def ohlc_buckets(df, buckets):
+    """
+    Aggregates consecutive bars into at most `buckets` OHLC bars (see BUCKET_AGGREGATION).
+    Each bucket is labelled with its first bar's timestamp.
+    """
+    n = len(df)
+    if n <= buckets:
+        return df
+    starts = bucket_edges(n, buckets)
+    ends = np.append(starts[1:], n) - 1
+    out = {}
+    for col, how in BUCKET_AGGREGATION.items():
+        if col not in df.columns:
+            continue
+        values = df[col].to_numpy(dtype=float)
+        if how == 'first':
+            out[col] = values[starts]
+        elif how == 'last':
+            out[col] = values[ends]
+        elif how == 'max':
+            out[col] = np.fmax.reduceat(values, starts)
+        elif how == 'min':
+            out[col] = np.fmin.reduceat(values, starts)
+        else:
+            out[col] = np.add.reduceat(np.nan_to_num(values), starts)
+    return pd.DataFrame(out, index=df.index[starts])
+
+
+def _lttb(x, y, threshold):
+    n = len(y)
+    every = (n - 2) / (threshold - 2)
+    # Bucket i's candidates are bounds[i]:bounds[i + 1], its successor bounds[i + 1]:bounds[i + 2]
+    bounds = np.minimum((np.arange(threshold) * every).astype(np.int64) + 1, n)
+    lo, hi = bounds[1:-1], bounds[2:]
+    # Every successor bucket's average at once (x shifted so the running sums stay small);
+    # the last bucket's successor is the last point
+    x = x - x[0]
+    sum_x, sum_y = np.concatenate(([0.0], np.cumsum(x))), np.concatenate(([0.0], np.cumsum(y)))
+    counts = np.maximum(hi - lo, 1)
+    avg_x, avg_y = (sum_x[hi] - sum_x[lo]) / counts, (sum_y[hi] - sum_y[lo]) / counts
+    last = lo >= n - 1
+    avg_x[last], avg_y[last] = x[n - 1], y[n - 1]
+
+    # Only the choice of each bucket's point depends on the previous one. Small buckets
+    # (the usual case: a few bars per pixel) are scanned as floats, where NumPy's
+    # per-call overhead would dominate
+    xs, ys, edges = x.tolist(), y.tolist(), bounds.tolist()
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = a = 0
+    for i, (next_x, next_y) in enumerate(zip(avg_x.tolist(), avg_y.tolist())):
+        start, end = edges[i], edges[i + 1]
+        ax, ay = xs[a], ys[a]
+        dx, dy = ax - next_x, next_y - ay
+        # Twice the area of the triangle (selected point, candidate, next bucket average)
+        if end - start > SCALAR_BUCKET:
+            area = np.abs(dx * (y[start:end] - ay) - (ax - x[start:end]) * dy)
+            a = start + int(np.argmax(area))
+        else:
+            best = -1.0
+            for c in range(start, end):
+                area = abs(dx * (ys[c] - ay) - (ax - xs[c]) * dy)
+                if area > best:
+                    best, a = area, c
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return selected
+
+
+def lttb(x, y, threshold):
+    """
+    Indices of at most `threshold` points of (x, y) that preserve the line's shape.
+    NaNs (e.g. an EMA's warm-up) are skipped; first and last valid points are kept.
+    """
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(y))
+    if len(valid) <= threshold or threshold < 3:
+        return valid
+    x = np.asarray(x, dtype=float)
+    return valid[_lttb(x[valid], y[valid], threshold)]
+
+
+def decimate_line(series, threshold):
+    """`series` thinned to at most `threshold` points with LTTB"""
+    if len(series) <= threshold:
+        return series
+    x = series.index.asi8 if isinstance(series.index, pd.DatetimeIndex) else np.arange(len(series))
+    return series.iloc[lttb(x, series.to_numpy(dtype=float), threshold)]
@@ -0,0 +1,95 @@
+"""
+Concurrent fetch pipeline for the independent upstream calls behind one page
+(info, financials, news, index quotes). Calls run on a bounded thread pool so a
+page waits for roughly the slowest call instead of the sum of all of them.
+"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from telemetry import bind, span
+
+# Seconds a page waits for each source, counted from submission
+REQUEST_TIMEOUTS = {
+    'history': 20.0,
+    'info': 10.0,
+    'profile': 10.0,
+    'financials': 15.0,
+    'news': 8.0,
+    'quote': 5.0,
+}
+DEFAULT_TIMEOUT = 10.0
+MAX_WORKERS = 16
+
+# Start method for the worker process pools (screener, backtest, batch reports). Not
+# fork: a child forked from the multithreaded Streamlit server inherits whatever
+# locks other threads held at that instant (telemetry REGISTRY, the caches) and can
+# deadlock on them. forkserver forks from a clean single-threaded server; spawn where
+# it is unavailable.
+PROCESS_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+
+class Pending:
+    """
+    Handle for a submitted call. result() waits until the call's deadline and
+    returns `default` if it timed out or raised; the error is kept on `.error`.
+    A timed-out call keeps running, so its cached result still lands for the next rerun.
+    """
+
+    def __init__(self, future, source, timeout, default):
+        self.future = future
+        self.source = source
+        self.deadline = time.monotonic() + timeout
+        self.default = default
+        self.error = None
+
+    def done(self):
+        return self.future.done()
+
+    def result(self):
+        with span("wait", source=self.source) as timing:
+            try:
+                return self.future.result(timeout=max(0.0, self.deadline - time.monotonic()))
+            except TimeoutError:
+                self.error = TimeoutError(f"{self.source} timed out")
+            except Exception as e:
+                self.error = e
+            timing.labels['outcome'] = type(self.error).__name__
+        return self.default
+
+
+class FetchPipeline:
+    """Bounded pool shared by all sessions of the process"""
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        # Created on first use so importing the module starts no threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fetch")
+            return self._executor
+
+    def submit(self, source, func, *args, default=None, timeout=None, **kwargs):
+        """Starts func(*args, **kwargs) and returns a Pending with the source's timeout"""
+        if timeout is None:
+            timeout = REQUEST_TIMEOUTS.get(source, DEFAULT_TIMEOUT)
+        # bind: spans inside the call land in the submitting script run's trace
+        future = self.executor.submit(bind(func), *args, **kwargs)
+        return Pending(future, source, timeout, default)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# Process-wide pool used by the apps
+FETCH_POOL = FetchPipeline()
@@ -0,0 +1,291 @@
+"""
+Pure-NumPy indicator kernel for the apps' fixed indicator set.
+Works on contiguous float64 arrays and writes every indicator into one
+preallocated (bars x indicators) block, following the pandas_ta definitions.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from telemetry import span
+
+EPSILON = np.finfo(float).eps
+
+INDICATOR_COLUMNS = [
+    'EMA_20', 'EMA_50', 'EMA_200',
+    'RSI_14',
+    'MACD_12_26_9', 'MACDh_12_26_9', 'MACDs_12_26_9',
+    'ADX_14', 'DMP_14', 'DMN_14',
+    'CMF_20',
+    'BBL_20_2.0', 'BBM_20_2.0', 'BBU_20_2.0', 'BBB_20_2.0', 'BBP_20_2.0',
+    'PSARl_0.02_0.2', 'PSARs_0.02_0.2', 'PSARaf_0.02_0.2', 'PSARr_0.02_0.2',
+    'ATRr_14',
+    'ISA_9', 'ISB_26', 'ITS_9', 'IKS_26',
+    'CDL_DOJI_10_0.1',
+]
+COL = {name: i for i, name in enumerate(INDICATOR_COLUMNS)}
+
+# Largest growth of the scan weights within one block (bounds rounding error)
+_SCAN_RANGE = 1e4
+
+
+# --- 1. PRIMITIVES ---
+def _first_valid(x):
+    valid = np.flatnonzero(~np.isnan(x))
+    return valid[0] if valid.size else len(x)
+
+
+def _linear_scan(b, decay, y0=0.0):
+    """
+    y[t] = decay * y[t-1] + b[t], with y[-1] = y0, without a per-bar Python loop.
+    Blocks are solved in closed form with a cumsum of rescaled inputs; the block
+    length is capped so decay**-length stays within _SCAN_RANGE.
+    """
+    n = len(b)
+    out = np.empty(n)
+    if n == 0:
+        return out
+    block = max(1, int(np.log(_SCAN_RANGE) / -np.log(decay))) if decay < 1 else n
+    inv_pow = decay ** -np.arange(min(block, n), dtype=float)
+    pow_ = 1.0 / inv_pow
+    prev = y0
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        k = stop - start
+        acc = np.cumsum(b[start:stop] * inv_pow[:k])
+        out[start:stop] = pow_[:k] * (decay * prev + acc)
+        prev = out[stop - 1]
+    return out
+
+
+def ewm(x, alpha, start=None):
+    """
+    ewm(alpha, adjust=False).mean() started at x[start] (default: first valid value).
+    NaNs after the start hold the previous value, as the streaming engine does.
+    """
+    n = len(x)
+    out = np.full(n, np.nan)
+    start = _first_valid(x) if start is None else start
+    if start >= n:
+        return out
+    tail = x[start:]
+    valid = ~np.isnan(tail)
+    if valid.all():
+        out[start] = tail[0]
+        out[start + 1:] = _linear_scan(alpha * tail[1:], 1.0 - alpha, y0=tail[0])
+        return out
+
+    values = tail[valid]
+    smoothed = np.empty(len(values))
+    smoothed[0] = values[0]
+    smoothed[1:] = _linear_scan(alpha * values[1:], 1.0 - alpha, y0=values[0])
+    last_valid = np.maximum.accumulate(np.where(valid, np.arange(len(tail)), 0))
+    filled = np.empty(len(tail))
+    filled[valid] = smoothed
+    out[start:] = filled[last_valid]
+    return out
+
+
+def ema(x, length):
+    """EMA seeded with the SMA of the first `length` valid values (pandas_ta presma)"""
+    out = np.full(len(x), np.nan)
+    first = _first_valid(x)
+    seed_at = first + length - 1
+    if seed_at >= len(x):
+        return out
+    seeded = x.copy()
+    seeded[seed_at] = x[first:seed_at + 1].mean()
+    out[seed_at:] = ewm(seeded, 2.0 / (length + 1), start=seed_at)[seed_at:]
+    return out
+
+
+def rma(x, length):
+    """Wilder smoothing from the first valid value"""
+    return ewm(x, 1.0 / length)
+
+
+def rsi(close, length=14):
+    """Wilder RSI of a float64 close array"""
+    diff = np.empty(len(close))
+    diff[:1] = np.nan
+    diff[1:] = close[1:] - close[:-1]
+    gain, loss = rma(np.where(diff < 0, 0.0, diff), length), rma(np.where(diff > 0, 0.0, diff), length)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 * gain / (gain + np.abs(loss))
+
+
+def rolling(x, length, func):
+    """Applies a window reduction (e.g. np.sum) over trailing `length` windows"""
+    out = np.full(len(x), np.nan)
+    if len(x) >= length:
+        out[length - 1:] = func(sliding_window_view(x, length), axis=-1)
+    return out
+
+
+def non_zero(x):
+    return np.where(x == 0, EPSILON, x)
+
+
+def true_range(high, low, close, prenan=False):
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    tr = np.fmax(non_zero(high - low), np.fmax(np.abs(high - prev_close), np.abs(prev_close - low)))
+    if prenan:
+        tr[0] = np.nan
+    return tr
+
+
+def atr(high, low, close, length=14, prenan=False):
+    """RMA of the true range seeded with the mean of the first `length` bars"""
+    tr = true_range(high, low, close, prenan)
+    out = np.full(len(tr), np.nan)
+    if len(tr) < length:
+        return out
+    seeded = tr.copy()
+    seeded[length - 1] = np.nanmean(tr[:length])
+    out[length - 1:] = ewm(seeded, 1.0 / length, start=length - 1)[length - 1:]
+    return out
+
+
+def psar(high, low, af0=0.02, max_af=0.2):
+    """Parabolic SAR -> (long, short, af, reversal). Branchy recursion: one tight loop."""
+    n = len(high)
+    if n < 2:
+        return np.full(n, np.nan), np.full(n, np.nan), np.full(n, af0), np.zeros(n)
+
+    h, l = high.tolist(), low.tolist()
+    up, dn = h[1] - h[0], l[0] - l[1]
+    falling = dn > up and dn > 0 and abs(dn) >= EPSILON
+    sar = h[0] if falling else l[0]
+    ep = l[0] if falling else h[0]
+    af = af0
+    long_l, short_l, af_l, rev_l = [np.nan] * n, [np.nan] * n, [af0] * n, [0] * n
+
+    for i in range(1, n):
+        sar = sar + af * (ep - sar)
+        if falling:
+            reverse = h[i] > sar
+            if l[i] < ep:
+                ep = l[i]
+                af = min(af + af0, max_af)
+            sar = max(h[i - 1], sar)
+        else:
+            reverse = l[i] < sar
+            if h[i] > ep:
+                ep = h[i]
+                af = min(af + af0, max_af)
+            sar = min(l[i - 1], sar)
+        if reverse:
+            sar = ep
+            af = af0
+            falling = not falling
+            ep = l[i] if falling else h[i]
+        if falling:
+            short_l[i] = sar
+        else:
+            long_l[i] = sar
+        af_l[i] = af
+        rev_l[i] = reverse
+
+    return np.array(long_l), np.array(short_l), np.array(af_l), np.array(rev_l, dtype=float)
+
+
+# --- 2. KERNEL ---
+def compute_indicators(open_, high, low, close, volume):
+    """
+    Computes the whole indicator set in one pass over float64 arrays.
+    Returns a Fortran-ordered (n, len(INDICATOR_COLUMNS)) block: each column is
+    contiguous and the block wraps into a DataFrame without copying.
+    """
+    open_, high, low, close, volume = (
+        np.ascontiguousarray(a, dtype=np.float64) for a in (open_, high, low, close, volume)
+    )
+    n = len(close)
+    out = np.full((n, len(INDICATOR_COLUMNS)), np.nan, order='F')
+    if n == 0:
+        return out
+
+    # Moving averages
+    with span("indicators", group="moving_averages"):
+        for length in (20, 50, 200):
+            out[:, COL[f'EMA_{length}']] = ema(close, length)
+
+    # Momentum
+    with span("indicators", group="momentum"):
+        out[:, COL['RSI_14']] = rsi(close, 14)
+
+        macd = out[:, COL['MACD_12_26_9']]
+        np.subtract(ema(close, 12), ema(close, 26), out=macd)
+        signal = out[:, COL['MACDs_12_26_9']]
+        signal[:] = ema(macd, 9)
+        np.subtract(macd, signal, out=out[:, COL['MACDh_12_26_9']])
+
+    # Trend strength
+    with span("indicators", group="trend"):
+        up = np.empty(n)
+        dn = np.empty(n)
+        up[0] = dn[0] = np.nan
+        up[1:] = high[1:] - high[:-1]
+        dn[1:] = low[:-1] - low[1:]
+        pos = np.where((up > dn) & (up > 0), up, 0.0)
+        neg = np.where((dn > up) & (dn > 0), dn, 0.0)
+        pos[np.abs(pos) < EPSILON] = 0.0
+        neg[np.abs(neg) < EPSILON] = 0.0
+        pos[0] = neg[0] = np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k = 100 / atr(high, low, close, 14, prenan=True)
+            dmp = out[:, COL['DMP_14']]
+            dmn = out[:, COL['DMN_14']]
+            dmp[:] = k * rma(pos, 14)
+            dmn[:] = k * rma(neg, 14)
+            dx = 100 * np.abs(dmp - dmn) / (dmp + dmn)
+        out[:, COL['ADX_14']] = rma(dx, 14)
+
+    # Money flow
+    with span("indicators", group="money_flow"):
+        ad = (2 * close - (high + low)) * volume / non_zero(high - low)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[:, COL['CMF_20']] = rolling(ad, 20, np.sum) / rolling(volume, 20, np.sum)
+
+    # Volatility
+    with span("indicators", group="volatility"):
+        mid = out[:, COL['BBM_20_2.0']]
+        mid[:] = rolling(close, 20, np.mean)
+        std = rolling(close, 20, lambda w, axis: np.std(w, axis=axis, ddof=1))
+        lower = out[:, COL['BBL_20_2.0']]
+        upper = out[:, COL['BBU_20_2.0']]
+        np.subtract(mid, 2.0 * std, out=lower)
+        np.add(mid, 2.0 * std, out=upper)
+        width = non_zero(upper - lower)
+        out[:, COL['BBB_20_2.0']] = 100 * width / mid
+        out[:, COL['BBP_20_2.0']] = non_zero(close - lower) / width
+
+        (out[:, COL['PSARl_0.02_0.2']], out[:, COL['PSARs_0.02_0.2']],
+         out[:, COL['PSARaf_0.02_0.2']], out[:, COL['PSARr_0.02_0.2']]) = psar(high, low)
+
+        out[:, COL['ATRr_14']] = atr(high, low, close, 14)
+
+    # Ichimoku (spans projected kijun - 1 bars forward, no chikou lookahead)
+    with span("indicators", group="ichimoku"):
+        mids = {
+            length: 0.5 * (rolling(high, length, np.max) + rolling(low, length, np.min))
+            for length in (9, 26, 52)
+        }
+        out[:, COL['ITS_9']] = mids[9]
+        out[:, COL['IKS_26']] = mids[26]
+        if n > 25:
+            out[25:, COL['ISA_9']] = (0.5 * (mids[9] + mids[26]))[:n - 25]
+            out[25:, COL['ISB_26']] = mids[52][:n - 25]
+
+    with span("indicators", group="patterns"):
+        range_avg = rolling(non_zero(high - low), 10, np.mean)
+        out[:, COL['CDL_DOJI_10_0.1']] = np.where(np.abs(non_zero(close - open_)) < 0.1 * range_avg, 100.0, 0.0)
+
+    return out
+
+
+def indicator_frame(df):
+    """Indicator block for an OHLCV frame, as a DataFrame sharing the frame's index"""
+    block = compute_indicators(df['Open'], df['High'], df['Low'], df['Close'], df['Volume'])
+    return pd.DataFrame(block, index=df.index, columns=INDICATOR_COLUMNS, copy=False)
@@ -0,0 +1,261 @@
+"""
+Live mode: the forming daily bar of followed tickers, updated from a quote feed.
+
+One LiveBars hub per process polls the followed symbols once per interval, however
+many sessions are watching them, and folds the quotes into each symbol's bar.
+Dashboards replace only their last bar with it (see with_forming_bar) and advance
+the indicators by that one bar, instead of refetching and recomputing the history.
+
+Select the feed with STOCK_APP_FEED:
+    provider[@<poll seconds>] (default, the active data provider's quote)
+    simulated[@<tick seconds>] (random walk from the last close, no network)
+"""
+import math
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from analysis import heikin_ashi_next
+from providers import get_provider
+from telemetry import span
+from timeframes import TIMEFRAMES
+
+POLL_SECONDS = 5.0
+# A symbol no session has asked about for this long is no longer polled
+IDLE_AFTER = 60.0
+
+# session: the daily bar's index label (exchange midnight); volume is the session's so far
+Quote = namedtuple('Quote', ['symbol', 'session', 'open', 'high', 'low', 'close', 'volume'])
+# version counts the quotes folded in, so callers can key caches on it
+LiveBar = namedtuple('LiveBar', ['version', 'session', 'open', 'high', 'low', 'close', 'volume'])
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+# --- 1. FEEDS ---
+class QuoteFeed:
+    """
+    poll(bars) -> [Quote] for the followed symbols; `bars` maps each symbol to its
+    current LiveBar (None until the first quote). Called every `interval` seconds.
+    Push feeds (e.g. a websocket client) can instead call LiveBars.publish.
+    """
+
+    name = "base"
+
+    def __init__(self, interval=POLL_SECONDS):
+        self.interval = interval
+
+    def poll(self, bars):
+        raise NotImplementedError
+
+
+def _quote(symbol, session, row):
+    return Quote(symbol, session, float(row['Open']), float(row['High']), float(row['Low']),
+                 float(row['Close']), float(row['Volume']))
+
+
+class ProviderFeed(QuoteFeed):
+    """
+    Today's daily bar from the active data provider: one batched download per poll
+    for every followed symbol, so the request rate does not grow with the number of
+    symbols. A newly followed symbol gets one quote() of its own first, which gives
+    its session label the exchange timezone (download() dates carry none).
+    """
+
+    name = "provider"
+
+    def poll(self, bars):
+        quotes = []
+        for symbol in [symbol for symbol, bar in bars.items() if bar is None]:
+            try:
+                with span("upstream", call="quote_live"):
+                    df = get_provider().quote(symbol)
+            except Exception:
+                continue
+            if df is not None and not df.empty:
+                quotes.append(_quote(symbol, df.index[-1], df.iloc[-1]))
+
+        followed = {symbol: bar for symbol, bar in bars.items() if bar is not None}
+        if not followed:
+            return quotes
+        try:
+            with span("upstream", call="quote_live_batch"):
+                data = get_provider().download(list(followed), period="1d")
+        except Exception:
+            return quotes
+        if data is None or data.empty:
+            return quotes
+        listed = set(data.columns.get_level_values(1))
+        for symbol, bar in followed.items():
+            if symbol not in listed:
+                continue
+            df = data.xs(symbol, axis=1, level=1).dropna(subset=['Close'])
+            if df.empty:
+                continue
+            session = pd.Timestamp(df.index[-1])
+            if session.tz is None:
+                session = session.tz_localize(bar.session.tz)
+            quotes.append(_quote(symbol, session, df.iloc[-1]))
+        return quotes
+
+
+class SimulatedFeed(QuoteFeed):
+    """
+    Random-walk ticks around each symbol's last bar (seeded from the held daily
+    history) for exercising live mode without a market or network.
+    """
+
+    name = "simulated"
+
+    def __init__(self, interval=1.0, volatility=0.0005, seed=None, timeframes=TIMEFRAMES):
+        super().__init__(interval)
+        self.volatility = volatility
+        self.timeframes = timeframes
+        self._random = random.Random(seed)
+
+    def _seed(self, symbol):
+        daily = self.timeframes.history(symbol, period="5d")
+        if daily is None or daily.empty:
+            return None
+        last = daily.iloc[-1]
+        return LiveBar(0, daily.index[-1], *(float(last[c]) for c in OHLCV_COLUMNS))
+
+    def poll(self, bars):
+        quotes = []
+        for symbol, bar in bars.items():
+            bar = bar or self._seed(symbol)
+            if bar is None:
+                continue
+            price = bar.close * math.exp(self._random.gauss(0.0, self.volatility))
+            session = pd.Timestamp.now(tz=bar.session.tz).normalize()
+            if session > bar.session:
+                # New session: opens at the previous close
+                bar = bar._replace(session=session, open=bar.close, high=bar.close, low=bar.close, volume=0.0)
+            volume = bar.volume + self._random.randint(100, 5000)
+            quotes.append(Quote(symbol, bar.session, bar.open, max(bar.high, price), min(bar.low, price),
+                                price, volume))
+        return quotes
+
+
+def feed_from_spec(spec):
+    """'provider[@<seconds>]' or 'simulated[@<seconds>]' -> QuoteFeed"""
+    kind, _, interval = (spec or "provider").partition("@")
+    if kind == "provider":
+        return ProviderFeed(interval=float(interval or POLL_SECONDS))
+    if kind == "simulated":
+        return SimulatedFeed(interval=float(interval or 1.0))
+    raise ValueError(f"Unknown feed '{spec}'. Use provider[@<seconds>] or simulated[@<seconds>]")
+
+
+# --- 2. FORMING BARS ---
+class LiveBars:
+    """
+    Forming daily bar per followed symbol, folded from one shared feed on a
+    background thread that starts with the first follower. bar() follows a
+    symbol; symbols nobody asked about for `idle_after` seconds are dropped.
+    """
+
+    def __init__(self, feed=None, idle_after=IDLE_AFTER):
+        self.feed = feed or feed_from_spec(os.environ.get("STOCK_APP_FEED"))
+        self.idle_after = idle_after
+        self._bars = {}
+        self._seen = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def bar(self, symbol):
+        """Latest LiveBar for `symbol` (None before its first quote); keeps it followed"""
+        with self._lock:
+            self._seen[symbol] = time.monotonic()
+            self._bars.setdefault(symbol, None)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="live-feed", daemon=True)
+                self._thread.start()
+            return self._bars[symbol]
+
+    def version(self, symbol):
+        bar = self.bar(symbol)
+        return 0 if bar is None else bar.version
+
+    def publish(self, quote):
+        """Folds one quote into its symbol's forming bar (quotes for older sessions are ignored)"""
+        with self._lock:
+            if quote.symbol not in self._bars:
+                return
+            bar = self._bars[quote.symbol]
+            if bar is not None and quote.session < bar.session:
+                return
+            if bar is not None and quote.session == bar.session:
+                high, low = max(bar.high, quote.high), min(bar.low, quote.low)
+                volume = max(bar.volume, quote.volume)
+            else:
+                high, low, volume = quote.high, quote.low, quote.volume
+            version = 1 if bar is None else bar.version + 1
+            self._bars[quote.symbol] = LiveBar(version, quote.session, quote.open, high, low, quote.close, volume)
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.idle_after
+        with self._lock:
+            for symbol in [s for s, seen in self._seen.items() if seen < cutoff]:
+                del self._seen[symbol], self._bars[symbol]
+            return dict(self._bars)
+
+    def _run(self):
+        while True:
+            bars = self._prune()
+            if bars:
+                try:
+                    for quote in self.feed.poll(bars):
+                        self.publish(quote)
+                except Exception:
+                    pass
+            time.sleep(self.feed.interval)
+
+
+def _set_last(df, session, values):
+    """Copy of `df` whose last row is `values` at `session` (replacing that label or appended)"""
+    same = session == df.index[-1]
+    old = df.to_numpy()
+    keep = len(df) - 1 if same else len(df)
+    out = np.empty((keep + 1, old.shape[1]), dtype=old.dtype, order='F')
+    out[:keep] = old[:keep]
+    out[keep] = values
+    index = df.index if same else df.index.append(pd.DatetimeIndex([session], name=df.index.name))
+    return pd.DataFrame(out, index=index, columns=df.columns, copy=False)
+
+
+def _bar_values(bar):
+    return {'Open': bar.open, 'High': bar.high, 'Low': bar.low, 'Close': bar.close, 'Volume': bar.volume}
+
+
+def apply_bar(daily, bar):
+    """OHLCV frame `daily` with `bar` as its last bar (replacing the same session or appended)"""
+    if bar is None or bar.session < daily.index[-1]:
+        return daily
+    values = _bar_values(bar)
+    return _set_last(daily, bar.session, [values.get(col, 0.0) for col in daily.columns])
+
+
+def with_forming_bar(df, df_ha, bar, indicators):
+    """
+    (df, df_ha) with `bar` and its `indicators` (a dict) as the last bar. Columns
+    neither provides keep their previous value within a session (NaN in a new one).
+    """
+    if bar.session < df.index[-1]:
+        return df, df_ha
+    same = bar.session == df.index[-1]
+    values = dict(indicators, **_bar_values(bar))
+    prev = df.to_numpy()[-1] if same else np.full(df.shape[1], np.nan)
+    row = [values.get(col, prev[i]) for i, col in enumerate(df.columns)]
+    head_ha = len(df_ha) - 1 if same else len(df_ha)
+    ha = heikin_ashi_next(df_ha.iloc[head_ha - 1] if head_ha else None, values)
+    return _set_last(df, bar.session, row), _set_last(df_ha, bar.session, [ha[col] for col in df_ha.columns])
+
+
+# Process-wide hub used by the dashboards' live mode
+LIVE_BARS = LiveBars()
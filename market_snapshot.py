@@ -0,0 +1,108 @@
+"""
+Market snapshot for the Market Overview leaderboards.
+One batched multi-ticker download per refresh, ranked in a single vectorized pass.
+"""
+import os
+from functools import lru_cache
+
+import pandas as pd
+
+from providers import get_provider
+from telemetry import span, timed
+
+# --- 1. UNIVERSES ---
+NIFTY_50 = [
+    'ADANIENT.NS', 'ADANIPORTS.NS', 'APOLLOHOSP.NS', 'ASIANPAINT.NS', 'AXISBANK.NS',
+    'BAJAJ-AUTO.NS', 'BAJFINANCE.NS', 'BAJAJFINSV.NS', 'BEL.NS', 'BHARTIARTL.NS',
+    'CIPLA.NS', 'COALINDIA.NS', 'DRREDDY.NS', 'EICHERMOT.NS', 'ETERNAL.NS',
+    'GRASIM.NS', 'HCLTECH.NS', 'HDFCBANK.NS', 'HDFCLIFE.NS', 'HEROMOTOCO.NS',
+    'HINDALCO.NS', 'HINDUNILVR.NS', 'ICICIBANK.NS', 'INDUSINDBK.NS', 'INFY.NS',
+    'ITC.NS', 'JIOFIN.NS', 'JSWSTEEL.NS', 'KOTAKBANK.NS', 'LT.NS',
+    'M&M.NS', 'MARUTI.NS', 'NESTLEIND.NS', 'NTPC.NS', 'ONGC.NS',
+    'POWERGRID.NS', 'RELIANCE.NS', 'SBILIFE.NS', 'SBIN.NS', 'SHRIRAMFIN.NS',
+    'SUNPHARMA.NS', 'TATACONSUM.NS', 'TATAMOTORS.NS', 'TATASTEEL.NS', 'TCS.NS',
+    'TECHM.NS', 'TITAN.NS', 'TRENT.NS', 'ULTRACEMCO.NS', 'WIPRO.NS',
+]
+
+# Constituent lists published by NSE (column 'Symbol'). A local copy in
+# ./universes/<file> takes precedence so deployments can pin the list.
+UNIVERSE_FILES = {
+    "NIFTY 50": "ind_nifty50list.csv",
+    "NIFTY 200": "ind_nifty200list.csv",
+    "NIFTY 500": "ind_nifty500list.csv",
+}
+NSE_INDEX_URL = "https://nsearchives.nseindia.com/content/indices/{file}"
+UNIVERSE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "universes")
+
+
+@lru_cache(maxsize=None)
+def load_universe(name="NIFTY 50"):
+    """Return the Yahoo tickers (.NS) for an NSE index universe"""
+    if name not in UNIVERSE_FILES:
+        raise ValueError(f"Unknown universe '{name}'. Choose from {list(UNIVERSE_FILES)}")
+
+    local_path = os.path.join(UNIVERSE_DIR, UNIVERSE_FILES[name])
+    if os.path.exists(local_path):
+        symbols = pd.read_csv(local_path)['Symbol']
+    elif name == "NIFTY 50":
+        return tuple(NIFTY_50)
+    else:
+        url = NSE_INDEX_URL.format(file=UNIVERSE_FILES[name])
+        symbols = pd.read_csv(url, storage_options={'User-Agent': 'Mozilla/5.0'})['Symbol']
+
+    return tuple(f"{s.strip()}.NS" for s in symbols.dropna())
+
+
+# --- 2. BATCHED DOWNLOAD ---
+def fetch_snapshot(tickers, period="5d"):
+    """
+    Downloads daily bars for the whole universe in one batched request.
+    Returns aligned (close, volume) matrices: rows = dates, columns = tickers.
+    """
+    with span("upstream", call="download"):
+        data = get_provider().download(tickers, period=period)
+    if data.empty:
+        empty = pd.DataFrame(columns=list(tickers), dtype=float)
+        return empty, empty.copy()
+
+    close = data['Close'].reindex(columns=list(tickers))
+    volume = data['Volume'].reindex(columns=list(tickers))
+    return close, volume
+
+
+# --- 3. RANKING ---
+@timed("scoring")
+def rank_leaderboards(close, volume, limit=10):
+    """
+    Ranks volume leaders, gainers and losers from the aligned matrices.
+    Change % is measured from the first to the last close in the window.
+    """
+    close = close.astype(float)
+    last_close = close.ffill().iloc[-1]
+    first_close = close.bfill().iloc[0]
+    observations = close.notna().sum()
+
+    change = ((last_close - first_close) / first_close) * 100
+    change = change.where(observations >= 2).dropna()
+    last_volume = volume.astype(float).ffill().iloc[-1].where(last_close.notna()).dropna()
+
+    def to_records(values, column, scale=1.0):
+        names = values.index.str.replace('.NS', '', regex=False)
+        return [
+            {'Ticker': name, column: value / scale, 'Price': last_close[ticker]}
+            for name, ticker, value in zip(names, values.index, values.to_numpy())
+        ]
+
+    return {
+        'volume': to_records(last_volume.nlargest(limit), 'Volume', scale=1e6),
+        'gainers': to_records(change.nlargest(limit), 'Change %'),
+        'losers': to_records(change.nsmallest(limit), 'Change %'),
+    }
+
+
+def build_market_snapshot(universe="NIFTY 50", limit=10):
+    """Fetch + rank in one call. Returns the three leaderboards as record lists."""
+    close, volume = fetch_snapshot(load_universe(universe))
+    if close.empty:
+        return {'volume': [], 'gainers': [], 'losers': []}
+    return rank_leaderboards(close, volume, limit)
@@ -0,0 +1,185 @@
+"""
+On-disk columnar OHLCV store (Parquet, one partition per ticker and interval).
+A refresh fetches only the bars after the last stored timestamp and appends them.
+"""
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from telemetry import span
+
+# Base directory of everything the apps write (store, replay captures, shared cache),
+# independent of the working directory the apps are started from
+DATA_DIR = os.environ.get(
+    "STOCK_APP_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+)
+STORE_DIR = os.environ.get("STOCK_APP_STORE", os.path.join(DATA_DIR, "ohlcv"))
+META_KEY = b"stock_app"
+
+# Calendar days covered by each yfinance period string ('max' = unbounded)
+PERIOD_DAYS = {
+    "1d": 1, "5d": 5, "1mo": 31, "3mo": 92, "6mo": 183, "1y": 366,
+    "2y": 731, "5y": 1827, "10y": 3653, "max": None,
+}
+
+# Leading gap tolerated between the requested start and the first stored bar
+# (weekends, holidays, listing date) before a partition counts as too short.
+COVERAGE_SLACK = timedelta(days=7)
+
+
+def _provider_history(ticker, interval, period=None, start=None):
+    """Default upstream fetch via the active provider: full period or everything since `start`."""
+    from providers import get_provider  # providers imports this module
+    with span("upstream", call="history", interval=interval, incremental=start is not None):
+        return get_provider().history(ticker, interval, period=period, start=start)
+
+
+def period_start(period, now=None):
+    """Earliest timestamp a period string asks for (None for 'max')"""
+    days = PERIOD_DAYS.get(period)
+    if days is None:
+        if period not in PERIOD_DAYS:
+            raise ValueError(f"Unsupported period '{period}'")
+        return None
+    now = now or datetime.now(timezone.utc)
+    return pd.Timestamp(now - timedelta(days=days))
+
+
+def slice_period(df, period):
+    """Trailing `period` of a bar frame"""
+    start = period_start(period)
+    if start is None or df is None:
+        return df
+    return df[df.index >= (start if df.index.tz is not None else start.tz_localize(None))]
+
+
+class OHLCVStore:
+    """Parquet partitions at <root>/<interval>/<TICKER>.parquet"""
+
+    def __init__(self, root=STORE_DIR, fetch=_provider_history):
+        self.root = root
+        self.fetch = fetch
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    # --- Partition I/O ---
+    def path(self, ticker, interval):
+        safe = ticker.upper().replace("/", "_")
+        return os.path.join(self.root, interval, f"{safe}.parquet")
+
+    def _lock(self, ticker, interval):
+        key = (ticker.upper(), interval)
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def metadata(self, ticker, interval):
+        """Stored partition metadata: last_ts, coverage_start, rows (None if absent)"""
+        path = self.path(ticker, interval)
+        if not os.path.exists(path):
+            return None
+        meta = pq.read_schema(path).metadata or {}
+        if META_KEY not in meta:
+            return None
+        return json.loads(meta[META_KEY])
+
+    def last_timestamp(self, ticker, interval):
+        meta = self.metadata(ticker, interval)
+        return pd.Timestamp(meta['last_ts']) if meta else None
+
+    def read(self, ticker, interval, columns=None):
+        """Stored partition, or only `columns` of it (index included); None if absent"""
+        path = self.path(ticker, interval)
+        if not os.path.exists(path):
+            return None
+        return pq.read_pandas(path, columns=columns).to_pandas()
+
+    def write(self, ticker, interval, df, coverage_start=None):
+        """Atomically replace a partition and record its last stored timestamp."""
+        path = self.path(ticker, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        meta = {
+            'last_ts': df.index[-1].isoformat(),
+            'coverage_start': coverage_start.isoformat() if coverage_start is not None else None,
+            'rows': len(df),
+        }
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        schema_meta = dict(table.schema.metadata or {})
+        schema_meta[META_KEY] = json.dumps(meta).encode()
+        table = table.replace_schema_metadata(schema_meta)
+
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    # --- Incremental refresh ---
+    def _covers(self, meta, start):
+        """Does the stored partition reach back to `start`? (coverage None = full history)"""
+        if meta is None:
+            return False
+        coverage = meta.get('coverage_start')
+        if coverage is None:
+            return True
+        return start is not None and pd.Timestamp(coverage) <= start + COVERAGE_SLACK
+
+    @staticmethod
+    def _unchanged(stored, delta):
+        """Are all of `delta`'s bars already stored, with the same values?"""
+        if not delta.index.isin(stored.index).all() or not delta.columns.isin(stored.columns).all():
+            return False
+        return stored.loc[delta.index, delta.columns].astype(float).equals(delta.astype(float))
+
+    def history(self, ticker, period="5y", interval="1d"):
+        """
+        Returns `period` of bars for `ticker`, fetching only what is missing.
+        A cold or too-short partition costs one full-period download; afterwards
+        each refresh requests only the bars from the last stored timestamp on.
+        """
+        start = period_start(period)
+
+        with self._lock(ticker, interval):
+            meta = self.metadata(ticker, interval)
+            stored = self.read(ticker, interval) if self._covers(meta, start) else None
+
+            if stored is None or stored.empty:
+                df = self.fetch(ticker, interval, period=period)
+                if df is None or df.empty:
+                    return pd.DataFrame() if df is None else df
+                self.write(ticker, interval, df, coverage_start=start)
+            else:
+                last_ts = stored.index[-1]
+                # Re-request the last stored bar: it may still have been forming.
+                delta = self.fetch(ticker, interval, start=last_ts.strftime("%Y-%m-%d")
+                                   if interval.endswith(("d", "wk", "mo")) else last_ts)
+                df = stored
+                if delta is not None and not delta.empty:
+                    delta = delta[delta.index >= last_ts]
+                    if self._unchanged(stored, delta):
+                        # Only the re-requested last bar, as stored: keep the partition
+                        return slice_period(stored, period)
+                    coverage = meta['coverage_start']
+                    coverage = pd.Timestamp(coverage) if coverage else None
+
+                    action_cols = [c for c in ("Dividends", "Stock Splits") if c in delta.columns]
+                    known = stored.reindex(columns=action_cols).reindex(delta.index).fillna(0)
+                    if (delta[action_cols].fillna(0) != known).any().any():
+                        # Adjusted history changes on a new dividend/split: rebuild it.
+                        df = self.fetch(ticker, interval, period=period)
+                        coverage = start
+                    else:
+                        df = pd.concat([stored[stored.index < last_ts], delta])
+                        df = df[~df.index.duplicated(keep='last')].sort_index()
+                    self.write(ticker, interval, df, coverage_start=coverage)
+
+        return slice_period(df, period)
+
+
+# Process-wide default store used by the apps
+HISTORY_STORE = OHLCVStore()
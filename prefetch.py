@@ -0,0 +1,249 @@
+"""
+Background prefetch: keeps the watchlist tickers and the leaderboard universes warm
+so page loads for them are cache hits. A daemon thread reloads every registered
+cached function (see data_cache's func.refresh) on a cadence tied to NSE hours and
+stores the result for longer than the gap to the next refresh, so entries never
+expire between runs:
+
+    pre-open    09:00-09:15 IST   warm everything before the open
+    open        09:15-15:30       well inside the 5 min history TTL
+    post-close  15:30-16:00       closing prices settle
+    closed      nights, weekends and holidays: a slow trickle
+
+Apps register their own cached functions (they are defined in the app scripts):
+
+    PREFETCHER.register("history", get_stock_data, [(t, "5y") for t in WATCHLIST])
+    PREFETCHER.register("snapshot", get_market_snapshot, [(universe, 10)], expire_after=IDLE_EXPIRY)
+    PREFETCHER.start()
+
+Argument sets registered with expire_after are dropped once nobody has registered
+them again for that long (e.g. a universe no page has shown since); unregister()
+drops them at once. For shared sources the replicas on a node take turns through a
+lease in the shared tier: one of them refreshes each key per cycle and the others
+read its entry, so upstream traffic does not grow with the number of replicas.
+
+Set STOCK_APP_WATCHLIST to a comma-separated ticker list, and STOCK_APP_PREFETCH=0
+to turn the thread off.
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import time as clock
+from datetime import timedelta
+
+import pandas as pd
+
+from telemetry import REGISTRY, span
+
+EXCHANGE_TZ = "Asia/Kolkata"
+PRE_OPEN = clock(9, 0)
+MARKET_OPEN = clock(9, 15)
+MARKET_CLOSE = clock(15, 30)
+POST_CLOSE_END = clock(16, 0)
+
+# Seconds between refreshes in each phase
+CADENCE = {
+    'pre-open': 5 * 60,
+    'open': 4 * 60,
+    'post-close': 10 * 60,
+    'closed': 60 * 60,
+}
+# Entries are kept this long past the next scheduled refresh, so a slow or failed
+# run still finds them live
+TTL_MARGIN = 5 * 60
+# Seconds an argument set registered with expire_after=IDLE_EXPIRY survives unused
+IDLE_EXPIRY = 24 * 60 * 60
+
+WATCHLIST = tuple(t.strip().upper() for t in os.environ.get("STOCK_APP_WATCHLIST", "RELIANCE.NS").split(",")
+                  if t.strip())
+PREFETCH_ENABLED = os.environ.get("STOCK_APP_PREFETCH", "1").lower() not in ("0", "off", "false", "no")
+
+
+# --- 1. EXCHANGE HOURS ---
+def exchange_now():
+    return pd.Timestamp.now(tz=EXCHANGE_TZ).to_pydatetime()
+
+
+def market_phase(now, holidays=()):
+    """'pre-open', 'open', 'post-close' or 'closed' at exchange-local datetime `now`"""
+    if now.weekday() >= 5 or now.date() in holidays:
+        return 'closed'
+    t = now.time()
+    if PRE_OPEN <= t < MARKET_OPEN:
+        return 'pre-open'
+    if MARKET_OPEN <= t < MARKET_CLOSE:
+        return 'open'
+    if MARKET_CLOSE <= t < POST_CLOSE_END:
+        return 'post-close'
+    return 'closed'
+
+
+def next_boundary(now):
+    """Next phase change after `now` (today's remaining boundaries, else tomorrow's pre-open)"""
+    for boundary in (PRE_OPEN, MARKET_OPEN, MARKET_CLOSE, POST_CLOSE_END):
+        at = now.replace(hour=boundary.hour, minute=boundary.minute, second=0, microsecond=0)
+        if at > now:
+            return at
+    tomorrow = now + timedelta(days=1)
+    return tomorrow.replace(hour=PRE_OPEN.hour, minute=PRE_OPEN.minute, second=0, microsecond=0)
+
+
+def seconds_to_next_run(now, holidays=()):
+    """Current phase's cadence, cut short so a new phase (e.g. the pre-open) starts with a run"""
+    cadence = CADENCE[market_phase(now, holidays)]
+    return min(cadence, max(1.0, (next_boundary(now) - now).total_seconds()))
+
+
+# --- 2. SCHEDULER ---
+# due: time.monotonic() the job should run at; lag: seconds it started late last time;
+# skipped: argument sets another process refreshed (it held the lease)
+JobStatus = namedtuple('JobStatus', ['due', 'last_run', 'duration', 'lag', 'refreshed', 'skipped', 'failed',
+                                     'error'])
+
+
+class _Job:
+    def __init__(self, name, func):
+        self.name = name
+        self.func = func
+        # args -> time.monotonic() they expire at, None to keep them
+        self.argsets = {}
+        self.status = JobStatus(time.monotonic(), None, None, None, 0, 0, 0, None)
+
+    def expire(self, now):
+        for args in [args for args, expires in self.argsets.items() if expires is not None and expires <= now]:
+            del self.argsets[args]
+
+
+class Prefetcher:
+    """
+    Registered jobs share one daemon thread. Each run refreshes all of a job's
+    argument sets in turn, then the job is due again after the phase's cadence.
+    """
+
+    def __init__(self, holidays=(), now=exchange_now):
+        self.holidays = set(holidays)
+        self.now = now
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def register(self, name, func, argsets, expire_after=None):
+        """
+        Refreshes func(*args) (func: a data_cache.cached function) for each args in
+        `argsets`, for good or until `expire_after` seconds pass without them being
+        registered again. Registering a name again (every Streamlit rerun does) takes
+        the latest func, adds its argsets and renews their expiry; new ones make the
+        job due at once.
+        """
+        now = time.monotonic()
+        expires = None if expire_after is None else now + expire_after
+        with self._lock:
+            job = self._jobs.get(name)
+            if job is None:
+                job = self._jobs[name] = _Job(name, func)
+            job.func = func
+            new = False
+            for args in map(tuple, argsets):
+                if args not in job.argsets:
+                    new = True
+                    job.argsets[args] = expires
+                elif job.argsets[args] is not None:
+                    # Renewed; one registered for good stays that way
+                    job.argsets[args] = expires
+            if new:
+                job.status = job.status._replace(due=min(job.status.due, now))
+        if new:
+            self._wake.set()
+
+    def unregister(self, name, argsets=None):
+        """Stops refreshing `argsets` of job `name`, or the whole job"""
+        with self._lock:
+            if argsets is None:
+                self._jobs.pop(name, None)
+            elif name in self._jobs:
+                for args in map(tuple, argsets):
+                    self._jobs[name].argsets.pop(args, None)
+
+    def start(self):
+        """Starts the refresh thread once per process (no-op when STOCK_APP_PREFETCH=0)"""
+        with self._lock:
+            if self._thread is None and PREFETCH_ENABLED:
+                self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+                self._thread.start()
+
+    def run_job(self, job):
+        """
+        Refreshes every argument set of `job` once, keeping them live until after its
+        next run. Shared keys are leased until then, so other replicas skip them.
+        """
+        wait = seconds_to_next_run(self.now(), self.holidays)
+        started = time.monotonic()
+        lag = max(0.0, started - job.status.due)
+        refreshed = skipped = failed = 0
+        error = None
+        with self._lock:
+            job.expire(started)
+            argsets = list(job.argsets)
+        for args in argsets:
+            try:
+                with span("prefetch", job=job.name):
+                    value = job.func.refresh(*args, ttl=wait + TTL_MARGIN, lease=wait)
+                # refresh never returns None for a load it ran (empty results raise)
+                if value is None:
+                    skipped += 1
+                else:
+                    refreshed += 1
+            except Exception as e:
+                failed += 1
+                error = f"{args}: {e}"
+        finished = time.monotonic()
+        REGISTRY.observe("prefetch_lag", {'job': job.name}, lag)
+        with self._lock:
+            # Argsets registered while this run was going are still due
+            due = finished + wait if set(job.argsets) <= set(argsets) else finished
+            job.status = JobStatus(due, finished, finished - started, lag, refreshed, skipped, failed, error)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                jobs = list(self._jobs.values())
+            now = time.monotonic()
+            for job in jobs:
+                # A job unregistered since the snapshot above is left alone
+                if self._jobs.get(job.name) is not job:
+                    continue
+                if job.status.due <= now:
+                    self.run_job(job)
+            with self._lock:
+                due = min((job.status.due for job in self._jobs.values()), default=now + 60)
+            self._wake.wait(timeout=max(0.5, due - time.monotonic()))
+            self._wake.clear()
+
+    def status(self):
+        """
+        [{'job', 'entries', 'phase', 'last_run_s_ago', 'duration_s', 'lag_s', 'next_in_s',
+          'refreshed', 'skipped', 'failed', 'error'}]
+        """
+        now = time.monotonic()
+        phase = market_phase(self.now(), self.holidays)
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [{
+            'job': job.name,
+            'entries': len(job.argsets),
+            'phase': phase,
+            'last_run_s_ago': None if job.status.last_run is None else round(now - job.status.last_run),
+            'duration_s': None if job.status.duration is None else round(job.status.duration, 2),
+            'lag_s': None if job.status.lag is None else round(job.status.lag, 2),
+            'next_in_s': round(max(0.0, job.status.due - now)),
+            'refreshed': job.status.refreshed,
+            'skipped': job.status.skipped,
+            'failed': job.status.failed,
+            'error': job.status.error,
+        } for job in jobs]
+
+
+# Process-wide scheduler shared by both apps
+PREFETCHER = Prefetcher()
@@ -1,12 +1,26 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import pandas_ta as ta
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 import numpy as np
 
+from analysis import calculate_signal_strength, heikin_ashi, identify_patterns, signal_series
+from charts import CHART_BUILDER
+from compact_frames import COMPACT_FRAMES, V3_COLUMNS, compact_frame
+from data_cache import cache_entries, cache_stats, cached
+from decimation import DEFAULT_CHART_WIDTH
+from data_sources import get_financials, get_info, get_news, get_profile
+from fetch_pipeline import FETCH_POOL
+from live_feed import LIVE_BARS, apply_bar, with_forming_bar
+from market_snapshot import UNIVERSE_FILES, build_market_snapshot, load_universe
+from prefetch import IDLE_EXPIRY, PREFETCHER, WATCHLIST
+from providers import upstream_status
+from screener import RANKINGS, rank_screen, refresh_store, screen_universe
+from streaming_indicators import INDICATOR_STREAMS
+from telemetry import REGISTRY, begin_trace, current_trace, serve_metrics, span
+from timeframes import TIMEFRAMES, normalize_symbol
+from upstream import UpstreamError
+
 # --- 1. APP CONFIGURATION ---
 st.set_page_config(
     page_title="Pro Stock Analyst 3.0 | Professional Research", 
@@ -15,6 +29,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Per-stage timings of this run (see telemetry); /metrics when STOCK_APP_METRICS_PORT is set
+serve_metrics()
+run = begin_trace("rerun", app="v3")
+
 # --- 2. PREMIUM CSS STYLING (AUDITED & ENHANCED) ---
 st.markdown("""
 <style>
@@ -299,60 +317,54 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- 3. DATA ENGINE (AUDITED) ---
-@st.cache_data(ttl=300)
-def get_stock_data(ticker, period="5y", interval="1d"):
+@cached('history')
+def get_stock_data(ticker, period="5y", interval="1d", compact=COMPACT_FRAMES):
     """
     Fetches stock data with technical indicators.
     Always fetches 5y for proper EMA200 and 1Y returns calculation.
+    compact: cache only the columns this page reads, mostly as float32 (see compact_frames).
+    Errors propagate: the prefetch thread calls this too, so the page reports them,
+    and the cache answers with the last good frames if it has them.
     """
-    try:
-        stock = yf.Ticker(ticker)
-        df = stock.history(period=period, interval=interval)
-        info = stock.info
-        
-        if df.empty: 
-            return None, None, None
+    # Sliced/resampled from the widest daily history held for the ticker
+    df = TIMEFRAMES.history(ticker, period=period, interval=interval)
+    
+    if df.empty: 
+        return None, None
 
-        # Technical Indicators
-        df.ta.ema(length=20, append=True)
-        df.ta.ema(length=50, append=True)
-        df.ta.ema(length=200, append=True)
-        
-        df.ta.rsi(length=14, append=True)
-        df.ta.macd(append=True)
-        df.ta.cmf(append=True)
-        df.ta.bbands(length=20, std=2, append=True)
-        df.ta.psar(append=True)
-        df.ta.atr(length=14, append=True)
-        
-        # Support & Resistance
-        df['pivot'] = (df['High'] + df['Low'] + df['Close']) / 3
-        df['r1'] = (df['pivot'] * 2) - df['Low']
-        df['s1'] = (df['pivot'] * 2) - df['High']
-        
-        # Ichimoku
-        try:
-            ichimoku = ta.ichimoku(df['High'], df['Low'], df['Close'], lookahead=False)
-            if ichimoku is not None:
-                df = pd.concat([df, ichimoku[0]], axis=1)
-        except:
-            pass
-
-        # Candlestick Patterns
+    # Technical Indicators (EMA, RSI, MACD, CMF, BB, PSAR, ATR, Ichimoku).
+    # Streamed: only bars not seen since the last refresh are computed.
+    indicators = INDICATOR_STREAMS.append((ticker, period, interval), df)
+    df = df.join(indicators.drop(columns=['ADX_14', 'DMP_14', 'DMN_14', 'CDL_DOJI_10_0.1']))
+    
+    # Support & Resistance
+    df['pivot'] = (df['High'] + df['Low'] + df['Close']) / 3
+    df['r1'] = (df['pivot'] * 2) - df['Low']
+    df['s1'] = (df['pivot'] * 2) - df['High']
+
+    # Candlestick Patterns
+    with span("indicators", group="cdl_patterns"):
         df.ta.cdl_pattern(name=["doji", "engulfing", "hammer", "morningstar"], append=True)
-        
-        # Heikin Ashi
-        df_ha = df.copy()
-        df_ha['HA_Close'] = (df['Open'] + df['High'] + df['Low'] + df['Close']) / 4
-        df_ha['HA_Open'] = (df['Open'].shift(1) + df['Close'].shift(1)) / 2
-        df_ha.iloc[0, df_ha.columns.get_loc('HA_Open')] = (df.iloc[0]['Open'] + df.iloc[0]['Close']) / 2
-        df_ha['HA_High'] = df_ha[['High', 'HA_Open', 'HA_Close']].max(axis=1)
-        df_ha['HA_Low'] = df_ha[['Low', 'HA_Open', 'HA_Close']].min(axis=1)
-
-        return df, df_ha, info
-    except Exception as e:
-        st.error(f"❌ Error fetching data: {str(e)}")
-        return None, None, None
+    
+    # Heikin Ashi
+    df_ha = heikin_ashi(df)
+
+    if compact:
+        df, df_ha = compact_frame(df, V3_COLUMNS), compact_frame(df_ha)
+    return df, df_ha
+
+@cached('live')
+def get_live_frames(ticker, version):
+    """
+    get_stock_data's frames with the forming bar from the live feed (`version`,
+    from LIVE_BARS, keys the cache). Only that bar's indicators are computed.
+    """
+    df, df_ha = get_stock_data(ticker, period="5y")
+    bar = LIVE_BARS.bar(ticker)
+    if df is None or bar is None:
+        return df, df_ha
+    daily = apply_bar(TIMEFRAMES.history(ticker, period="5y"), bar)
+    return with_forming_bar(df, df_ha, bar, INDICATOR_STREAMS.forming((ticker, "5y", "1d"), daily))
 
 # --- 4. HELPER FUNCTIONS ---
 def format_large_number(num):
@@ -363,124 +375,29 @@ def format_large_number(num):
         return f"₹{num/1e5:,.2f} L"
     return f"₹{num:,.2f}"
 
-def calculate_signal_strength(df):
-    """Calculate composite technical signal (0-100)"""
-    latest = df.iloc[-1]
-    score = 50
-    
-    rsi = latest.get('RSI_14', 50)
-    if rsi < 30:
-        score += 15
-    elif rsi > 70:
-        score -= 15
-    
-    macd = latest.get('MACD_12_26_9', 0)
-    signal_line = latest.get('MACDs_12_26_9', 0)
-    if macd > signal_line:
-        score += 10
-    else:
-        score -= 10
-    
-    ema20 = latest.get('EMA_20', latest['Close'])
-    ema50 = latest.get('EMA_50', latest['Close'])
-    ema200 = latest.get('EMA_200', latest['Close'])
-    
-    if ema20 > ema50 > ema200:
-        score += 15
-    elif ema20 < ema50 < ema200:
-        score -= 15
-    
-    return min(100, max(0, score))
-
-def get_top_stocks_by_volume(limit=10):
-    """Fetch top NSE stocks by volume"""
-    nse_tickers = ['RELIANCE.NS', 'TCS.NS', 'INFY.NS', 'HDFC.NS', 'ICICIBANK.NS', 
-                   'HDFCBANK.NS', 'LT.NS', 'BAJAJFINSV.NS', 'MARUTI.NS', 'POWERGRID.NS',
-                   'WIPRO.NS', 'SUNPHARMA.NS', 'TATASTEEL.NS', 'JSWSTEEL.NS', 'BHARTIARTL.NS']
-    
-    volume_data = []
-    for ticker in nse_tickers:
-        try:
-            data = yf.Ticker(ticker)
-            hist = data.history(period='1d')
-            if not hist.empty:
-                volume = hist['Volume'].iloc[-1]
-                price = hist['Close'].iloc[-1]
-                volume_data.append({'Ticker': ticker.replace('.NS', ''), 'Volume': volume/1e6, 'Price': price})
-        except:
-            pass
-    
-    return sorted(volume_data, key=lambda x: x['Volume'], reverse=True)[:limit]
-
-def get_top_gainers(limit=10):
-    """Fetch top gainers (5D)"""
-    nse_tickers = ['RELIANCE.NS', 'TCS.NS', 'INFY.NS', 'HDFC.NS', 'ICICIBANK.NS', 
-                   'HDFCBANK.NS', 'LT.NS', 'BAJAJFINSV.NS', 'MARUTI.NS', 'POWERGRID.NS',
-                   'WIPRO.NS', 'SUNPHARMA.NS', 'TATASTEEL.NS', 'JSWSTEEL.NS', 'BHARTIARTL.NS',
-                   'SBIN.NS', 'ASIANPAINT.NS', 'DMART.NS', 'M&MFIN.NS', 'ULTRACEMCO.NS']
-    
-    gainer_data = []
-    for ticker in nse_tickers:
-        try:
-            data = yf.Ticker(ticker)
-            hist = data.history(period='5d')
-            if len(hist) >= 2:
-                current = hist['Close'].iloc[-1]
-                prev = hist['Close'].iloc[0]
-                change = ((current - prev) / prev) * 100
-                gainer_data.append({'Ticker': ticker.replace('.NS', ''), 'Change %': change, 'Price': current})
-        except:
-            pass
-    
-    return sorted(gainer_data, key=lambda x: x['Change %'], reverse=True)[:limit]
-
-def get_top_losers(limit=10):
-    """Fetch top losers (5D)"""
-    nse_tickers = ['RELIANCE.NS', 'TCS.NS', 'INFY.NS', 'HDFC.NS', 'ICICIBANK.NS', 
-                   'HDFCBANK.NS', 'LT.NS', 'BAJAJFINSV.NS', 'MARUTI.NS', 'POWERGRID.NS',
-                   'WIPRO.NS', 'SUNPHARMA.NS', 'TATASTEEL.NS', 'JSWSTEEL.NS', 'BHARTIARTL.NS',
-                   'SBIN.NS', 'ASIANPAINT.NS', 'DMART.NS', 'M&MFIN.NS', 'ULTRACEMCO.NS']
-    
-    loser_data = []
-    for ticker in nse_tickers:
-        try:
-            data = yf.Ticker(ticker)
-            hist = data.history(period='5d')
-            if len(hist) >= 2:
-                current = hist['Close'].iloc[-1]
-                prev = hist['Close'].iloc[0]
-                change = ((current - prev) / prev) * 100
-                loser_data.append({'Ticker': ticker.replace('.NS', ''), 'Change %': change, 'Price': current})
-        except:
-            pass
-    
-    return sorted(loser_data, key=lambda x: x['Change %'])[:limit]
-
-def identify_patterns(df):
-    """Identify candlestick patterns"""
-    patterns = []
-    latest = df.iloc[-1]
-    
-    pattern_map = {
-        'CDL_DOJI_10_0.1': {'name': 'Doji', 'desc': 'Indecision signal - potential reversal'},
-        'CDL_ENGULFING_10_0.1': {'name': 'Engulfing', 'desc': 'Strong reversal - momentum shift'},
-        'CDL_HAMMER_10_0.1': {'name': 'Hammer', 'desc': 'Bullish - rejection of lower prices'},
-        'CDL_MORNINGSTAR_10_0.1': {'name': 'Morning Star', 'desc': 'Bullish - reversal from downtrend'},
-    }
-    
-    for col in df.columns:
-        if 'CDL_' in col:
-            value = latest.get(col, 0)
-            if value != 0:
-                info = pattern_map.get(col, {'name': col.replace('CDL_', ''), 'desc': 'Pattern'})
-                sentiment = "Bullish ⬆️" if value > 0 else "Bearish ⬇️"
-                patterns.append({
-                    'Pattern': info['name'],
-                    'Sentiment': sentiment,
-                    'Description': info['desc']
-                })
-    
-    return patterns
+@cached('snapshot')
+def get_market_snapshot(universe="NIFTY 50", limit=10):
+    """
+    One batched download per refresh, shared by all three leaderboards. Errors
+    propagate (the page warns; the cache serves the last good leaderboards).
+    """
+    return build_market_snapshot(universe, limit)
+
+def market_snapshot(universe="NIFTY 50", limit=10):
+    """get_market_snapshot, or empty leaderboards with a warning when it is unavailable"""
+    try:
+        return get_market_snapshot(universe, limit)
+    except Exception as e:
+        st.warning(f"⚠️ Market snapshot unavailable for {universe}: {str(e)}")
+        return {'volume': [], 'gainers': [], 'losers': []}
+
+@cached('screen')
+def get_screen(universe="NIFTY 50"):
+    """Refreshes the universe's stored histories, then scores every ticker in worker processes"""
+    tickers = load_universe(universe)
+    missing = refresh_store(tickers)
+    results, unscored = screen_universe(tickers)
+    return results, missing + [t for t in unscored if t not in missing]
 
 def get_news_sources():
     """Get financial news links"""
@@ -495,58 +412,45 @@ def get_news_sources():
         '📄 Hindu Business': 'https://www.thehindubusinessline.com/markets/'
     }
 
-# --- 5. SIDEBAR ---
-with st.sidebar:
-    st.markdown("### 🔍 Research Settings")
-    
-    col_s1, col_s2 = st.columns([3, 1])
-    input_ticker = col_s1.text_input("Ticker", value="RELIANCE").upper()
-    exchange = col_s2.radio("Exch", ["NSE", "BSE"], index=0)
-    
-    suffix = ".NS" if exchange == "NSE" else ".BO"
-    full_ticker = f"{input_ticker}{suffix}" if not input_ticker.endswith((".NS", ".BO")) else input_ticker
-    
-    st.markdown("### 📊 Chart Settings")
-    chart_range = st.selectbox("Chart View", ["1mo", "3mo", "6mo", "1y", "3y", "5y"], index=2)
-    chart_style = st.radio("Chart Type", ["Candle", "Heikin-Ashi"])
-    
-    st.markdown("### ⚙️ Options")
-    show_bb = st.checkbox("Bollinger Bands", value=False)
-    show_volume = st.checkbox("Volume", value=True)
+def display_frames(df, df_ha, chart_range):
+    """Trailing bars of `chart_range` for the chart"""
+    days_map = {"1mo": 22, "3mo": 66, "6mo": 132, "1y": 252, "3y": 756, "5y": 1260}
+    lookback = days_map.get(chart_range, 252)
     
-    st.divider()
-    st.markdown("### 📚 Quick Links")
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.markdown("[Screener](https://www.screener.in)")
-    with col2:
-        st.markdown("[NSE](https://www.nseindia.com)")
-    with col3:
-        st.markdown("[BSE](https://www.bseindia.com)")
-
-# --- 6. MAIN DASHBOARD ---
-# Fetch Data
-df_full, df_ha_full, info = get_stock_data(full_ticker, period="5y")
-stock_live = yf.Ticker(full_ticker)
+    if len(df) > lookback:
+        return df.iloc[-lookback:], df_ha.iloc[-lookback:]
+    return df, df_ha
+
+# --- 5. DASHBOARD PANELS ---
+# Each tab body is a function so the lazy-panel mode can run only the visible one.
+# Financials and news come from data_sources, cached under their own TTLs, and are
+# handed in already fetched (see the fetch pipeline in the main dashboard).
+def render_header(slot, ticker, profile):
+    """Name, sector and industry banner; `profile` None while info is still loading"""
+    if profile is None:
+        name, details = ticker, "Loading profile…"
+    else:
+        name = profile.get('longName', ticker)
+        details = f"{profile.get('sector', 'N/A')} • {profile.get('industry', 'N/A')}"
+    slot.markdown(f"""
+    <div class='header-main'>
+        <h1>📈 {name} ({ticker})</h1>
+        <p>{details}</p>
+    </div>
+    """, unsafe_allow_html=True)
 
-if df_full is not None:
-    # --- DISPLAY HEADER ---
-    current_price = df_full['Close'].iloc[-1]
-    prev_close = df_full['Close'].iloc[-2]
+def render_key_metrics(df):
+    """Price and verdict cards (re-rendered on each live update); returns the empty
+    valuation card slots for render_valuation_cards"""
+    current_price = df['Close'].iloc[-1]
+    prev_close = df['Close'].iloc[-2]
     change = current_price - prev_close
     pct_change = (change / prev_close) * 100
     
-    signal_strength = calculate_signal_strength(df_full)
+    signal_strength = calculate_signal_strength(df)
     verdict = "BULLISH" if signal_strength > 60 else "BEARISH" if signal_strength < 40 else "NEUTRAL"
     verdict_class = f"verdict-{verdict.lower()}"
     
-    st.markdown(f"""
-    <div class='header-main'>
-        <h1>📈 {info.get('longName', full_ticker)} ({full_ticker})</h1>
-        <p>{info.get('sector', 'N/A')} • {info.get('industry', 'N/A')}</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
     # Key Metrics
     m1, m2, m3, m4, m5 = st.columns(5)
     
@@ -559,8 +463,24 @@ if df_full is not None:
         </div>
         """, unsafe_allow_html=True)
     
-    with m2:
+    valuation_slots = [m2.empty(), m3.empty(), m4.empty()]
+    
+    with m5:
         st.markdown(f"""
+        <div class='metric-card'>
+            <div class='metric-label'>System Verdict</div>
+            <div class='metric-value'>{verdict}</div>
+            <div class='metric-change neutral'>{signal_strength:.0f}/100</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown(f"<div class='verdict-badge {verdict_class}'>🎯 {verdict} Signal | Strength: {signal_strength:.0f}/100</div>", unsafe_allow_html=True)
+    return valuation_slots
+
+def render_valuation_cards(slots, info):
+    """52W high, P/E and market cap cards into the slots from render_key_metrics"""
+    high_slot, pe_slot, cap_slot = slots
+    high_slot.markdown(f"""
         <div class='metric-card'>
             <div class='metric-label'>52W High</div>
             <div class='metric-value'>₹{info.get('fiftyTwoWeekHigh', 0):,.0f}</div>
@@ -568,8 +488,7 @@ if df_full is not None:
         </div>
         """, unsafe_allow_html=True)
     
-    with m3:
-        st.markdown(f"""
+    pe_slot.markdown(f"""
         <div class='metric-card'>
             <div class='metric-label'>P/E Ratio</div>
             <div class='metric-value'>{info.get('trailingPE', 0):.1f}x</div>
@@ -577,25 +496,331 @@ if df_full is not None:
         </div>
         """, unsafe_allow_html=True)
     
-    with m4:
-        st.markdown(f"""
+    cap_slot.markdown(f"""
         <div class='metric-card'>
             <div class='metric-label'>Market Cap</div>
             <div class='metric-value'>{format_large_number(info.get('marketCap', 0))}</div>
             <div class='metric-change neutral'>Size</div>
         </div>
         """, unsafe_allow_html=True)
+
+def render_chart_panel(ticker, chart_range, df_display, df_ha_display, chart_style, show_bb, show_volume, chart_width):
+    """Chart tab: price action, EMAs, optional BB and volume (decimated to `chart_width` px)"""
+    st.markdown("### Price Action & Volume Analysis")
     
-    with m5:
+    # Trace data is cached per ticker/last bar/range: toggles only reassemble the figure
+    fig = CHART_BUILDER.figure(ticker, chart_range, df_display, df_ha_display,
+                               chart_style, show_bb, show_volume, width=chart_width)
+    with span("render", element="chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+def render_patterns_panel(df_full):
+    """Patterns tab: latest candlestick patterns and reference"""
+    st.markdown("### 🕯️ Candlestick Pattern Analysis")
+    
+    patterns = identify_patterns(df_full)
+    
+    if patterns:
+        st.markdown("#### Recently Identified Patterns")
+        for p in patterns:
+            is_bullish = "Bullish" in p['Sentiment']
+            st.markdown(f"""
+            <div class='pattern-box {'': 'bearish' if not is_bullish else ''}'>
+                <div style='color: #00d4ff; font-weight: 700; font-size: 1.1em; margin-bottom: 8px;'>{p['Pattern']} {p['Sentiment']}</div>
+                <div style='color: #d1d5db; font-size: 0.95em;'>{p['Description']}</div>
+            </div>
+            """, unsafe_allow_html=True)
+    else:
+        st.info("ℹ️ No significant patterns detected in the recent period.")
+    
+    st.markdown("#### 📚 Pattern Reference")
+    pattern_ref = {
+        '🕯️ Doji': 'Indecision between buyers and sellers. Potential reversal.',
+        '🕯️ Engulfing': 'Previous candle completely engulfed. Strong reversal signal.',
+        '🕯️ Hammer': 'Long lower wick. Bullish - rejects lower prices.',
+        '🕯️ Morning Star': 'Three-candle pattern. Strong bullish reversal.',
+    }
+    for name, desc in pattern_ref.items():
+        st.markdown(f"**{name}**: {desc}")
+
+def render_technicals_panel(df_full, current_price):
+    """Technicals tab: indicator cards and historical returns"""
+    st.markdown("### 🛠 Technical Dashboard")
+    
+    latest = df_full.iloc[-1]
+    
+    t1, t2, t3, t4 = st.columns(4)
+    
+    with t1:
+        rsi = latest.get('RSI_14', 50)
+        status = "Overbought ⚠️" if rsi > 70 else "Oversold ✓" if rsi < 30 else "Neutral ℹ️"
         st.markdown(f"""
         <div class='metric-card'>
-            <div class='metric-label'>System Verdict</div>
-            <div class='metric-value'>{verdict}</div>
-            <div class='metric-change neutral'>{signal_strength:.0f}/100</div>
+            <div class='metric-label'>RSI (14)</div>
+            <div class='metric-value'>{rsi:.1f}</div>
+            <div class='metric-change neutral'>{status}</div>
         </div>
         """, unsafe_allow_html=True)
     
-    st.markdown(f"<div class='verdict-badge {verdict_class}'>🎯 {verdict} Signal | Strength: {signal_strength:.0f}/100</div>", unsafe_allow_html=True)
+    with t2:
+        macd = latest.get('MACD_12_26_9', 0)
+        signal = latest.get('MACDs_12_26_9', 0)
+        st.markdown(f"""
+        <div class='metric-card'>
+            <div class='metric-label'>MACD</div>
+            <div class='metric-value'>{macd:.3f}</div>
+            <div class='metric-change {'positive' if macd > signal else 'negative'}'>{'Bullish ✓' if macd > signal else 'Bearish ⚠️'}</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with t3:
+        cmf = latest.get('CMF_20', 0)
+        st.markdown(f"""
+        <div class='metric-card'>
+            <div class='metric-label'>CMF (20)</div>
+            <div class='metric-value'>{cmf:.3f}</div>
+            <div class='metric-change neutral'>Money Flow</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with t4:
+        atr = latest.get('ATR_14', 0)
+        vol_pct = (atr / current_price) * 100
+        st.markdown(f"""
+        <div class='metric-card'>
+            <div class='metric-label'>Volatility (ATR)</div>
+            <div class='metric-value'>{vol_pct:.2f}%</div>
+            <div class='metric-change neutral'>Daily Range</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("### 📊 Historical Returns")
+    
+    def calc_return(days):
+        if len(df_full) > days:
+            past = df_full['Close'].iloc[-days]
+            return ((current_price - past) / past) * 100
+        return 0.0
+    
+    ret_data = {
+        "Timeframe": ["1W", "1M", "3M", "6M", "1Y", "3Y"],
+        "Return %": [calc_return(5), calc_return(22), calc_return(66), calc_return(132), calc_return(252), calc_return(756)]
+    }
+    
+    ret_df = pd.DataFrame(ret_data)
+    ret_df['Return %'] = ret_df['Return %'].apply(lambda x: f"{'↑' if x > 0 else '↓'} {x:+.2f}%")
+    
+    st.dataframe(ret_df, hide_index=True, use_container_width=True)
+    
+    st.markdown("### 📉 Signal Strength History (1Y)")
+    # The composite signal recomputed at every bar, not only the latest one
+    signals = signal_series(df_full).iloc[-252:]
+    st.line_chart(signals['score'], height=220)
+
+def render_financials_panel(info, fin):
+    """Financials tab: key ratios and annual financials"""
+    st.markdown("### 📊 Financial Metrics")
+    
+    f1, f2, f3, f4 = st.columns(4)
+    
+    with f1:
+        st.metric("Book Value", f"₹{info.get('bookValue', 0):.2f}")
+    with f2:
+        st.metric("Price/Book", f"{info.get('priceToBook', 0):.2f}")
+    with f3:
+        st.metric("ROE", f"{info.get('returnOnEquity', 0)*100:.2f}%")
+    with f4:
+        st.metric("Profit Margin", f"{info.get('profitMargins', 0)*100:.2f}%")
+    
+    st.markdown("### 📋 Annual Financials")
+    if not fin.empty:
+        st.dataframe(fin.style.format("{:,.0f}"), use_container_width=True)
+    else:
+        st.info("Financial data not available for this ticker.")
+
+def render_news_panel(news_list):
+    """News tab: latest headlines and news sources"""
+    st.markdown("### 📰 Latest News & Updates")
+    
+    if news_list:
+        news_orders = []
+        news_other = []
+        
+        for n in news_list:
+            title = n.get('title', '')
+            link = n.get('link', '#')
+            pub_time = datetime.fromtimestamp(n.get('providerPublishTime', 0)).strftime('%Y-%m-%d %H:%M') if n.get('providerPublishTime', 0) > 0 else "Recent"
+            
+            if any(x in title.lower() for x in ['order', 'contract', 'win', 'deal', 'awarded']):
+                news_orders.append((title, link, pub_time))
+            else:
+                news_other.append((title, link, pub_time))
+        
+        if news_orders:
+            st.markdown("#### 🔥 Order Wins & Contracts")
+            for title, link, pub_time in news_orders[:10]:
+                st.markdown(f"""
+                <div class='news-item news-order'>
+                    <div class='news-date'>{pub_time}</div>
+                    <a href='{link}' target='_blank'>{title}</a>
+                </div>
+                """, unsafe_allow_html=True)
+        
+        if news_other:
+            st.markdown("#### 📊 Other News")
+            for title, link, pub_time in news_other[:10]:
+                st.markdown(f"""
+                <div class='news-item'>
+                    <div class='news-date'>{pub_time}</div>
+                    <a href='{link}' target='_blank'>{title}</a>
+                </div>
+                """, unsafe_allow_html=True)
+    
+    st.divider()
+    st.markdown("### 📚 Financial News Sources")
+    news_sources = get_news_sources()
+    for name, url in news_sources.items():
+        st.markdown(f"[{name}]({url})")
+
+def render_screener_panel(universe):
+    """Screener tab: the whole universe ranked by score, verdict, RSI, crossovers or ADX"""
+    st.markdown(f"### 🔎 {universe} Screener")
+    
+    col_r1, col_r2 = st.columns([3, 1])
+    rank_by = col_r1.selectbox("Rank by", list(RANKINGS), key="screen_rank_by")
+    # A scan touches every ticker in the universe: run it on request, not on every rerun
+    if col_r2.button("Run scan", use_container_width=True):
+        st.session_state['screen_universe'] = universe
+    if st.session_state.get('screen_universe') != universe:
+        st.info(f"ℹ️ Run a scan to score every stock in {universe}.")
+        return
+    
+    try:
+        results, missing = get_screen(universe)
+    except Exception as e:
+        st.warning(f"⚠️ Screener unavailable for {universe}: {str(e)}")
+        return
+    
+    ranked = rank_screen(results, rank_by).drop(columns=['Verdict rank', 'Golden'])
+    ranked['Ticker'] = ranked['Ticker'].str.replace('.NS', '', regex=False)
+    st.dataframe(ranked.round(2), hide_index=True, use_container_width=True)
+    if missing:
+        st.caption(f"Not scored (no data or too few bars) for {len(missing)} tickers: {', '.join(missing[:20])}{' ...' if len(missing) > 20 else ''}")
+
+# --- 6. SIDEBAR ---
+with st.sidebar:
+    st.markdown("### 🔍 Research Settings")
+    
+    col_s1, col_s2 = st.columns([3, 1])
+    input_ticker = normalize_symbol(col_s1.text_input("Ticker", value="RELIANCE"))
+    exchange = col_s2.radio("Exch", ["NSE", "BSE"], index=0)
+    
+    suffix = ".NS" if exchange == "NSE" else ".BO"
+    full_ticker = f"{input_ticker}{suffix}" if not input_ticker.endswith((".NS", ".BO")) else input_ticker
+    
+    st.markdown("### 📊 Chart Settings")
+    chart_range = st.selectbox("Chart View", ["1mo", "3mo", "6mo", "1y", "3y", "5y"], index=2)
+    chart_style = st.radio("Chart Type", ["Candle", "Heikin-Ashi"])
+    # Point budget for long ranges: candles are bucketed and lines thinned to fit
+    chart_width = st.slider("Chart Width (px)", 600, 2400, DEFAULT_CHART_WIDTH, step=100)
+    
+    st.markdown("### ⚙️ Options")
+    show_bb = st.checkbox("Bollinger Bands", value=False)
+    show_volume = st.checkbox("Volume", value=True)
+    universe = st.selectbox("Leaderboard / Screener Universe", list(UNIVERSE_FILES), index=0)
+    lazy_panels = st.checkbox("Lazy panels (load selected tab only)", value=True)
+    # Header and chart follow the forming bar; the rest of the page stays as loaded
+    live_mode = st.checkbox("Live prices", value=False,
+                            help=f"Updates the price cards and chart every {LIVE_BARS.feed.interval:g}s")
+    show_timings = st.checkbox("Stage timings (debug)", value=False)
+    
+    with st.expander("Cache Stats"):
+        cache_stats_slot = st.empty()
+        st.caption("Price history memory per ticker")
+        cache_memory_slot = st.empty()
+        streams_slot = st.empty()
+        upstream_slot = st.empty()
+        st.caption("Background prefetch (watchlist and leaderboards)")
+        prefetch_slot = st.empty()
+    
+    st.divider()
+    st.markdown("### 📚 Quick Links")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown("[Screener](https://www.screener.in)")
+    with col2:
+        st.markdown("[NSE](https://www.nseindia.com)")
+    with col3:
+        st.markdown("[BSE](https://www.bseindia.com)")
+
+# --- 7. MAIN DASHBOARD ---
+# Watchlist tickers and the chosen leaderboard universe are refreshed in the
+# background before their entries expire, so these loads are cache hits
+PREFETCHER.register("v3 history", get_stock_data, [(t, "5y") for t in WATCHLIST])
+PREFETCHER.register("info", get_info, [(t,) for t in WATCHLIST])
+PREFETCHER.register("snapshot", get_market_snapshot, [(universe, 10)], expire_after=IDLE_EXPIRY)
+PREFETCHER.start()
+
+# Fetch Data: independent calls start first and run while the price history loads
+pending = {'info': FETCH_POOL.submit('info', get_info, full_ticker, default={})}
+if not lazy_panels:
+    # Every tab renders on this run, so their fetches start with the others
+    pending['financials'] = FETCH_POOL.submit('financials', get_financials, full_ticker, default=pd.DataFrame())
+    pending['news'] = FETCH_POOL.submit('news', get_news, full_ticker, default=[])
+
+def panel_data(source, func, default):
+    """Prefetched result for `source`, or an on-demand fetch for a lazy panel"""
+    if source not in pending:
+        pending[source] = FETCH_POOL.submit(source, func, full_ticker, default=default)
+    return pending[source].result()
+
+upstream_error = data_error = None
+try:
+    df_full, df_ha_full = get_stock_data(full_ticker, period="5y")
+except UpstreamError as e:
+    # Throttled or down, and no earlier frames for this ticker to fall back on
+    upstream_error = e
+    df_full = df_ha_full = None
+except Exception as e:
+    data_error = e
+    df_full = df_ha_full = None
+
+def current_frames():
+    """(df, df_ha) with the live forming bar in live mode, else as loaded"""
+    if live_mode and df_full is not None:
+        return get_live_frames(full_ticker, LIVE_BARS.version(full_ticker))
+    return df_full, df_ha_full
+
+def live_fragment(render):
+    """`render` as a fragment that reruns on its own every feed interval (live mode only)"""
+    return st.fragment(render, run_every=LIVE_BARS.feed.interval) if live_mode else render
+
+if df_full is not None:
+    # --- DISPLAY HEADER ---
+    # Drawn from the price history alone: name, sector and the valuation cards
+    # are filled in at the end of the run, once info arrives
+    current_price = df_full['Close'].iloc[-1]
+    
+    header_slot = st.empty()
+    render_header(header_slot, full_ticker, None)
+    
+    data_age = get_stock_data.staleness(full_ticker, period="5y")
+    if data_age is not None:
+        st.warning(f"⏳ Yahoo Finance is unavailable: showing prices loaded {data_age / 60:,.0f} min ago. "
+                   "They refresh automatically once it recovers.")
+    
+    valuation_slots = []
+    
+    def key_metrics():
+        slots = render_key_metrics(current_frames()[0])
+        if pending['info'].done():
+            # Cached info, or a live rerun after it arrived
+            render_valuation_cards(slots, pending['info'].result())
+        else:
+            valuation_slots[:] = slots
+    
+    with span("render", panel="header"):
+        live_fragment(key_metrics)()
     
     st.divider()
     
@@ -603,10 +828,11 @@ if df_full is not None:
     st.markdown("### 🌍 Market Overview")
     
     col_ov1, col_ov2, col_ov3 = st.columns(3)
+    leaderboards = market_snapshot(universe, 10)
     
     with col_ov1:
         st.markdown("#### 🚀 Top 10 High Volume")
-        volume_stocks = get_top_stocks_by_volume(10)
+        volume_stocks = leaderboards['volume']
         for idx, stock in enumerate(volume_stocks, 1):
             st.markdown(f"""
             <div class='stock-list-item'>
@@ -617,7 +843,7 @@ if df_full is not None:
     
     with col_ov2:
         st.markdown("#### 📈 Top 10 Gainers (5D)")
-        gainers = get_top_gainers(10)
+        gainers = leaderboards['gainers']
         for idx, stock in enumerate(gainers, 1):
             color = "positive" if stock['Change %'] > 0 else "negative"
             st.markdown(f"""
@@ -629,7 +855,7 @@ if df_full is not None:
     
     with col_ov3:
         st.markdown("#### 📉 Top 10 Losers (5D)")
-        losers = get_top_losers(10)
+        losers = leaderboards['losers']
         for idx, stock in enumerate(losers, 1):
             st.markdown(f"""
             <div class='stock-list-item'>
@@ -638,243 +864,72 @@ if df_full is not None:
             </div>
             """, unsafe_allow_html=True)
     
-    st.divider()
-    
-    # --- SLICE DATA FOR DISPLAY ---
-    days_map = {"1mo": 22, "3mo": 66, "6mo": 132, "1y": 252, "3y": 756, "5y": 1260}
-    lookback = days_map.get(chart_range, 252)
+    snapshot_age = get_market_snapshot.staleness(universe, 10)
+    if snapshot_age is not None:
+        st.caption(f"⏳ Leaderboards from {snapshot_age / 60:,.0f} min ago (upstream unavailable)")
     
-    if len(df_full) > lookback:
-        df_display = df_full.iloc[-lookback:]
-        df_ha_display = df_ha_full.iloc[-lookback:]
-    else:
-        df_display = df_full
-        df_ha_display = df_ha_full
+    st.divider()
     
     # --- TABS ---
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📈 Chart", "🕯️ Patterns", "🛠 Technicals", "📊 Financials", "📰 News"])
-    
-    # === TAB 1: CHART ===
-    with tab1:
-        st.markdown("### Price Action & Volume Analysis")
-        
-        fig = make_subplots(
-            rows=2 if show_volume else 1, cols=1, 
-            shared_xaxes=True,
-            vertical_spacing=0.03,
-            row_heights=[0.75, 0.25] if show_volume else [1]
-        )
-        
-        # Candlestick
-        if chart_style == "Heikin-Ashi":
-            fig.add_trace(go.Candlestick(
-                x=df_ha_display.index, open=df_ha_display['HA_Open'], high=df_ha_display['HA_High'],
-                low=df_ha_display['HA_Low'], close=df_ha_display['HA_Close'],
-                name="Heikin Ashi",
-                increasing_line_color='#10b981',
-                decreasing_line_color='#ef4444'
-            ), row=1, col=1)
-        else:
-            fig.add_trace(go.Candlestick(
-                x=df_display.index, open=df_display['Open'], high=df_display['High'],
-                low=df_display['Low'], close=df_display['Close'],
-                name="Price",
-                increasing_line_color='#10b981',
-                decreasing_line_color='#ef4444'
-            ), row=1, col=1)
-        
-        # EMAs
-        fig.add_trace(go.Scatter(x=df_display.index, y=df_display['EMA_20'], line=dict(color='#f59e0b', width=1.5), name="EMA20"), row=1, col=1)
-        fig.add_trace(go.Scatter(x=df_display.index, y=df_display['EMA_50'], line=dict(color='#facc15', width=1.5), name="EMA50"), row=1, col=1)
-        fig.add_trace(go.Scatter(x=df_display.index, y=df_display['EMA_200'], line=dict(color='#00d4ff', width=2), name="EMA200"), row=1, col=1)
-        
-        # Bollinger Bands
-        if show_bb:
-            fig.add_trace(go.Scatter(x=df_display.index, y=df_display['BBU_20_2.0'], line=dict(color='#6b7280', width=1, dash='dot'), name="BB-U"), row=1, col=1)
-            fig.add_trace(go.Scatter(x=df_display.index, y=df_display['BBL_20_2.0'], line=dict(color='#6b7280', width=1, dash='dot'), name="BB-L"), row=1, col=1)
-        
-        # Volume
-        if show_volume:
-            colors = ['#ef4444' if row['Close'] < row['Open'] else '#10b981' for idx, row in df_display.iterrows()]
-            fig.add_trace(go.Bar(x=df_display.index, y=df_display['Volume'], marker_color=colors, name="Volume", showlegend=False), row=2, col=1)
-        
-        fig.update_layout(
-            height=650,
-            template="plotly_dark",
-            xaxis_rangeslider_visible=False,
-            hovermode='x unified',
-            plot_bgcolor='rgba(15, 15, 40, 0.5)'
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # === TAB 2: PATTERNS ===
-    with tab2:
-        st.markdown("### 🕯️ Candlestick Pattern Analysis")
-        
-        patterns = identify_patterns(df_full)
-        
-        if patterns:
-            st.markdown("#### Recently Identified Patterns")
-            for p in patterns:
-                is_bullish = "Bullish" in p['Sentiment']
-                st.markdown(f"""
-                <div class='pattern-box {'': 'bearish' if not is_bullish else ''}'>
-                    <div style='color: #00d4ff; font-weight: 700; font-size: 1.1em; margin-bottom: 8px;'>{p['Pattern']} {p['Sentiment']}</div>
-                    <div style='color: #d1d5db; font-size: 0.95em;'>{p['Description']}</div>
-                </div>
-                """, unsafe_allow_html=True)
-        else:
-            st.info("ℹ️ No significant patterns detected in the recent period.")
-        
-        st.markdown("#### 📚 Pattern Reference")
-        pattern_ref = {
-            '🕯️ Doji': 'Indecision between buyers and sellers. Potential reversal.',
-            '🕯️ Engulfing': 'Previous candle completely engulfed. Strong reversal signal.',
-            '🕯️ Hammer': 'Long lower wick. Bullish - rejects lower prices.',
-            '🕯️ Morning Star': 'Three-candle pattern. Strong bullish reversal.',
-        }
-        for name, desc in pattern_ref.items():
-            st.markdown(f"**{name}**: {desc}")
-    
-    # === TAB 3: TECHNICALS ===
-    with tab3:
-        st.markdown("### 🛠 Technical Dashboard")
-        
-        latest = df_full.iloc[-1]
-        
-        t1, t2, t3, t4 = st.columns(4)
-        
-        with t1:
-            rsi = latest.get('RSI_14', 50)
-            status = "Overbought ⚠️" if rsi > 70 else "Oversold ✓" if rsi < 30 else "Neutral ℹ️"
-            st.markdown(f"""
-            <div class='metric-card'>
-                <div class='metric-label'>RSI (14)</div>
-                <div class='metric-value'>{rsi:.1f}</div>
-                <div class='metric-change neutral'>{status}</div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with t2:
-            macd = latest.get('MACD_12_26_9', 0)
-            signal = latest.get('MACDs_12_26_9', 0)
-            st.markdown(f"""
-            <div class='metric-card'>
-                <div class='metric-label'>MACD</div>
-                <div class='metric-value'>{macd:.3f}</div>
-                <div class='metric-change {'positive' if macd > signal else 'negative'}'>{'Bullish ✓' if macd > signal else 'Bearish ⚠️'}</div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with t3:
-            cmf = latest.get('CMF_20', 0)
-            st.markdown(f"""
-            <div class='metric-card'>
-                <div class='metric-label'>CMF (20)</div>
-                <div class='metric-value'>{cmf:.3f}</div>
-                <div class='metric-change neutral'>Money Flow</div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with t4:
-            atr = latest.get('ATR_14', 0)
-            vol_pct = (atr / current_price) * 100
-            st.markdown(f"""
-            <div class='metric-card'>
-                <div class='metric-label'>Volatility (ATR)</div>
-                <div class='metric-value'>{vol_pct:.2f}%</div>
-                <div class='metric-change neutral'>Daily Range</div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.markdown("### 📊 Historical Returns")
-        
-        def calc_return(days):
-            if len(df_full) > days:
-                past = df_full['Close'].iloc[-days]
-                return ((current_price - past) / past) * 100
-            return 0.0
-        
-        ret_data = {
-            "Timeframe": ["1W", "1M", "3M", "6M", "1Y", "3Y"],
-            "Return %": [calc_return(5), calc_return(22), calc_return(66), calc_return(132), calc_return(252), calc_return(756)]
-        }
-        
-        ret_df = pd.DataFrame(ret_data)
-        ret_df['Return %'] = ret_df['Return %'].apply(lambda x: f"{'↑' if x > 0 else '↓'} {x:+.2f}%")
-        
-        st.dataframe(ret_df, hide_index=True, use_container_width=True)
-    
-    # === TAB 4: FINANCIALS ===
-    with tab4:
-        st.markdown("### 📊 Financial Metrics")
-        
-        f1, f2, f3, f4 = st.columns(4)
-        
-        with f1:
-            st.metric("Book Value", f"₹{info.get('bookValue', 0):.2f}")
-        with f2:
-            st.metric("Price/Book", f"{info.get('priceToBook', 0):.2f}")
-        with f3:
-            st.metric("ROE", f"{info.get('returnOnEquity', 0)*100:.2f}%")
-        with f4:
-            st.metric("Profit Margin", f"{info.get('profitMargins', 0)*100:.2f}%")
-        
-        st.markdown("### 📋 Annual Financials")
-        fin = stock_live.financials
-        if not fin.empty:
-            st.dataframe(fin.style.format("{:,.0f}"), use_container_width=True)
-        else:
-            st.info("Financial data not available for this ticker.")
+    panels = {
+        "📈 Chart": live_fragment(lambda: render_chart_panel(full_ticker, chart_range,
+                                                    *display_frames(*current_frames(), chart_range),
+                                                    chart_style, show_bb, show_volume, chart_width)),
+        "🕯️ Patterns": lambda: render_patterns_panel(df_full),
+        "🛠 Technicals": lambda: render_technicals_panel(df_full, current_price),
+        "📊 Financials": lambda: render_financials_panel(pending['info'].result(), panel_data('financials', get_financials, pd.DataFrame())),
+        "📰 News": lambda: render_news_panel(panel_data('news', get_news, [])),
+        "🔎 Screener": lambda: render_screener_panel(universe),
+    }
+    
+    if lazy_panels:
+        # Only the selected panel fetches and renders on this rerun
+        active_panel = st.radio("Panel", list(panels), horizontal=True, label_visibility="collapsed", key="active_panel")
+        with span("render", panel=active_panel):
+            panels[active_panel]()
+    else:
+        for tab, (name, render) in zip(st.tabs(list(panels)), panels.items()):
+            with tab, span("render", panel=name):
+                render()
     
-    # === TAB 5: NEWS ===
-    with tab5:
-        st.markdown("### 📰 Latest News & Updates")
-        
-        news_list = stock_live.news
-        if news_list:
-            news_orders = []
-            news_other = []
-            
-            for n in news_list:
-                title = n.get('title', '')
-                link = n.get('link', '#')
-                pub_time = datetime.fromtimestamp(n.get('providerPublishTime', 0)).strftime('%Y-%m-%d %H:%M') if n.get('providerPublishTime', 0) > 0 else "Recent"
-                
-                if any(x in title.lower() for x in ['order', 'contract', 'win', 'deal', 'awarded']):
-                    news_orders.append((title, link, pub_time))
-                else:
-                    news_other.append((title, link, pub_time))
-            
-            if news_orders:
-                st.markdown("#### 🔥 Order Wins & Contracts")
-                for title, link, pub_time in news_orders[:10]:
-                    st.markdown(f"""
-                    <div class='news-item news-order'>
-                        <div class='news-date'>{pub_time}</div>
-                        <a href='{link}' target='_blank'>{title}</a>
-                    </div>
-                    """, unsafe_allow_html=True)
-            
-            if news_other:
-                st.markdown("#### 📊 Other News")
-                for title, link, pub_time in news_other[:10]:
-                    st.markdown(f"""
-                    <div class='news-item'>
-                        <div class='news-date'>{pub_time}</div>
-                        <a href='{link}' target='_blank'>{title}</a>
-                    </div>
-                    """, unsafe_allow_html=True)
-        
-        st.divider()
-        st.markdown("### 📚 Financial News Sources")
-        news_sources = get_news_sources()
-        for name, url in news_sources.items():
-            st.markdown(f"[{name}]({url})")
-
+    info = pending['info'].result()
+    try:
+        profile = get_profile(full_ticker) if info else {}
+    except Exception:
+        profile = {}
+    render_header(header_slot, full_ticker, profile)
+    if valuation_slots:
+        render_valuation_cards(valuation_slots, info)
+
+elif upstream_error is not None:
+    st.error(f"❌ Market data is unavailable right now, please retry shortly. ({upstream_error})")
+elif data_error is not None:
+    st.error(f"❌ Error fetching data: {str(data_error)}")
 else:
     st.error(f"❌ Ticker '{full_ticker}' not found. Try 'RELIANCE' (NSE) or switch exchange.")
 
+# Filled last so the counters include this rerun's lookups
+cache_stats_slot.dataframe(pd.DataFrame(cache_stats()).set_index('source'), use_container_width=True)
+cached_frames = pd.DataFrame(cache_entries('history'), columns=['args', 'bytes', 'expires_in'])
+cached_frames['KiB'] = (cached_frames.pop('bytes') / 1024).round(1)
+cache_memory_slot.dataframe(cached_frames.set_index('args'), use_container_width=True)
+streams_slot.caption(f"Indicator engines: {len(INDICATOR_STREAMS)} held, "
+                     f"{INDICATOR_STREAMS.nbytes / 1024:.1f} KiB of committed rows")
+upstream = upstream_status()
+if upstream is not None:
+    upstream_slot.caption(f"Upstream: circuit {upstream['state']} • {upstream['calls']} calls, "
+                          f"{upstream['retries']} retries, {upstream['rejected']} rejected")
+prefetch_slot.dataframe(pd.DataFrame(PREFETCHER.status()), hide_index=True, use_container_width=True)
+
+# Spans of this run (indented under their parent) and latency across all runs
+run.finish()
+if show_timings:
+    with st.expander(f"⏱️ Stage Timings: {run.seconds * 1000:,.0f} ms this run", expanded=True):
+        col_t1, col_t2 = st.columns(2)
+        col_t1.caption("This run")
+        col_t1.dataframe(pd.DataFrame(current_trace()), hide_index=True, use_container_width=True)
+        col_t2.caption("All runs (p50 / p95 are bucket bounds)")
+        col_t2.dataframe(pd.DataFrame(REGISTRY.summary()), hide_index=True, use_container_width=True)
+
 st.markdown("---")
 st.caption("⚠️ Disclaimer: Not financial advice. Data from Yahoo Finance. For research only.")
@@ -0,0 +1,339 @@
+"""
+Market data providers. Every upstream call in the apps goes through the active
+provider, so the whole pipeline can run against live Yahoo data, record it, or
+replay a recording from disk with injected latency (network-free benchmarks).
+
+Select one with STOCK_APP_PROVIDER:
+    yfinance (default) | record:<dir> | replay:<dir>[@<latency seconds>]
+Live providers are guarded by the upstream client (rate limit, retries, circuit
+breaker; see upstream.py): their failures raise UpstreamError.
+"""
+import logging
+import os
+import pickle
+import random
+import threading
+import time
+
+import pandas as pd
+import yfinance as yf
+from yfinance import shared as yf_shared
+
+from ohlcv_store import DATA_DIR, period_start
+from upstream import RATE_LIMIT, TransientError, UpstreamClient, is_transient
+
+REPLAY_DIR = os.path.join(DATA_DIR, "replay")
+
+
+# --- 1. INTERFACE ---
+class DataProvider:
+    """
+    history(ticker, interval, period=None, start=None) -> OHLCV frame (empty if unknown)
+    quote(ticker) -> the current session's daily bar so far (a one-row frame)
+    download(tickers, period) -> daily frame with (field, ticker) columns
+    info / financials / news(ticker) -> as yf.Ticker returns them
+    """
+
+    name = "base"
+
+    def history(self, ticker, interval="1d", period=None, start=None):
+        raise NotImplementedError
+
+    def quote(self, ticker):
+        # Yahoo's 1d bar for today is the live session while the market is open
+        return self.history(ticker, "1d", period="1d")
+
+    def download(self, tickers, period="5d"):
+        raise NotImplementedError
+
+    def info(self, ticker):
+        raise NotImplementedError
+
+    def financials(self, ticker):
+        raise NotImplementedError
+
+    def news(self, ticker):
+        raise NotImplementedError
+
+
+class _ThreadErrors(logging.Handler):
+    """Collects the error records one thread logs (yf.download reports failed tickers that way)"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.thread = threading.get_ident()
+        self.messages = []
+
+    def emit(self, record):
+        if record.thread == self.thread:
+            self.messages.append(record.getMessage())
+
+
+class YFinanceProvider(DataProvider):
+    """Live Yahoo Finance data"""
+
+    name = "yfinance"
+
+    def history(self, ticker, interval="1d", period=None, start=None):
+        stock = yf.Ticker(ticker)
+        if start is not None:
+            return stock.history(start=start, interval=interval)
+        return stock.history(period=period, interval=interval)
+
+    def download(self, tickers, period="5d"):
+        """
+        yf.download only logs the tickers it failed on and leaves them empty, so a
+        throttled batch would come back partial: raises TransientError instead (the
+        caller retries, and the caches keep the last complete snapshot). Tickers
+        missing for other reasons (delisted, mistyped) are left empty.
+        """
+        tickers = list(tickers)
+        errors = _ThreadErrors()
+        logger = logging.getLogger("yfinance")
+        logger.addHandler(errors)
+        try:
+            df = yf.download(
+                tickers, period=period, interval="1d", group_by="column",
+                auto_adjust=True, threads=True, progress=False
+            )
+        finally:
+            logger.removeHandler(errors)
+        # yfinance before 0.2.5x kept them in shared._ERRORS instead
+        messages = errors.messages + [str(e) for e in getattr(yf_shared, '_ERRORS', {}).values()]
+        transient = [m for m in messages if is_transient(m)]
+        if transient:
+            raise TransientError(f"download of {len(tickers)} tickers: {transient[-1]}")
+        if not messages and (df is None or df.empty or df.get('Close', df).isna().all().all()):
+            raise TransientError(f"download of {len(tickers)} tickers returned no data, without an error")
+        return df
+
+    def info(self, ticker):
+        return yf.Ticker(ticker).info
+
+    def financials(self, ticker):
+        return yf.Ticker(ticker).financials
+
+    def news(self, ticker):
+        return yf.Ticker(ticker).news
+
+
+# --- 2. RECORD / REPLAY ---
+class Recording:
+    """
+    Captured responses under <root>: history/<interval>/<TICKER>.pkl holds the union of
+    every bar seen for the ticker; info, financials and news keep the latest response.
+    """
+
+    def __init__(self, root=REPLAY_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _path(self, kind, name):
+        safe = name.upper().replace("/", "_")
+        return os.path.join(self.root, kind, f"{safe}.pkl")
+
+    def load(self, kind, name):
+        path = self._path(kind, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def save(self, kind, name, value):
+        path = self._path(kind, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def add_history(self, ticker, interval, df):
+        if df is None or df.empty:
+            return
+        kind = os.path.join("history", interval)
+        with self._lock:
+            stored = self.load(kind, ticker)
+            if stored is not None:
+                df = pd.concat([stored, df])
+                df = df[~df.index.duplicated(keep='last')].sort_index()
+            self.save(kind, ticker, df)
+
+
+class RecordingProvider(DataProvider):
+    """Passes calls to `inner` and captures every response into a Recording"""
+
+    name = "record"
+
+    def __init__(self, inner=None, root=REPLAY_DIR):
+        self.inner = inner or YFinanceProvider()
+        self.recording = Recording(root)
+
+    def history(self, ticker, interval="1d", period=None, start=None):
+        df = self.inner.history(ticker, interval, period=period, start=start)
+        self.recording.add_history(ticker, interval, df)
+        return df
+
+    def download(self, tickers, period="5d"):
+        data = self.inner.download(tickers, period=period)
+        if not data.empty:
+            for ticker in data.columns.get_level_values(1).unique():
+                self.recording.add_history(ticker, "1d", data.xs(ticker, axis=1, level=1).dropna(how='all'))
+        return data
+
+    def info(self, ticker):
+        value = self.inner.info(ticker)
+        self.recording.save("info", ticker, value)
+        return value
+
+    def financials(self, ticker):
+        value = self.inner.financials(ticker)
+        self.recording.save("financials", ticker, value)
+        return value
+
+    def news(self, ticker):
+        value = self.inner.news(ticker)
+        self.recording.save("news", ticker, value)
+        return value
+
+
+def _trailing(df, period):
+    """Trailing `period` measured from the last recorded bar, so replays stay deterministic"""
+    if df.empty or period is None:
+        return df
+    if period.endswith("d") and period[:-1].isdigit():
+        # Yahoo's day periods count trading days
+        return df.iloc[-int(period[:-1]):]
+    start = period_start(period, now=df.index[-1])
+    return df if start is None else df[df.index >= start]
+
+
+class ReplayProvider(DataProvider):
+    """
+    Serves a Recording from disk. Every call sleeps `latency` seconds (a float, or
+    {method: seconds}) plus up to `jitter` seconds. Unknown tickers get the empty
+    results yfinance returns for them.
+    """
+
+    name = "replay"
+
+    def __init__(self, root=REPLAY_DIR, latency=0.0, jitter=0.0, seed=None):
+        self.recording = Recording(root)
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _delay(self, method):
+        latency = self.latency.get(method, 0.0) if isinstance(self.latency, dict) else self.latency
+        with self._lock:
+            latency += self._random.uniform(0.0, self.jitter) if self.jitter else 0.0
+        if latency > 0:
+            time.sleep(latency)
+
+    def _history(self, ticker, interval):
+        df = self.recording.load(os.path.join("history", interval), ticker)
+        return pd.DataFrame() if df is None else df
+
+    def history(self, ticker, interval="1d", period=None, start=None):
+        self._delay("history")
+        df = self._history(ticker, interval)
+        if df.empty or start is None:
+            return _trailing(df, period)
+        start = pd.Timestamp(start)
+        if df.index.tz is not None and start.tz is None:
+            start = start.tz_localize(df.index.tz)
+        return df[df.index >= start]
+
+    def download(self, tickers, period="5d"):
+        self._delay("download")
+        frames = {}
+        for ticker in tickers:
+            df = _trailing(self._history(ticker, "1d"), period)
+            if not df.empty:
+                # download() returns exchange-local calendar dates without a timezone
+                frames[ticker] = df.set_axis(df.index.tz_localize(None) if df.index.tz is not None else df.index)
+        if not frames:
+            return pd.DataFrame()
+        data = pd.concat(frames, axis=1).swaplevel(0, 1, axis=1)
+        return data.sort_index(axis=1)
+
+    def info(self, ticker):
+        self._delay("info")
+        value = self.recording.load("info", ticker)
+        return {} if value is None else value
+
+    def financials(self, ticker):
+        self._delay("financials")
+        value = self.recording.load("financials", ticker)
+        return pd.DataFrame() if value is None else value
+
+    def news(self, ticker):
+        self._delay("news")
+        value = self.recording.load("news", ticker)
+        return [] if value is None else value
+
+
+# --- 3. GUARDED UPSTREAM ---
+class GuardedProvider(DataProvider):
+    """
+    Passes calls to `inner` through an UpstreamClient: queued for the rate limit,
+    retried with backoff, and refused while the circuit is open (UpstreamError).
+    """
+
+    name = "guarded"
+
+    def __init__(self, inner, client=None):
+        self.inner = inner
+        self.client = client or UpstreamClient(RATE_LIMIT)
+
+    def history(self, ticker, interval="1d", period=None, start=None):
+        return self.client.call("history", self.inner.history, ticker, interval, period=period, start=start)
+
+    def download(self, tickers, period="5d"):
+        return self.client.call("download", self.inner.download, tickers, period=period)
+
+    def info(self, ticker):
+        return self.client.call("info", self.inner.info, ticker)
+
+    def financials(self, ticker):
+        return self.client.call("financials", self.inner.financials, ticker)
+
+    def news(self, ticker):
+        return self.client.call("news", self.inner.news, ticker)
+
+
+# --- 4. ACTIVE PROVIDER ---
+def provider_from_spec(spec):
+    """'yfinance', 'record:<dir>' or 'replay:<dir>[@<latency>]' -> DataProvider"""
+    kind, _, arg = (spec or "yfinance").partition(":")
+    # Replays never throttle: only the network providers are guarded
+    guard = (lambda provider: GuardedProvider(provider)) if RATE_LIMIT else (lambda provider: provider)
+    if kind == "yfinance":
+        return guard(YFinanceProvider())
+    if kind == "record":
+        return RecordingProvider(inner=guard(YFinanceProvider()), root=arg or REPLAY_DIR)
+    if kind == "replay":
+        root, _, latency = arg.partition("@")
+        return ReplayProvider(root=root or REPLAY_DIR, latency=float(latency or 0.0))
+    raise ValueError(f"Unknown provider '{spec}'. Use yfinance, record:<dir> or replay:<dir>[@<latency>]")
+
+
+_provider = provider_from_spec(os.environ.get("STOCK_APP_PROVIDER"))
+
+
+def get_provider():
+    return _provider
+
+
+def set_provider(provider):
+    """Switches every data path to `provider` (e.g. a ReplayProvider for benchmarks)"""
+    global _provider
+    _provider = provider
+
+
+def upstream_status():
+    """The active provider's UpstreamClient.status(), or None when it is not guarded"""
+    client = getattr(_provider, 'client', None)
+    if client is None:
+        client = getattr(getattr(_provider, 'inner', None), 'client', None)
+    return None if client is None else client.status()
@@ -0,0 +1,128 @@
+"""
+Research report engine behind the Equity Research app (app (1).py): price history
+with the report's technicals, the ATR forecast, recent candlestick patterns and the
+assembled report. No Streamlit calls, so batch tools can build the same reports.
+"""
+from datetime import datetime, timezone
+
+import pandas_ta as ta  # registers the df.ta accessor used for candlestick patterns
+
+from analysis import analyze_technicals, generate_fundamental_analysis
+from indicators import indicator_frame
+from ohlcv_store import slice_period
+from telemetry import span
+from timeframes import TIMEFRAMES, widest
+
+DAILY_COLUMNS = ['EMA_20', 'EMA_50', 'EMA_200', 'RSI_14',
+                 'MACD_12_26_9', 'MACDh_12_26_9', 'MACDs_12_26_9',
+                 'ADX_14', 'DMP_14', 'DMN_14',
+                 'BBL_20_2.0', 'BBM_20_2.0', 'BBU_20_2.0', 'BBB_20_2.0', 'BBP_20_2.0',
+                 'ATRr_14']
+PATTERNS = ["engulfing", "hammer", "morningstar", "eveningstar", "shootingstar"]
+
+FORECAST_DAYS = 22   # ~1 month of sessions
+# Indicators run over this much history (v3's period) whatever `period` the report shows
+HISTORY_PERIOD = "5y"
+
+
+# --- 1. DATA ENGINE ---
+def stock_data(ticker, period="2y", streams=None, timeframes=TIMEFRAMES):
+    """
+    Daily bars with ALL technicals for the report, plus weekly bars with RSI and EMA 50.
+    Indicators run over the full HISTORY_PERIOD (shared with v3's streams and warmed
+    up) and are then cut to `period`.
+    `streams` (a StreamingIndicators) computes only bars not seen since the last call;
+    without it the indicator kernel runs once over the whole series.
+    Returns (None, None) for an unknown ticker.
+    """
+    # Fetch daily data (incremental: only bars after the last stored one)
+    symbol = timeframes.resolve(ticker)
+    history_period = widest(period, HISTORY_PERIOD)
+    frames = timeframes.get(symbol, period=history_period)
+    daily = frames['1d']
+    if daily is None or daily.empty:
+        return None, None
+
+    # Weekly data for Long-Term analysis, resampled from the same daily bars
+    df_weekly = frames['1wk']
+
+    def indicators(key, frame):
+        return streams.append(key, frame) if streams is not None else indicator_frame(frame)
+
+    # --- A. SHORT-TERM INDICATORS (DAILY) ---
+    # Moving Averages, Momentum (RSI, MACD, ADX) and Volatility (BB, ATR).
+    df = slice_period(daily.join(indicators((symbol, history_period, "1d"), daily)[DAILY_COLUMNS]), period)
+    if df.empty:
+        return None, None
+
+    # VWAP (Approximation for Daily: (H+L+C)/3)
+    df['VWAP_D'] = (df['High'] + df['Low'] + df['Close']) / 3
+
+    # CANDLESTICK PATTERNS (Specific List)
+    # We check specific patterns: Engulfing, Hammer, Morning/Evening Star
+    with span("indicators", group="cdl_patterns"):
+        df.ta.cdl_pattern(name=PATTERNS, append=True)
+
+    # --- B. LONG-TERM INDICATORS (WEEKLY) ---
+    weekly = indicators((symbol, history_period, "1wk"), df_weekly)
+    df_weekly = df_weekly.join(weekly[['RSI_14', 'EMA_50']])  # Weekly 50 EMA
+
+    return df, df_weekly
+
+
+# --- 2. REPORT SECTIONS ---
+def price_forecast(current_price, atr, verdict):
+    """
+    ATR-based 1-month scenarios -> (bull, base, bear).
+    Range = ATR * sqrt(time); the base case leans with the verdict.
+    """
+    vol_adj = atr * (FORECAST_DAYS ** 0.5)
+    tgt_high = current_price + (1.5 * vol_adj)
+    tgt_med = current_price + (0.5 * vol_adj) if verdict == "BUY / ACCUMULATE" else current_price - (0.5 * vol_adj)
+    tgt_low = current_price - (1.5 * vol_adj)
+    return tgt_high, tgt_med, tgt_low
+
+
+def recent_patterns(df, days=5):
+    """Candlestick pattern flags (non-zero CDL_ columns) in the last `days` bars -> (date, sentiment, name)"""
+    found = []
+    cdl_cols = [c for c in df.columns if "CDL_" in c]
+    for idx, row in df.iloc[-days:].iterrows():
+        for col in cdl_cols:
+            if row[col] != 0:
+                name = col.replace("CDL_", "").replace("_10_0.1", "")
+                found.append((idx.strftime('%Y-%m-%d'), "Bullish" if row[col] > 0 else "Bearish", name))
+    return found
+
+
+# --- 3. FULL REPORT ---
+def build_report(ticker, df, df_weekly, info, fin):
+    """The app's report as plain data (JSON-serializable)"""
+    current_price = float(df['Close'].iloc[-1])
+    prev_close = float(df['Close'].iloc[-2])
+    st_sigs, lt_sigs, verdict = analyze_technicals(df, df_weekly)
+    atr = float(df['ATRr_14'].iloc[-1])
+    bull, base, bear = price_forecast(current_price, atr, verdict)
+    positives, negatives = generate_fundamental_analysis(info, fin)
+    return {
+        'ticker': ticker,
+        'name': info.get('longName', ticker),
+        'as_of': df.index[-1].strftime('%Y-%m-%d'),
+        'generated': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'price': current_price,
+        'change_pct': (current_price - prev_close) / prev_close * 100,
+        'verdict': verdict,
+        'atr': atr,
+        'forecast': {'bull': bull, 'base': base, 'bear': bear},
+        'short_term': st_sigs,
+        'long_term': lt_sigs,
+        'key_levels': {
+            'vwap': float(df['VWAP_D'].iloc[-1]),
+            'ema_20': float(df['EMA_20'].iloc[-1]),
+            'ema_200': float(df['EMA_200'].iloc[-1]),
+            'high_52w': info.get('fiftyTwoWeekHigh'),
+        },
+        'patterns': [{'date': d, 'sentiment': s, 'pattern': p} for d, s, p in recent_patterns(df)],
+        'positives': positives,
+        'negatives': negatives,
+    }
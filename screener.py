@@ -0,0 +1,174 @@
+"""
+Universe screener: scores every ticker of an index with the dashboards' own rules
+(calculate_signal_strength from v3, analyze_technicals from app) and ranks them.
+
+Histories come from the Parquet OHLCV store. Worker processes read their tickers'
+partitions straight from disk, so a scan moves only result rows between processes
+and scales with cores instead of with network calls. Bringing the store up to date
+is a separate, incremental step (refresh_store).
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analysis import analyze_technicals, calculate_signal_strength
+from fetch_pipeline import MAX_WORKERS as FETCH_WORKERS
+from fetch_pipeline import PROCESS_CONTEXT
+from indicators import indicator_frame, rsi
+from ohlcv_store import HISTORY_STORE, OHLCVStore, slice_period
+
+# Partitions are fetched with the apps' period so they are shared with the dashboards
+STORE_PERIOD = "5y"
+# Bars scored per ticker: EMA_200 needs about a year to warm up
+SCREEN_PERIOD = "2y"
+MIN_BARS = 30
+# Seconds a freshly written partition is trusted without asking upstream for new bars
+REFRESH_AGE = 15 * 60
+CHUNK_SIZE = 25
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# RSI zones: the Technicals tab's 30/70 bands plus the report's 40/60 momentum bands
+RSI_ZONES = [(30, "Oversold"), (40, "Bearish"), (60, "Neutral"), (70, "Bullish"), (float('inf'), "Overbought")]
+VERDICT_RANK = {"BUY / ACCUMULATE": 2, "HOLD / NEUTRAL": 1, "SELL / AVOID": 0}
+ADX_TRENDING = 25
+
+SCREEN_COLUMNS = ['Ticker', 'Price', 'Change %', 'Score', 'Verdict', 'Verdict rank', 'RSI', 'RSI zone',
+                  'Golden', 'Cross', 'Cross age', 'ADX', 'Trend']
+
+# Rank by -> (columns, ascending)
+RANKINGS = {
+    "Score": (['Score', 'ADX'], [False, False]),
+    "Verdict": (['Verdict rank', 'Score'], [False, False]),
+    "RSI": (['RSI'], [False]),
+    "Golden cross": (['Golden', 'Cross age'], [False, True]),
+    "Death cross": (['Golden', 'Cross age'], [True, True]),
+    "ADX": (['ADX'], [False]),
+}
+
+
+# --- 1. SCORING ---
+def rsi_zone(rsi):
+    if np.isnan(rsi):
+        return None
+    return next(label for bound, label in RSI_ZONES if rsi < bound)
+
+
+def cross_state(ema_fast, ema_slow):
+    """(golden?, bars since the last 50/200 crossover) from aligned EMA arrays"""
+    valid = ~(np.isnan(ema_fast) | np.isnan(ema_slow))
+    if not valid[-1]:
+        return None, None
+    above = ema_fast[valid] > ema_slow[valid]
+    flips = np.flatnonzero(above[1:] != above[:-1])
+    age = len(above) - 1 - (flips[-1] + 1) if len(flips) else len(above) - 1
+    return bool(above[-1]), int(age)
+
+
+def weekly_close(df):
+    """Last close of each Monday-start week: the Close of timeframes' '1wk' bars"""
+    index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+    days = index.values.astype('datetime64[D]').astype(np.int64)
+    week = (days - 4) // 7   # 1970-01-05 was a Monday
+    ends = np.append(np.flatnonzero(week[1:] != week[:-1]), len(week) - 1)
+    return df['Close'].to_numpy(dtype=float)[ends]
+
+
+def score_ticker(ticker, df):
+    """Screen row for one daily OHLCV frame, or None if the history is too short"""
+    if df is None or len(df) < MIN_BARS:
+        return None
+    frame = df.join(indicator_frame(df))
+    # analyze_technicals reads only the latest weekly RSI
+    weekly = pd.DataFrame({'RSI_14': rsi(weekly_close(df), 14)[-1:]})
+
+    _, _, verdict = analyze_technicals(frame, weekly)
+    last = frame.iloc[-1]
+    prev_close = frame['Close'].iloc[-2]
+    golden, cross_age = cross_state(frame['EMA_50'].to_numpy(), frame['EMA_200'].to_numpy())
+    adx = float(last['ADX_14'])
+    return {
+        'Ticker': ticker,
+        'Price': float(last['Close']),
+        'Change %': (last['Close'] - prev_close) / prev_close * 100,
+        'Score': calculate_signal_strength(frame),
+        'Verdict': verdict,
+        'Verdict rank': VERDICT_RANK[verdict],
+        'RSI': float(last['RSI_14']),
+        'RSI zone': rsi_zone(float(last['RSI_14'])),
+        'Golden': golden,
+        'Cross': None if golden is None else ("Golden" if golden else "Death"),
+        'Cross age': cross_age,
+        'ADX': adx,
+        'Trend': "Strong" if adx > ADX_TRENDING else "Weak",
+    }
+
+
+# --- 2. PARALLEL SCAN ---
+def _screen_chunk(root, tickers, period):
+    """Worker: reads each ticker's partition from the store and scores it -> (rows, unscored)"""
+    store = OHLCVStore(root)
+    rows, unscored = [], []
+    for ticker in tickers:
+        try:
+            df = slice_period(store.read(ticker, "1d", columns=OHLCV_COLUMNS), period)
+            row = score_ticker(ticker, df)
+        except Exception:
+            row = None
+        if row is None:
+            unscored.append(ticker)
+        else:
+            rows.append(row)
+    return rows, unscored
+
+
+def screen_universe(tickers, period=SCREEN_PERIOD, store=HISTORY_STORE, workers=None):
+    """
+    Scores every ticker already in `store` -> (one row per ticker, unsorted (see
+    rank_screen); the tickers that could not be scored: no partition, too few bars
+    or an error). workers=1 scans in-process; the default uses one process per core.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    chunks = [tickers[i:i + CHUNK_SIZE] for i in range(0, len(tickers), CHUNK_SIZE)]
+    workers = min(workers or os.cpu_count() or 1, max(1, len(chunks)))
+    if workers == 1:
+        parts = [_screen_chunk(store.root, chunk, period) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=PROCESS_CONTEXT) as pool:
+            parts = list(pool.map(_screen_chunk, [store.root] * len(chunks), chunks, [period] * len(chunks)))
+    rows = [row for part, _ in parts for row in part]
+    unscored = [ticker for _, part in parts for ticker in part]
+    return pd.DataFrame(rows, columns=SCREEN_COLUMNS), unscored
+
+
+def refresh_store(tickers, period=STORE_PERIOD, store=HISTORY_STORE, workers=FETCH_WORKERS, max_age=REFRESH_AGE):
+    """
+    Brings each ticker's daily partition up to date (incremental after the first
+    fetch) on a thread pool. Partitions written in the last `max_age` seconds, e.g.
+    by a dashboard, are left alone. Returns the tickers that could not be fetched.
+    """
+    def fetch(ticker):
+        try:
+            path = store.path(ticker, "1d")
+            if os.path.exists(path) and time.time() - os.path.getmtime(path) < max_age:
+                return True
+            return not store.history(ticker, period=period).empty
+        except Exception:
+            return False
+
+    tickers = list(dict.fromkeys(tickers))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="screen") as pool:
+        ok = list(pool.map(fetch, tickers))
+    return [ticker for ticker, fetched in zip(tickers, ok) if not fetched]
+
+
+# --- 3. RANKING ---
+def rank_screen(results, by="Score", limit=None):
+    """Screen rows sorted by one of RANKINGS (ties broken by the secondary column)"""
+    columns, ascending = RANKINGS[by]
+    ranked = results.dropna(subset=columns[:1]).sort_values(columns, ascending=ascending, kind='stable')
+    ranked = ranked.reset_index(drop=True)
+    return ranked if limit is None else ranked.head(limit)
@@ -0,0 +1,119 @@
+"""
+Cross-process cache tier. Every Streamlit worker on a node opens the same SQLite
+file, so a frame fetched and computed by one worker is served to the others until
+its TTL runs out instead of being refetched and recomputed per process.
+
+Backends implement get(source, key) -> (found, value, seconds_left),
+set(source, key, value, ttl), clear(source=None) and claim(source, key, seconds),
+a lease that elects one process to refresh a key (see prefetch). Values are
+pickled: only point the cache at a file written by this app.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from ohlcv_store import DATA_DIR
+
+CACHE_DB = os.environ.get("STOCK_APP_CACHE_DB", os.path.join(DATA_DIR, "cache.sqlite"))
+
+# Expired rows are deleted every PURGE_EVERY writes
+PURGE_EVERY = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    source  TEXT NOT NULL,
+    key     TEXT NOT NULL,
+    expires REAL NOT NULL,
+    value   BLOB NOT NULL,
+    PRIMARY KEY (source, key)
+)
+"""
+_LEASES = """
+CREATE TABLE IF NOT EXISTS leases (
+    source  TEXT NOT NULL,
+    key     TEXT NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (source, key)
+)
+"""
+
+
+class SQLiteBackend:
+    """Shared TTL cache in one SQLite file (WAL mode: readers never block the writer)"""
+
+    def __init__(self, path=CACHE_DB):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            conn.execute(_LEASES)
+
+    def _connect(self):
+        # sqlite3 connections must stay on the thread (and process) that opened them:
+        # a forked worker (screener, batch reports) opens its own
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30)
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _key(key):
+        return repr(key)
+
+    def get(self, source, key):
+        now = time.time()
+        row = self._connect().execute(
+            "SELECT value, expires FROM cache WHERE source = ? AND key = ? AND expires > ?",
+            (source, self._key(key), now),
+        ).fetchone()
+        if row is None:
+            return False, None, 0.0
+        return True, pickle.loads(row[0]), row[1] - now
+
+    def set(self, source, key, value, ttl):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (source, key, expires, value) VALUES (?, ?, ?, ?)",
+                (source, self._key(key), time.time() + ttl, blob),
+            )
+            self._writes += 1
+            if self._writes % PURGE_EVERY == 0:
+                conn.execute("DELETE FROM cache WHERE expires <= ?", (time.time(),))
+                conn.execute("DELETE FROM leases WHERE expires <= ?", (time.time(),))
+
+    def claim(self, source, key, seconds):
+        """True for the one process that takes the lease on `key` for `seconds`, until it lapses"""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO leases (source, key, expires) VALUES (?, ?, ?) "
+                "ON CONFLICT (source, key) DO UPDATE SET expires = excluded.expires WHERE expires <= ?",
+                (source, self._key(key), now + seconds, now),
+            )
+            return cursor.rowcount == 1
+
+    def clear(self, source=None):
+        with self._connect() as conn:
+            if source is None:
+                conn.execute("DELETE FROM cache")
+            else:
+                conn.execute("DELETE FROM cache WHERE source = ?", (source,))
+
+
+def open_backend(path=CACHE_DB):
+    """SQLiteBackend at `path`, or None when disabled (STOCK_APP_CACHE_DB=off) or unavailable"""
+    if not path or path.lower() in ("off", "none", "0"):
+        return None
+    try:
+        return SQLiteBackend(path)
+    except (sqlite3.Error, OSError):
+        return None
@@ -0,0 +1,77 @@
+"""
+Single-flight call coalescing: concurrent calls with the same key share one
+execution. The first caller (the leader) runs the function; callers arriving
+while it runs wait for it and get its result, or its exception, instead of
+starting their own download or indicator run.
+
+    value, leader = flight.do(key, load, ticker)
+
+Only in-flight calls are shared: once the leader returns, the next call with the
+key runs again (results are kept by the caches in front, see data_cache).
+"""
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'value', 'error', 'owner', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.owner = threading.get_ident()
+        self.waiters = 0
+
+
+class SingleFlight:
+    """In-flight calls by key; `leaders` ran a call, `followers` waited on one"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        func(*args, **kwargs), shared with concurrent calls for `key` -> (value, leader).
+        leader is False when the value came from another caller's run. A call
+        re-entering its own key (same thread) runs directly instead of waiting on itself.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+            elif call.owner == threading.get_ident():
+                call, leader = None, True
+            else:
+                call.waiters += 1
+                self.followers += 1
+                leader = False
+
+        if call is None:
+            return func(*args, **kwargs), True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, False
+
+        try:
+            call.value = func(*args, **kwargs)
+            return call.value, True
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        """{key: callers waiting} for the calls running now"""
+        with self._lock:
+            return {key: call.waiters for key, call in self._calls.items()}
@@ -0,0 +1,411 @@
+"""
+Incremental (streaming) indicator engine.
+Each indicator carries its recursive state, so appending one bar is O(1) instead of
+recomputing the whole history with df.ta.*. Outputs follow the pandas_ta definitions
+and column names used by the apps.
+"""
+import copy
+import math
+import operator
+import threading
+from collections import OrderedDict, deque
+
+import pandas as pd
+
+from indicators import EPSILON, INDICATOR_COLUMNS
+from telemetry import span
+
+NAN = float('nan')
+
+# (ticker, period, interval) keys whose engine and frame are held, least recently used
+# dropped first (about 260 KB each for 5y of daily bars); as timeframes.MAX_SYMBOLS
+MAX_KEYS = 512
+
+
+def _non_zero(x):
+    return x if x != 0 else EPSILON
+
+
+# --- 1. RECURSIVE STATES ---
+class EMA:
+    """EMA seeded with the SMA of the first `length` values (pandas_ta presma)"""
+
+    def __init__(self, length):
+        self.length = length
+        self.alpha = 2.0 / (length + 1)
+        self.value = NAN
+        self._seed = []
+
+    def update(self, x):
+        if math.isnan(x):
+            return self.value
+        if self._seed is not None:
+            self._seed.append(x)
+            if len(self._seed) == self.length:
+                self.value = sum(self._seed) / self.length
+                self._seed = None
+            return self.value
+        self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class RMA:
+    """Wilder smoothing: ewm(alpha=1/length, adjust=False), started at the first valid value"""
+
+    def __init__(self, length):
+        self.alpha = 1.0 / length
+        self.value = NAN
+
+    def update(self, x):
+        if math.isnan(x):
+            return self.value
+        if math.isnan(self.value):
+            self.value = x
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class ATR:
+    """
+    RMA of the true range, seeded with the SMA of the first `length` ranges.
+    prenan=True drops the first bar's range (as ADX does internally).
+    """
+
+    def __init__(self, length, prenan=False):
+        self.length = length
+        self.prenan = prenan
+        self.rma = RMA(length)
+        self.prev_close = NAN
+        self._seed = []
+        self._bars = 0
+
+    def update(self, high, low, close):
+        if math.isnan(self.prev_close):
+            tr = NAN if self.prenan else _non_zero(high - low)
+        else:
+            tr = max(_non_zero(high - low), abs(high - self.prev_close), abs(self.prev_close - low))
+        self.prev_close = close
+        self._bars += 1
+
+        if self._seed is not None:
+            if not math.isnan(tr):
+                self._seed.append(tr)
+            if self._bars == self.length:
+                self.rma.update(sum(self._seed) / len(self._seed))
+                self._seed = None
+            return self.rma.value
+        return self.rma.update(tr)
+
+
+class RollingWindow:
+    """Fixed-length window buffer; sum/mean/std are O(length) = O(1) per bar"""
+
+    def __init__(self, length):
+        self.length = length
+        self.values = deque(maxlen=length)
+
+    def update(self, x):
+        self.values.append(x)
+
+    @property
+    def full(self):
+        return len(self.values) == self.length
+
+    def sum(self):
+        return math.fsum(self.values) if self.full else NAN
+
+    def mean(self):
+        return self.sum() / self.length
+
+    def std(self, ddof=1):
+        if not self.full:
+            return NAN
+        mean = self.mean()
+        return math.sqrt(math.fsum((v - mean) ** 2 for v in self.values) / (self.length - ddof))
+
+
+class RollingExtreme:
+    """Rolling max (or min) with a monotonic deque, amortized O(1) per bar"""
+
+    def __init__(self, length, mode="max"):
+        self.length = length
+        self.better = operator.ge if mode == "max" else operator.le
+        self._deque = deque()
+        self._count = 0
+
+    def update(self, x):
+        while self._deque and self.better(x, self._deque[-1][1]):
+            self._deque.pop()
+        self._deque.append((self._count, x))
+        if self._deque[0][0] <= self._count - self.length:
+            self._deque.popleft()
+        self._count += 1
+        return self._deque[0][1] if self._count >= self.length else NAN
+
+
+class PSAR:
+    """Parabolic SAR state: SAR, extreme point, acceleration factor and trend direction"""
+
+    def __init__(self, af0=0.02, max_af=0.2):
+        self.af0 = af0
+        self.max_af = max_af
+        self.af = af0
+        self.sar = NAN
+        self.ep = NAN
+        self.falling = None
+        self.prev = None  # (high, low) of the previous bar
+
+    def update(self, high, low):
+        """Returns (long, short, af, reversal) for the new bar"""
+        if self.prev is None:
+            self.prev = (high, low)
+            return NAN, NAN, self.af0, 0
+
+        prev_high, prev_low = self.prev
+        if self.falling is None:
+            # Direction, first SAR and EP come from the first two bars
+            up = high - prev_high
+            dn = prev_low - low
+            self.falling = dn > up and dn > 0 and abs(dn) >= EPSILON
+            self.sar = prev_high if self.falling else prev_low
+            self.ep = prev_low if self.falling else prev_high
+
+        sar = self.sar + self.af * (self.ep - self.sar)
+        if self.falling:
+            reverse = high > sar
+            if low < self.ep:
+                self.ep = low
+                self.af = min(self.af + self.af0, self.max_af)
+            sar = max(prev_high, sar)
+        else:
+            reverse = low < sar
+            if high > self.ep:
+                self.ep = high
+                self.af = min(self.af + self.af0, self.max_af)
+            sar = min(prev_low, sar)
+
+        if reverse:
+            sar = self.ep
+            self.af = self.af0
+            self.falling = not self.falling
+            self.ep = low if self.falling else high
+
+        self.sar = sar
+        self.prev = (high, low)
+        if self.falling:
+            return NAN, sar, self.af, int(reverse)
+        return sar, NAN, self.af, int(reverse)
+
+
+# --- 2. ENGINE ---
+class IndicatorEngine:
+    """
+    Carries the state of the whole indicator set for one ticker.
+    `update()` consumes one closed bar and returns that bar's indicator values.
+    """
+
+    def __init__(self):
+        self.ema = {n: EMA(n) for n in (20, 50, 200)}
+        self.ema_fast, self.ema_slow, self.ema_signal = EMA(12), EMA(26), EMA(9)
+        self.rsi_gain, self.rsi_loss = RMA(14), RMA(14)
+        self.atr = ATR(14)
+        self.adx_atr = ATR(14, prenan=True)
+        self.dm_pos, self.dm_neg, self.adx = RMA(14), RMA(14), RMA(14)
+        self.cmf_ad, self.cmf_vol = RollingWindow(20), RollingWindow(20)
+        self.bb = RollingWindow(20)
+        self.psar = PSAR()
+        self.hh = {n: RollingExtreme(n, "max") for n in (9, 26, 52)}
+        self.ll = {n: RollingExtreme(n, "min") for n in (9, 26, 52)}
+        self.spans = deque(maxlen=26)
+        self.doji_range = RollingWindow(10)
+        self.prev = None  # (high, low, close) of the previous bar
+        self.last_timestamp = None
+
+    def update(self, open_, high, low, close, volume, timestamp=None):
+        out = {}
+        for n, ema in self.ema.items():
+            out[f'EMA_{n}'] = ema.update(close)
+
+        # Momentum
+        if self.prev is None:
+            gain = loss = NAN
+            up = dn = NAN
+        else:
+            prev_high, prev_low, prev_close = self.prev
+            diff = close - prev_close
+            gain, loss = max(diff, 0.0), min(diff, 0.0)
+            up, dn = high - prev_high, prev_low - low
+        avg_gain, avg_loss = self.rsi_gain.update(gain), self.rsi_loss.update(loss)
+        denom = avg_gain + abs(avg_loss)
+        out['RSI_14'] = 100 * avg_gain / denom if denom != 0 else NAN
+
+        fast, slow = self.ema_fast.update(close), self.ema_slow.update(close)
+        macd = fast - slow
+        signal = self.ema_signal.update(macd)
+        out['MACD_12_26_9'] = macd
+        out['MACDh_12_26_9'] = macd - signal
+        out['MACDs_12_26_9'] = signal
+
+        # Trend strength
+        adx_atr = self.adx_atr.update(high, low, close)
+        if math.isnan(up):
+            pos = neg = NAN
+        else:
+            pos = up if (up > dn and up > 0) else 0.0
+            neg = dn if (dn > up and dn > 0) else 0.0
+            pos = 0.0 if abs(pos) < EPSILON else pos
+            neg = 0.0 if abs(neg) < EPSILON else neg
+        k = 100 / adx_atr
+        dmp, dmn = k * self.dm_pos.update(pos), k * self.dm_neg.update(neg)
+        dx = 100 * abs(dmp - dmn) / (dmp + dmn) if (dmp + dmn) != 0 else NAN
+        out['ADX_14'] = self.adx.update(dx)
+        out['DMP_14'] = dmp
+        out['DMN_14'] = dmn
+
+        # Money flow
+        self.cmf_ad.update((2 * close - (high + low)) * volume / _non_zero(high - low))
+        self.cmf_vol.update(volume)
+        vol_sum = self.cmf_vol.sum()
+        out['CMF_20'] = self.cmf_ad.sum() / vol_sum if vol_sum != 0 else NAN
+
+        # Volatility
+        self.bb.update(close)
+        mid, std = self.bb.mean(), self.bb.std(ddof=1)
+        lower, upper = mid - 2.0 * std, mid + 2.0 * std
+        width = _non_zero(upper - lower)
+        out['BBL_20_2.0'] = lower
+        out['BBM_20_2.0'] = mid
+        out['BBU_20_2.0'] = upper
+        out['BBB_20_2.0'] = 100 * width / mid
+        out['BBP_20_2.0'] = _non_zero(close - lower) / width
+
+        long, short, af, reversal = self.psar.update(high, low)
+        out['PSARl_0.02_0.2'] = long
+        out['PSARs_0.02_0.2'] = short
+        out['PSARaf_0.02_0.2'] = af
+        out['PSARr_0.02_0.2'] = reversal
+
+        out['ATRr_14'] = self.atr.update(high, low, close)
+
+        # Ichimoku (spans projected kijun - 1 bars forward, no chikou lookahead)
+        mids = {n: 0.5 * (self.hh[n].update(high) + self.ll[n].update(low)) for n in (9, 26, 52)}
+        self.spans.append((0.5 * (mids[9] + mids[26]), mids[52]))
+        span_a, span_b = self.spans[0] if len(self.spans) == self.spans.maxlen else (NAN, NAN)
+        out['ISA_9'] = span_a
+        out['ISB_26'] = span_b
+        out['ITS_9'] = mids[9]
+        out['IKS_26'] = mids[26]
+
+        self.doji_range.update(_non_zero(high - low))
+        range_avg = self.doji_range.mean()
+        out['CDL_DOJI_10_0.1'] = 100.0 if abs(_non_zero(close - open_)) < 0.1 * range_avg else 0.0
+
+        self.prev = (high, low, close)
+        self.last_timestamp = timestamp
+        return out
+
+    def update_frame(self, df):
+        """Feeds every bar of an OHLCV frame; returns the indicator rows as a frame."""
+        cols = [df[c].to_numpy(dtype=float) for c in ('Open', 'High', 'Low', 'Close', 'Volume')]
+        rows = [
+            self.update(o, h, l, c, v, ts)
+            for o, h, l, c, v, ts in zip(*cols, df.index)
+        ]
+        return pd.DataFrame(rows, index=df.index, columns=INDICATOR_COLUMNS, dtype=float)
+
+
+# --- 3. PER-TICKER REGISTRY ---
+class _Stream:
+    """One key's engine and the indicator rows of the bars it has committed"""
+    __slots__ = ('engine', 'frame', 'lock')
+
+    def __init__(self):
+        self.engine = None
+        self.frame = None
+        self.lock = threading.Lock()
+
+
+class StreamingIndicators:
+    """
+    Keeps one IndicatorEngine per (ticker, interval) and feeds it only bars it has
+    not seen. The last bar may still be forming, so it is evaluated on a copy of
+    the state and never committed. Holds at most `max_keys` keys (LRU); each key
+    computes under its own lock, so tickers do not wait on each other.
+    """
+
+    def __init__(self, max_keys=MAX_KEYS):
+        self.max_keys = max_keys
+        self._streams = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _stream(self, key):
+        with self._lock:
+            stream = self._streams.get(key)
+            if stream is None:
+                stream = self._streams[key] = _Stream()
+            self._streams.move_to_end(key)
+            while len(self._streams) > self.max_keys:
+                self._streams.popitem(last=False)
+        return stream
+
+    @staticmethod
+    def _advance(stream, closed):
+        """
+        Commits the closed bars `stream` has not seen (its lock held)
+        -> (engine, replayed: the whole history was recomputed)
+        """
+        engine = stream.engine
+        last_ts = engine.last_timestamp if engine is not None else None
+        stale = (
+            last_ts is None or last_ts not in closed.index
+            # Adjusted history was rewritten (dividend/split): replay it.
+            or closed.at[last_ts, 'Close'] != engine.prev[2]
+        )
+        if stale:
+            engine = stream.engine = IndicatorEngine()
+            stream.frame = engine.update_frame(closed)
+        else:
+            new_rows = closed[closed.index > last_ts]
+            if not new_rows.empty:
+                stream.frame = pd.concat([stream.frame, engine.update_frame(new_rows)])
+        return engine, stale
+
+    def append(self, key, df):
+        """Returns the indicator frame aligned to `df` (an OHLCV frame)."""
+        closed, forming = df.iloc[:-1], df.iloc[-1:]
+        stream = self._stream(key)
+
+        with span("indicators", group="streaming") as timing, stream.lock:
+            engine, replayed = self._advance(stream, closed)
+            timing.labels['mode'] = "replay" if replayed else "incremental"
+            frame = stream.frame
+            tail = copy.deepcopy(engine).update_frame(forming)
+
+        return pd.concat([frame, tail]).reindex(df.index)
+
+    def forming(self, key, df):
+        """
+        Indicator values (a dict) for the last bar of `df` only: a live tick costs
+        one bar's update plus any bars that closed since the last call.
+        """
+        last = df.iloc[-1]
+        stream = self._stream(key)
+        with span("indicators", group="streaming", mode="forming"), stream.lock:
+            engine, _ = self._advance(stream, df.iloc[:-1])
+            return copy.deepcopy(engine).update(*(float(last[c]) for c in ('Open', 'High', 'Low', 'Close', 'Volume')),
+                                                df.index[-1])
+
+    def __len__(self):
+        return len(self._streams)
+
+    @property
+    def nbytes(self):
+        """Memory held by the committed indicator frames"""
+        with self._lock:
+            frames = [stream.frame for stream in self._streams.values() if stream.frame is not None]
+        return sum(int(frame.memory_usage(index=True).sum()) for frame in frames)
+
+
+# Process-wide registry used by get_stock_data in the apps
+INDICATOR_STREAMS = StreamingIndicators()
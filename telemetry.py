@@ -0,0 +1,236 @@
+"""
+Per-stage timing for both apps: spans around upstream fetches, cached sources,
+indicator groups, scoring, figure builds and rendering, aggregated into latency
+histograms.
+
+    with span("fetch", source="info") as s:
+        ...
+        s.labels['cache'] = "hit"
+
+Histograms are process-wide (every session). The spans of the running script are
+also kept per thread for the in-app debug panel (begin_trace / current_trace).
+prometheus_text() renders the histograms in the Prometheus text format; set
+STOCK_APP_METRICS_PORT to serve it at http://<host>:<port>/metrics.
+"""
+import bisect
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRIC = "stock_app_stage_seconds"
+# Upper bounds (seconds) of the latency buckets; a +Inf bucket follows
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_PORT = os.environ.get("STOCK_APP_METRICS_PORT")
+# Spans kept per trace; live-mode fragments keep adding to the last full run's trace
+MAX_TRACE_SPANS = 2000
+
+_local = threading.local()
+
+
+# --- 1. HISTOGRAMS ---
+class Histogram:
+    """Latency histogram with Prometheus bucket semantics (le = upper bound)"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (inf past the last bucket)"""
+        rank, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS + (float('inf'),), self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(labels):
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+
+
+class Registry:
+    """One histogram per (stage, labels)"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, labels, seconds):
+        key = (stage, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def summary(self):
+        """[{'stage', 'labels', 'count', 'total_s', 'mean_ms', 'p50_ms', 'p95_ms'}], slowest total first"""
+        with self._lock:
+            items = [(stage, labels, h.count, h.total, h.quantile(0.5), h.quantile(0.95))
+                     for (stage, labels), h in self._histograms.items()]
+        rows = [{
+            'stage': stage,
+            'labels': " ".join(f"{k}={v}" for k, v in labels),
+            'count': count,
+            'total_s': round(total, 3),
+            'mean_ms': round(total / count * 1000, 2),
+            'p50_ms': p50 * 1000,
+            'p95_ms': p95 * 1000,
+        } for stage, labels, count, total, p50, p95 in items]
+        return sorted(rows, key=lambda row: row['total_s'], reverse=True)
+
+    def prometheus_text(self):
+        """All histograms in the Prometheus text exposition format"""
+        lines = [f"# HELP {METRIC} Time spent per app stage (spans).", f"# TYPE {METRIC} histogram"]
+        with self._lock:
+            items = sorted((key, list(h.counts), h.count, h.total) for key, h in self._histograms.items())
+        for (stage, labels), counts, count, total in items:
+            base = _label_text((('stage', stage),) + labels)
+            cumulative = 0
+            for bound, n in zip(BUCKETS + ("+Inf",), counts):
+                cumulative += n
+                lines.append(f'{METRIC}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f"{METRIC}_sum{{{base}}} {total:.6f}")
+            lines.append(f"{METRIC}_count{{{base}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+REGISTRY = Registry()
+
+
+# --- 2. SPANS ---
+class Span:
+    """Times its `with` block; labels can still be added inside it (e.g. cache='hit')"""
+
+    __slots__ = ('stage', 'labels', 'depth', 'start', 'seconds', '_trace')
+
+    def __init__(self, stage, labels):
+        self.stage = stage
+        self.labels = labels
+        self.seconds = None
+
+    def __enter__(self):
+        self._trace = getattr(_local, 'trace', None)
+        self.depth = getattr(_local, 'depth', 0)
+        _local.depth = self.depth + 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self.start
+        _local.depth = self.depth
+        if exc_type is not None:
+            self.labels.setdefault('error', exc_type.__name__)
+        REGISTRY.observe(self.stage, self.labels, self.seconds)
+        if self._trace is not None and len(self._trace) < MAX_TRACE_SPANS:
+            self._trace.append(self)
+        return False
+
+    def finish(self):
+        self.__exit__(None, None, None)
+
+
+def span(stage, **labels):
+    return Span(stage, labels)
+
+
+def timed(stage, **labels):
+    """Decorator: every call runs in a span labelled with the function's name"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(stage, dict(labels, name=func.__name__)):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- 3. PER-RUN TRACE ---
+def begin_trace(stage, **labels):
+    """Starts a fresh trace for this thread (one script run) under an open root span"""
+    _local.trace = []
+    _local.depth = 0
+    return span(stage, **labels).__enter__()
+
+
+def current_trace():
+    """Finished spans of this thread's trace in start order: [{'stage', 'labels', 'start_ms', 'ms'}]"""
+    trace = getattr(_local, 'trace', None) or []
+    t0 = min((s.start for s in trace), default=0.0)
+    return [{
+        'stage': "  " * s.depth + s.stage,
+        'labels': " ".join(f"{k}={v}" for k, v in s.labels.items()),
+        'start_ms': round((s.start - t0) * 1000, 1),
+        'ms': round(s.seconds * 1000, 2),
+    } for s in sorted(list(trace), key=lambda s: s.start)]
+
+
+def bind(func):
+    """`func` for another thread (e.g. the fetch pool) that records into the caller's trace"""
+    trace, depth = getattr(_local, 'trace', None), getattr(_local, 'depth', 0)
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        saved = getattr(_local, 'trace', None), getattr(_local, 'depth', 0)
+        _local.trace, _local.depth = trace, depth
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.trace, _local.depth = saved
+    return run
+
+
+# --- 4. METRICS ENDPOINT ---
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve_metrics(port=METRICS_PORT, host="0.0.0.0"):
+    """
+    Serves /metrics on a daemon thread, once per process (every rerun may call it).
+    Returns the port, or None when no port is configured or it is already taken.
+    """
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+            except OSError:
+                return None
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+        return _server.server_address[1]
@@ -0,0 +1,200 @@
+"""
+Multi-timeframe layer: weekly and monthly OHLCV bars resampled from the stored
+daily series, so each ticker needs one upstream history instead of one per timeframe.
+
+The cache is range-aware: it holds the widest daily history asked for per symbol
+and answers any narrower period or coarser interval from it, so app (2y) and v3
+(5y) share one download, and 'RELIANCE' is served from the 'RELIANCE.NS' history.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from ohlcv_store import HISTORY_STORE, PERIOD_DAYS, slice_period
+from single_flight import SingleFlight
+
+# Bare symbols are tried on this exchange first (the apps default to NSE)
+DEFAULT_SUFFIX = ".NS"
+# Seconds a held history is served before the store is asked for new bars
+REVALIDATE_AFTER = 60
+MAX_SYMBOLS = 512
+# Seconds a bare symbol found not to be listed on DEFAULT_SUFFIX keeps resolving to
+# itself: the probe may have hit a transient empty answer
+NEGATIVE_ALIAS_TTL = 15 * 60
+
+# Yahoo labels weekly bars with the Monday of the week and monthly bars with the 1st
+RESAMPLE_RULES = {
+    "1wk": dict(rule="W-MON", label="left", closed="left"),
+    "1mo": dict(rule="MS"),
+}
+
+AGGREGATION = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum',
+    'Dividends': 'sum',
+    'Stock Splits': 'max',
+}
+
+
+def resample_ohlcv(df, interval):
+    """Aggregates daily bars into '1wk' or '1mo' bars (empty periods dropped)"""
+    if interval not in RESAMPLE_RULES:
+        raise ValueError(f"Unsupported interval '{interval}'. Choose from {list(RESAMPLE_RULES)}")
+    agg = {col: how for col, how in AGGREGATION.items() if col in df.columns}
+    bars = df.resample(**RESAMPLE_RULES[interval]).agg(agg)
+    return bars[bars['Open'].notna()]
+
+
+def normalize_symbol(ticker):
+    """Canonical spelling of a typed symbol: ' reliance.ns' -> 'RELIANCE.NS'"""
+    return ticker.strip().upper()
+
+
+def is_bare(symbol):
+    """No exchange suffix and not an index (^NSEI) or FX/futures (INR=X) symbol"""
+    return "." not in symbol and not symbol.startswith("^") and "=" not in symbol
+
+
+def widest(period, other):
+    """The longer of two yfinance period strings ('max' beats everything)"""
+    days, other_days = PERIOD_DAYS[period], PERIOD_DAYS[other]
+    if days is None or other_days is None:
+        return "max"
+    return period if days >= other_days else other
+
+
+class _HeldHistory:
+    """Widest daily history held for one symbol and the frames derived from it"""
+
+    def __init__(self, period, daily, version):
+        self.period = period
+        self.daily = daily
+        self.version = version
+        self.checked = time.monotonic()
+        self.derived = {}
+
+    def frames(self, period):
+        """{'1d', '1wk', '1mo'} for a period no wider than the one held"""
+        frames = self.derived.get(period)
+        if frames is None:
+            daily = slice_period(self.daily, period)
+            frames = {'1d': daily}
+            for interval in RESAMPLE_RULES:
+                frames[interval] = resample_ohlcv(daily, interval)
+            self.derived[period] = frames
+        return frames
+
+
+class TimeframeCache:
+    """
+    Daily, weekly and monthly bars for a ticker from one stored daily history.
+    Only the widest period requested per symbol is fetched; narrower periods are
+    sliced from it and resampled frames are cached next to it until the daily
+    series gains or revises its last bar. Held histories are revalidated against
+    the store (an incremental fetch) after `revalidate_after` seconds; concurrent
+    revalidations of a symbol share one fetch.
+    """
+
+    def __init__(self, store=HISTORY_STORE, revalidate_after=REVALIDATE_AFTER, max_symbols=MAX_SYMBOLS):
+        self.store = store
+        self.revalidate_after = revalidate_after
+        self.max_symbols = max_symbols
+        self._held = OrderedDict()
+        # bare symbol -> (alias, time.monotonic() it expires at or None), LRU like _held
+        self._aliases = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    # --- Symbols ---
+    def resolve(self, ticker):
+        """
+        Symbol the history is stored under. A bare symbol is the DEFAULT_SUFFIX
+        listing when that exists (held, stored or fetchable), else itself (AAPL).
+        A listing found is remembered for good, its absence for NEGATIVE_ALIAS_TTL.
+        """
+        symbol = normalize_symbol(ticker)
+        if not is_bare(symbol):
+            return symbol
+        with self._lock:
+            alias, expires = self._aliases.get(symbol, (None, None))
+            if alias is not None and (expires is None or expires > time.monotonic()):
+                self._aliases.move_to_end(symbol)
+                return alias
+        listed = symbol + DEFAULT_SUFFIX
+        try:
+            known = listed in self._held or self.store.metadata(listed, "1d") is not None
+            alias = listed if known or self._daily(listed, "5y") is not None else symbol
+        except Exception:
+            return symbol
+        with self._lock:
+            self._aliases[symbol] = (alias, None if alias == listed else time.monotonic() + NEGATIVE_ALIAS_TTL)
+            self._aliases.move_to_end(symbol)
+            while len(self._aliases) > self.max_symbols:
+                self._aliases.popitem(last=False)
+        return alias
+
+    # --- Ranges ---
+    def _daily(self, symbol, period):
+        """Held history covering `period` (fetched or widened if needed); None if there is none"""
+        with self._lock:
+            held = self._held.get(symbol)
+            if held is not None:
+                self._held.move_to_end(symbol)
+        if (held is not None and widest(held.period, period) == held.period
+                and time.monotonic() - held.checked < self.revalidate_after):
+            return held
+
+        wide = period if held is None else widest(held.period, period)
+        held, _ = self._flight.do((symbol, wide), self._fetch, symbol, wide)
+        return held
+
+    def _fetch(self, symbol, wide):
+        """Brings `symbol`'s held history up to date over `wide` (one caller per symbol and range)"""
+        daily = self.store.history(symbol, period=wide, interval="1d")
+        if daily is None or daily.empty:
+            return None
+
+        last = daily.iloc[-1]
+        version = (len(daily), daily.index[0], daily.index[-1], last['Close'], last['Volume'])
+        with self._lock:
+            held = self._held.get(symbol)
+            if held is None or held.version != version:
+                held = self._held[symbol] = _HeldHistory(wide, daily, version)
+            else:
+                held.period = wide
+                held.checked = time.monotonic()
+            self._held.move_to_end(symbol)
+            while len(self._held) > self.max_symbols:
+                self._held.popitem(last=False)
+        return held
+
+    def get(self, ticker, period="5y"):
+        """Returns {'1d': daily, '1wk': weekly, '1mo': monthly} for `period`"""
+        held = self._daily(self.resolve(ticker), period)
+        if held is None:
+            empty = pd.DataFrame()
+            return {'1d': empty, '1wk': empty, '1mo': empty}
+        return held.frames(period)
+
+    def history(self, ticker, period="5y", interval="1d"):
+        """
+        `period` of `interval` bars. Daily, weekly and monthly bars come from the
+        held daily history; intraday intervals have their own store partitions.
+        """
+        if interval != "1d" and interval not in RESAMPLE_RULES:
+            return self.store.history(self.resolve(ticker), period=period, interval=interval)
+        return self.get(ticker, period)[interval]
+
+    def clear(self):
+        with self._lock:
+            self._held.clear()
+            self._aliases.clear()
+
+
+# Process-wide cache used by the apps
+TIMEFRAMES = TimeframeCache()
@@ -0,0 +1,235 @@
+"""
+Upstream client guarding every call to the market data source (see
+providers.GuardedProvider): a token-bucket rate limit, retries with exponential
+backoff and full jitter, and a circuit breaker that fails fast while the source
+keeps failing. Only transient failures (throttling, network trouble, 5xx) are
+retried and counted by the breaker; they surface as UpstreamError, which the caches
+answer with the last good value (stale-while-revalidate, see data_cache). Other
+errors (a 404 or KeyError for a mistyped ticker) are raised at once, unchanged.
+
+Configure with STOCK_APP_RATE_LIMIT=<requests per second>[@<burst>] ('off' disables).
+The budget is per process: the screener, backtest and batch worker pools and every
+Streamlit replica each get their own, so size it for the number of processes.
+"""
+import os
+import random
+import re
+import threading
+import time
+from collections import namedtuple
+
+# rate: requests per second; burst: requests allowed at once after an idle spell;
+# max_wait: seconds a call may queue for a token before it counts as throttled
+RateLimit = namedtuple('RateLimit', ['rate', 'burst', 'max_wait'], defaults=(10.0,))
+DEFAULT_RATE_LIMIT = RateLimit(rate=4.0, burst=16)
+
+# attempts include the first call; delays grow base * 2**n up to cap, then a
+# uniform draw below that (full jitter) spreads out sessions retrying together
+RetryPolicy = namedtuple('RetryPolicy', ['attempts', 'base', 'cap'], defaults=(3, 0.5, 4.0))
+
+# Consecutive failed calls that open the circuit, and seconds it stays open
+FAILURE_THRESHOLD = 5
+RESET_AFTER = 30.0
+
+# Transient failures by type (builtin, then by class name for yfinance, requests and
+# curl_cffi, which this module does not import) and by message
+TRANSIENT_TYPES = (ConnectionError, TimeoutError)
+TRANSIENT_NAMES = {'YFRateLimitError', 'ConnectionError', 'ConnectTimeout', 'ReadTimeout', 'Timeout',
+                   'ChunkedEncodingError', 'ProxyError', 'SSLError'}
+TRANSIENT_MESSAGE = re.compile(
+    r"too many requests|rate.?limit|timed? ?out|connection (?:reset|refused|aborted|error)"
+    r"|temporarily unavailable|\b(?:http|status)[^0-9]{0,12}(?:429|5\d\d)\b", re.IGNORECASE)
+
+
+class UpstreamError(Exception):
+    """The data source failed, is throttling us or is cut off by the circuit breaker"""
+
+
+class Throttled(UpstreamError):
+    pass
+
+
+class CircuitOpen(UpstreamError):
+    pass
+
+
+class TransientError(Exception):
+    """A retryable failure a provider detected itself (e.g. tickers a batch download dropped)"""
+
+
+def is_transient(error):
+    """True for throttling, network and server failures (an exception or an error message)"""
+    if isinstance(error, (TransientError,) + TRANSIENT_TYPES):
+        return True
+    if isinstance(error, BaseException):
+        if any(cls.__name__ in TRANSIENT_NAMES for cls in type(error).__mro__):
+            return True
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+        if isinstance(status, int):
+            return status == 429 or status >= 500
+    return TRANSIENT_MESSAGE.search(str(error)) is not None
+
+
+# --- 1. RATE LIMIT ---
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`; take() waits for one"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Takes a token (possibly going into debt) -> seconds until it is covered"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def _refund(self):
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    def take(self, max_wait):
+        """Waits for a token; False (and no token taken) if that would exceed `max_wait`"""
+        wait = self._reserve()
+        if wait > max_wait:
+            self._refund()
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+
+def backoff_delay(attempt, retry, rng=random):
+    """Full-jitter delay before retry number `attempt` (0-based)"""
+    return rng.uniform(0.0, min(retry.cap, retry.base * (2 ** attempt)))
+
+
+# --- 2. CIRCUIT BREAKER ---
+class CircuitBreaker:
+    """
+    closed: calls go through. open: `failure_threshold` calls in a row failed, so
+    calls fail fast for `reset_after` seconds. half-open: then a single trial call
+    goes through; it closes the circuit on success and re-opens it on failure.
+    """
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_after=RESET_AFTER):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "open" if time.monotonic() - self.opened_at < self.reset_after else "half-open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def release(self):
+        """Gives back a trial call that never reached the source"""
+        with self._lock:
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+
+# --- 3. CLIENT ---
+class UpstreamClient:
+    """Runs upstream calls through the rate limit, retries and circuit breaker"""
+
+    def __init__(self, rate_limit=DEFAULT_RATE_LIMIT, retry=RetryPolicy(), breaker=None, seed=None):
+        self.rate_limit = rate_limit
+        self.retry = retry
+        self.bucket = TokenBucket(rate_limit.rate, rate_limit.burst)
+        self.breaker = breaker or CircuitBreaker()
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.retries = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def call(self, name, func, *args, **kwargs):
+        """
+        func(*args, **kwargs) under the guards. Raises UpstreamError when transient
+        failures outlast the retries, or func's own error when it is not transient.
+        """
+        if not self.breaker.allow():
+            self._count('rejected')
+            raise CircuitOpen(f"{name}: upstream circuit open after repeated failures")
+
+        for attempt in range(self.retry.attempts):
+            if not self.bucket.take(self.rate_limit.max_wait):
+                self._count('rejected')
+                # Not the source's fault: leaves the breaker's count alone
+                self.breaker.release()
+                raise Throttled(f"{name}: rate limit queue longer than {self.rate_limit.max_wait:g}s")
+            self._count('calls')
+            try:
+                value = func(*args, **kwargs)
+            except Exception as e:
+                if not is_transient(e):
+                    # The source answered (e.g. 404 for a mistyped ticker): no retry, no strike
+                    self.breaker.success()
+                    raise
+                error = e
+                if attempt + 1 < self.retry.attempts:
+                    self._count('retries')
+                    time.sleep(backoff_delay(attempt, self.retry, self._random))
+                continue
+            self.breaker.success()
+            return value
+
+        self.breaker.failure()
+        raise UpstreamError(f"{name} failed after {self.retry.attempts} attempts: {error}") from error
+
+    def status(self):
+        """{'state', 'failures', 'calls', 'retries', 'rejected'} for the dashboards"""
+        return {'state': self.breaker.state, 'failures': self.breaker.failures,
+                'calls': self.calls, 'retries': self.retries, 'rejected': self.rejected}
+
+
+def rate_limit_from_spec(spec):
+    """'<rate>[@<burst>]' -> RateLimit, or None for 'off'"""
+    if not spec:
+        return DEFAULT_RATE_LIMIT
+    if spec.lower() in ("0", "off", "false", "no"):
+        return None
+    rate, _, burst = spec.partition("@")
+    rate = float(rate)
+    return RateLimit(rate=rate, burst=float(burst) if burst else max(1.0, 4 * rate))
+
+
+# Per process (see the module docstring)
+RATE_LIMIT = rate_limit_from_spec(os.environ.get("STOCK_APP_RATE_LIMIT"))